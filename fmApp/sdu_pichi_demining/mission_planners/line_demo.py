@@ -65,7 +65,7 @@ class Mission():
                                                 child_termination_cb = onPreempt)
         with autonomous:
             smach.Concurrence.add('HMI', wii_states.interfaceState(self.hmi))
-            smach.Concurrence.add('FOLLOW_ROUTE', follow_route.build(self.point_list))
+            smach.Concurrence.add('FOLLOW_ROUTE', follow_route.build_path(self.point_list))
         
         # Build the top level mission control from the remote control state and the autonomous state
         mission_control = smach.StateMachine(outcomes=['preempted','aborted'])            
@@ -12,11 +12,15 @@ def build():
     # Next go to point
     behaviour.userdata.next_x = 0
     behaviour.userdata.next_y = 0
+    route = get_next_point.getNextPosition()
     with behaviour :
+        # Entering the route again continues it from the current position
+        smach.StateMachine.add('RESUME', get_next_point.resumeRoute(route),
+                               transitions={'succeeded':'GET_NEXT'})
         smach.StateMachine.add('GO_TO_POINT', 
                                smach_ros.SimpleActionState('/platform_executors/position_planner',positionAction, goal_slots=['x','y']),
                                transitions={'succeeded':'GET_NEXT','preempted':'preempted','aborted':'aborted'},
                                remapping={'x':'next_x','y':'next_y'})        
-        smach.StateMachine.add('GET_NEXT', get_next_point.getNextPosition(), 
+        smach.StateMachine.add('GET_NEXT', route, 
                                transitions={'succeeded':'GO_TO_POINT'})
     return behaviour
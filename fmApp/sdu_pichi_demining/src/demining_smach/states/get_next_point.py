@@ -1,6 +1,8 @@
 import rospy
 import smach
 import smach_ros
+from pose_provider import pose_provider
+from simple_2d_math.segment_index import SegmentIndex
 
 class getNextPosition(smach.State):
     """
@@ -12,6 +14,9 @@ class getNextPosition(smach.State):
         self.ptr = 0
         #self.position_list =[[-5,-5],[-5,5],[-4,5],[-4,-5],[-3,-5],[-3,5]]
         self.generate_coverage([0,0],[20,20],1)
+        # The positions are visited cyclically from the first to the second last
+        self.route = SegmentIndex.fromPath(self.position_list[:-1] + [self.position_list[0]])
+        self.started = False
 
     def generate_coverage(self, lowerleft, upperright, lanewidth):
         # Start in lower left corner
@@ -43,7 +48,25 @@ class getNextPosition(smach.State):
                 #    self.position_list.append([colpos,rowpos])
                 heading = "right"
 
+    def resume(self, position):
+        """
+            Continue the route at the end of the route segment nearest to position.
+            Returns False if the route is empty.
+        """
+        (segment, distance) = self.route.nearest(position)
+        if segment is None :
+            return False
+        self.ptr = (segment + 1) % (len(self.position_list) - 1)
+        return True
+
+    def repeat(self):
+        """
+            Give the last position goal again
+        """
+        self.ptr = (self.ptr - 1) % (len(self.position_list) - 1)
+
     def execute(self, userdata):
+        self.started = True
         userdata.next_x = self.position_list[self.ptr][0]
         userdata.next_y = self.position_list[self.ptr][1]
         rospy.loginfo("go to point: %d , %d" % (self.position_list[self.ptr][0], self.position_list[self.ptr][1]))
@@ -51,3 +74,27 @@ class getNextPosition(smach.State):
         if self.ptr == len(self.position_list) - 1 :
             self.ptr = 0
         return 'succeeded'       
+
+class resumeRoute(smach.State):
+    """
+        State continuing the route of a getNextPosition state from the current position when the
+        route is entered again after an interruption, e.g. after a mine has been avoided. If the
+        vehicle cannot be located the interrupted position goal is given again. Does nothing the
+        first time the route is entered.
+    """
+    def __init__(self, route):
+        smach.State.__init__(self, outcomes=['succeeded'])
+        self.route = route
+        self.odom_frame = rospy.get_param("~odom_frame","/odom")
+        self.base_frame = rospy.get_param("~base_frame","/base_footprint")
+        self.pose = pose_provider.get_provider(self.odom_frame, self.base_frame)
+
+    def execute(self, userdata):
+        if self.route.started :
+            pose = self.pose.getPose()
+            if pose and self.route.resume((pose[0], pose[1])) :
+                rospy.loginfo("resume route at point %d" % self.route.ptr)
+            else :
+                rospy.loginfo("could not locate vehicle, repeating the interrupted point")
+                self.route.repeat()
+        return 'succeeded'
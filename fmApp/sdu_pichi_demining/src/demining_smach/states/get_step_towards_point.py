@@ -1,10 +1,9 @@
 import rospy
 import smach
 import smach_ros
-import tf
 import math
 
-from tf import TransformListener, TransformBroadcaster
+from pose_provider import pose_provider
 
 class getStepTowardsPoint(smach.State):
     """
@@ -12,19 +11,20 @@ class getStepTowardsPoint(smach.State):
     """
     def __init__(self):
         smach.State.__init__(self, outcomes=['succeeded'], input_keys=['next_x','next_y'],output_keys=['step_next_x','step_next_y'])
-        self.__listen = TransformListener()
         self.__cur_pos = None
         self.__step_next_pos = None
         self.__odom_frame = rospy.get_param("~odom_frame","/odom")
         self.__base_frame = rospy.get_param("~base_frame","/base_footprint")
+        self.__pose = pose_provider.get_provider(self.__odom_frame, self.__base_frame)
         self.step = 1
     
     def __get_current_position(self):
         ret = False
-        try:
-            (self.__cur_pos,rot) = self.__listen.lookupTransform( self.__odom_frame,self.__base_frame,rospy.Time(0))
+        pose = self.__pose.getPose()
+        if pose :
+            self.__cur_pos = (pose[0], pose[1])
             ret = True
-        except (tf.LookupException, tf.ConnectivityException),err:
+        else :
             rospy.loginfo("could not locate vehicle")
         return ret
 
@@ -28,9 +28,24 @@
 import rospy,math
 from geometry_msgs.msg import TwistStamped
 from simple_2d_math.vector import Vector
+from simple_2d_math.moving_average import MovingAverage
+from loop_timing import loop_timing
 
 class Controller():
-    def __init__(self):      
+    def __init__(self, params=None, clock=None):
+        """
+            params is an optional dictionary of parameters (names without the "~") used
+            instead of the parameter server, and clock an optional method returning the
+            current time as rospy.Time. Together they allow running the controller
+            without a ROS master, e.g. from the offline planner simulator.
+            The compute time and period jitter of generateTwist are recorded by the
+            velocity_controller loop timer, which is only reported when running with ROS.
+            When the node is event_driven the controller runs at the pose rate and the
+            timer has no nominal period.
+        """
+        self.params = params
+        self.clock = clock or rospy.Time.now
+        
         # Init control loop
         self.twist = TwistStamped()
         self.lin_err = 0.0
@@ -45,36 +60,55 @@ class Controller():
         self.fb_angular = 0.0   
         
         # Get parameters
-        self.period = rospy.get_param("~period",0.1)
-        self.lin_p = rospy.get_param("~lin_p",0.4)
-        self.lin_i = rospy.get_param("~lin_i",0.6)
-        self.lin_d = rospy.get_param("~lin_d",0.0)
-        self.ang_p = rospy.get_param("~ang_p",0.8)
-        self.ang_i = rospy.get_param("~ang_i",0.1)
-        self.ang_d = rospy.get_param("~ang_d",0.05)
-        self.int_max = rospy.get_param("~integrator_max",0.1)   
-        self.filter_size = rospy.get_param("~filter_size",10) 
-        self.max_linear_velocity = rospy.get_param("~max_linear_velocity",2)
-        self.max_angular_velocity = rospy.get_param("~max_angular_velocity",1)
-        self.linear_vel = [0.0] * self.filter_size
-        self.angular_vel = [0.0] * self.filter_size
+        self.period = self.get_param("~period",0.1)
+        self.lin_p = self.get_param("~lin_p",0.4)
+        self.lin_i = self.get_param("~lin_i",0.6)
+        self.lin_d = self.get_param("~lin_d",0.0)
+        self.ang_p = self.get_param("~ang_p",0.8)
+        self.ang_i = self.get_param("~ang_i",0.1)
+        self.ang_d = self.get_param("~ang_d",0.05)
+        self.int_max = self.get_param("~integrator_max",0.1)   
+        self.filter_size = self.get_param("~filter_size",10) 
+        self.max_linear_velocity = self.get_param("~max_linear_velocity",2)
+        self.max_angular_velocity = self.get_param("~max_angular_velocity",1)
+        self.linear_vel = MovingAverage(self.filter_size)
+        self.angular_vel = MovingAverage(self.filter_size)
         self.time = 0.0
-        self.last_entry = rospy.Time.now()
-        self.last_cl_entry = rospy.Time.now()
+        self.last_entry = self.clock()
+        self.last_cl_entry = self.clock()
         self.distance = 0.0
         self.last_position = Vector(1,0)
         self.angle = 0.0
         self.last_heading = Vector(1,0)
-        self.ptr = 0
+        
+        # Init loop timing
+        loop_period = self.period
+        if self.get_param("~event_driven",False) :
+            loop_period = None
+        if self.params is None :
+            self.timing = loop_timing.get_timer("velocity_controller", loop_period)
+            loop_timing.start_reporting()
+        else :
+            self.timing = loop_timing.LoopTimer("velocity_controller", loop_period)
+        
+    def get_param(self, name, default):
+        """
+            Get a parameter from the parameter dictionary if given, otherwise from the parameter server
+        """
+        if self.params is None :
+            return rospy.get_param(name, default)
+        return self.params.get(name.lstrip("~"), default)
         
     def generateTwist(self,sp_linear,sp_angular):
+        self.timing.start()
+        
         # Calculate time since last entry
-        self.period = (rospy.Time.now() - self.last_cl_entry).to_sec()
-        self.last_cl_entry = rospy.Time.now()
+        self.period = (self.clock() - self.last_cl_entry).to_sec()
+        self.last_cl_entry = self.clock()
         
         # Estimate feedback velocities
-        self.fb_linear = (sum(self.linear_vel)/len(self.linear_vel))
-        self.fb_angular = -(sum(self.angular_vel)/len(self.angular_vel))
+        self.fb_linear = self.linear_vel.mean()
+        self.fb_angular = -self.angular_vel.mean()
         
         # Calculate velocity errors for control loop
         self.lin_err = sp_linear - self.fb_linear
@@ -100,7 +134,7 @@ class Controller():
         self.ang_prev_err = self.ang_err
         
         # Update twist message with control velocities
-        self.twist.header.stamp = rospy.Time.now() 
+        self.twist.header.stamp = self.clock() 
         self.twist.twist.linear.x = sp_linear + (self.lin_err * self.lin_p) + (self.lin_int * self.lin_i) + (self.lin_diff * self.lin_d)
         self.twist.twist.angular.z = sp_angular + (self.ang_err * self.ang_p) + (self.ang_int * self.ang_i) + (self.ang_diff * self.ang_d)
 #        print("Fb:",(self.fb_linear,self.fb_angular)," Sp:",(sp_linear,sp_angular)," New:",(self.twist.twist.linear.x,self.twist.twist.angular.z))
@@ -114,29 +148,24 @@ class Controller():
             self.twist.twist.angular.z = self.max_angular_velocity
         if self.twist.twist.angular.z < -self.max_angular_velocity:
             self.twist.twist.angular.z = -self.max_angular_velocity
-            
+        
+        self.timing.stop()
         return self.twist
 
     def setFeedback(self,position,heading):
         # Calculate time since last entry
-        self.time = (rospy.Time.now() - self.last_entry).to_sec()
-        self.last_entry = rospy.Time.now()
+        self.time = (self.clock() - self.last_entry).to_sec()
+        self.last_entry = self.clock()
         
         # Calculate distance travelled since last entry
         self.distance = (self.last_position - position).length()
         self.last_position = position
         
         # Calculate change in orientation since last entry
-        self.angle = heading.angle(self.last_heading)
-        t1 = heading.rotate(self.angle)
-        if self.last_heading.angle(t1) != 0 :
-            self.angle = -self.angle
+        self.angle = heading.signedAngle(self.last_heading)
             
         self.last_heading = heading
         
         if self.time :
-            self.linear_vel[self.ptr] = self.distance / self.time
-            self.angular_vel[self.ptr] = self.angle / self.time
-            self.ptr = self.ptr + 1
-            if self.ptr >= self.filter_size :
-                self.ptr = 0  
+            self.linear_vel.update(self.distance / self.time)
+            self.angular_vel.update(self.angle / self.time)  
@@ -33,9 +33,8 @@ import rospy
 
 import actionlib
 import math
-import tf
 
-from tf import TransformListener, TransformBroadcaster
+from pose_provider import pose_provider
 from geometry_msgs.msg import Twist
 
 from fmExecutors.msg import *
@@ -69,7 +68,7 @@ class SprayAction():
         
         self.__feedback = sprayFeedback()
         
-        self.__listen = TransformListener()
+        self.__pose = pose_provider.get_provider(self.__odom_frame, self.__base_frame)
         #self.vel_pub = rospy.Publisher("/fmControllers/cmd_vel_auto",Twist)
         self.spray_pub = rospy.Publisher("/fmControllers/spray",UInt32)
         
@@ -126,27 +125,29 @@ class SprayAction():
                     self.spray_pub.publish(self.spray_msg)
                             
     def __get_distance(self):
-        return math.sqrt(math.pow(self.__cur_pos[0][0] - self.__start_pos[0][0],2) +
-                         math.pow(self.__cur_pos[0][1] - self.__start_pos[0][1],2))
+        return math.sqrt(math.pow(self.__cur_pos[0] - self.__start_pos[0],2) +
+                         math.pow(self.__cur_pos[1] - self.__start_pos[1],2))
     
     def __get_start_position(self):
         ret = False
-        try:
-            self.__start_pos = self.__listen.lookupTransform(self.__odom_frame,self.__base_frame,rospy.Time(0))
-            self.__start_yaw = tf.transformations.euler_from_quaternion(self.__start_pos[1])[2]
+        pose = self.__pose.getPose()
+        if pose :
+            (x, y, self.__start_yaw, stamp) = pose
+            self.__start_pos = (x, y)
             ret = True
-        except (tf.LookupException, tf.ConnectivityException),err:
+        else :
             rospy.loginfo("could not locate vehicle")
         
         return ret
     
     def __get_current_position(self):
         ret = False
-        try:
-            self.__cur_pos = self.__listen.lookupTransform(self.__odom_frame,self.__base_frame,rospy.Time(0))
-            self.__cur_yaw = tf.transformations.euler_from_quaternion(self.__cur_pos[1])[2]
+        pose = self.__pose.getPose()
+        if pose :
+            (x, y, self.__cur_yaw, stamp) = pose
+            self.__cur_pos = (x, y)
             ret = True
-        except (tf.LookupException, tf.ConnectivityException),err:
+        else :
             rospy.loginfo("could not locate vehicle")
         
         return ret
@@ -33,9 +33,9 @@ import rospy
 
 import actionlib
 import math
-import tf
 
-from tf import TransformListener, TransformBroadcaster
+from pose_provider import pose_provider
+from loop_timing import loop_timing
 from geometry_msgs.msg import Twist
 
 from fmExecutors.msg import *
@@ -68,7 +68,7 @@ class DriveForwardAction():
         
         self.__feedback = drive_forwardFeedback()
         
-        self.__listen = TransformListener()
+        self.__pose = pose_provider.get_provider(self.__odom_frame, self.__base_frame)
         self.vel_pub = rospy.Publisher("/fmControllers/cmd_vel_auto",Twist)
         
         self.__turn_timeout = 200
@@ -78,6 +78,10 @@ class DriveForwardAction():
         
         self.fix_offset = 0
         
+        self.period = 0.05
+        self.timing = loop_timing.get_timer(name, self.period)
+        loop_timing.start_reporting()
+        
         self.__server.start()
 
     def preempt_cb(self):
@@ -106,6 +110,7 @@ class DriveForwardAction():
             travelled distance, if the distance is equal to or greater then this
             action succeeds.
         """
+        self.timing.start()
         if self.__server.is_active():
             if self.new_goal:
                 self.new_goal = False
@@ -128,29 +133,33 @@ class DriveForwardAction():
                             self.__publish_cmd_vel(1)
                             self.__feedback.progress = self.__get_distance()
                             self.__server.publish_feedback(self.__feedback)
+        self.timing.stop()
                             
     def __get_distance(self):
-        return math.sqrt(math.pow(self.__cur_pos[0][0] - self.__start_pos[0][0],2) +
-                         math.pow(self.__cur_pos[0][1] - self.__start_pos[0][1],2))
+        return math.sqrt(math.pow(self.__cur_pos[0] - self.__start_pos[0],2) +
+                         math.pow(self.__cur_pos[1] - self.__start_pos[1],2))
     
     def __get_start_position(self):
         ret = False
-        try:
-            self.__start_pos = self.__listen.lookupTransform(self.__odom_frame,self.__base_frame,rospy.Time(0))
-            self.__start_yaw = tf.transformations.euler_from_quaternion(self.__start_pos[1])[2]
+        pose = self.__pose.getPose()
+        if pose :
+            (x, y, self.__start_yaw, stamp) = pose
+            self.__start_pos = (x, y)
             ret = True
-        except (tf.LookupException, tf.ConnectivityException),err:
+        else :
             rospy.loginfo("could not locate vehicle")
         
         return ret
     
     def __get_current_position(self):
         ret = False
-        try:
-            self.__cur_pos = self.__listen.lookupTransform(self.__odom_frame,self.__base_frame,rospy.Time(0))
-            self.__cur_yaw = tf.transformations.euler_from_quaternion(self.__cur_pos[1])[2]
+        pose = self.__pose.getPose()
+        if pose :
+            (x, y, self.__cur_yaw, stamp) = pose
+            self.timing.poseAge((rospy.Time.now() - stamp).to_sec())
+            self.__cur_pos = (x, y)
             ret = True
-        except (tf.LookupException, tf.ConnectivityException),err:
+        else :
             rospy.loginfo("could not locate vehicle")
         
         return ret
@@ -176,7 +185,7 @@ if __name__ == "__main__":
     
     action_server = DriveForwardAction("drive_forward","odom_combined","base_footprint")
     
-    t = rospy.Timer(rospy.Duration(0.05),action_server.on_timer)
+    t = rospy.Timer(rospy.Duration(action_server.period),action_server.on_timer)
     
     rospy.spin()
     
@@ -34,6 +34,7 @@ import rospy
 import actionlib
 import math
 import tf
+from loop_timing import loop_timing
 
 from fmExecutors.msg import *
 
@@ -85,7 +86,11 @@ class FollowLine():
         self._last_adc_msg = None
         self._server.start()
         
-        self.t = rospy.Timer(rospy.Duration(0.1),self.on_timer)
+        self.period = 0.1
+        self.timing = loop_timing.get_timer(name, self.period)
+        loop_timing.start_reporting()
+        
+        self.t = rospy.Timer(rospy.Duration(self.period),self.on_timer)
         
     def preempt_cb(self):
         """
@@ -124,6 +129,7 @@ class FollowLine():
         self.cur_adc = msg
             
     def on_timer(self,e):
+        self.timing.start()
         rospy.loginfo("Running control loop")
         if self._server.is_active():
             if self.cur_adc is not None:
@@ -155,6 +161,7 @@ class FollowLine():
             vel.twist.linear.x = self.vel_x
             vel.twist.angular.z = self.vel_z
             self.vel_pub.publish(vel)
+        self.timing.stop()
         
 
 
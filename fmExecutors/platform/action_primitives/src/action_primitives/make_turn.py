@@ -33,9 +33,9 @@ import rospy
 
 import actionlib
 import math
-import tf
 
-from tf import TransformListener, TransformBroadcaster
+from pose_provider import pose_provider
+from loop_timing import loop_timing
 from geometry_msgs.msg import TwistStamped
 from action_primitives.msg import *
 
@@ -66,7 +66,7 @@ class TurnAction():
         
         self.__feedback = make_turnFeedback()
         
-        self.__listen = TransformListener()
+        self.__pose = pose_provider.get_provider(self.__odom_frame, self.__base_frame)
         self.vel_pub = rospy.Publisher(cmd_vel_topic,TwistStamped)
         
         self.__turn_timeout = 200
@@ -74,6 +74,10 @@ class TurnAction():
         self.turn_vel = 0
         self.new_goal = False
         
+        self.period = 0.05
+        self.timing = loop_timing.get_timer(name, self.period)
+        loop_timing.start_reporting()
+        
         self.__server.start()
 
     def preempt_cb(self):
@@ -110,6 +114,7 @@ class TurnAction():
             if a goal is active a rabbit is placed initially at the desired distance 
             from the robot at either left or right.
         """
+        self.timing.start()
         if self.__server.is_active():
             if self.new_goal:
                 self.new_goal = False
@@ -148,6 +153,7 @@ class TurnAction():
                                 self.__server.publish_feedback(self.__feedback)
                     else:
                         self.__publish_cmd_vel(0)
+        self.timing.stop()
     
     def compare_yaw_turn(self,start,current,amount):
         diff = current - start
@@ -172,22 +178,25 @@ class TurnAction():
     
     def __get_start_position(self):
         ret = False
-        try:
-            self.__start_pos = self.__listen.lookupTransform(self.__odom_frame,self.__base_frame,rospy.Time(0))
-            self.__start_yaw = tf.transformations.euler_from_quaternion(self.__start_pos[1])[2]
+        pose = self.__pose.getPose()
+        if pose :
+            (x, y, self.__start_yaw, stamp) = pose
+            self.__start_pos = (x, y)
             ret = True
-        except (tf.LookupException, tf.ConnectivityException),err:
+        else :
             rospy.loginfo("could not locate vehicle")
         
         return ret
     
     def __get_current_position(self):
         ret = False
-        try:
-            self.__cur_pos = self.__listen.lookupTransform( self.__odom_frame,self.__base_frame,rospy.Time(0))
-            self.__cur_yaw = tf.transformations.euler_from_quaternion(self.__cur_pos[1])[2]
+        pose = self.__pose.getPose()
+        if pose :
+            (x, y, self.__cur_yaw, stamp) = pose
+            self.timing.poseAge((rospy.Time.now() - stamp).to_sec())
+            self.__cur_pos = (x, y)
             ret = True
-        except (tf.LookupException, tf.ConnectivityException),err:
+        else :
             rospy.loginfo("could not locate vehicle")
         
         return ret
@@ -222,7 +231,7 @@ if __name__ == "__main__":
         base_frame = rospy.get_param("~base_frame","base_footprint")
         cmd_vel_topic = "/fmSignals/cmd_vel"
         action_server = TurnAction(name,odom_frame,base_frame, cmd_vel_topic)
-        t = rospy.Timer(rospy.Duration(0.05),action_server.on_timer)
+        t = rospy.Timer(rospy.Duration(action_server.period),action_server.on_timer)
         rospy.spin()
     except rospy.exceptions.ROSInterruptException:
         pass
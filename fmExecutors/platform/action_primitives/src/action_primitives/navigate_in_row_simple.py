@@ -33,7 +33,8 @@ import rospy
 
 import actionlib
 import math
-from tf import TransformListener, LookupException, ConnectivityException
+from pose_provider import pose_provider
+from loop_timing import loop_timing
 
 from fmExecutors.msg import navigate_in_row_simpleAction, navigate_in_row_simpleFeedback,navigate_in_row_simpleGoal,navigate_in_row_simpleResult
 
@@ -86,7 +87,7 @@ class NavigateInRowSimple():
         self.left_valid_count = 0
         self.right_valid_count = 0
     
-        self.__listen = TransformListener()
+        self.__pose = pose_provider.get_provider(self.odom_frame, self.vehicle_frame)
  
         self.cur_row = None
         
@@ -104,7 +105,11 @@ class NavigateInRowSimple():
         
         
         
-        self._timer = rospy.Timer(rospy.Duration(0.1),self.on_timer)
+        self.period = 0.1
+        self.timing = loop_timing.get_timer(name, self.period)
+        loop_timing.start_reporting()
+        
+        self._timer = rospy.Timer(rospy.Duration(self.period),self.on_timer)
         
     def preempt_cb(self):
         """
@@ -150,14 +155,11 @@ class NavigateInRowSimple():
         
     def get_pose(self):
         """
-            returns the pose of the vehicle in the odometry frame
+            returns the pose (x, y, yaw, stamp) of the vehicle in the odometry frame
             returns none if the vehicle could not be located
         """
-        cur_pos = None
-        
-        try:
-            cur_pos = self.__listen.lookupTransform(self.odom_frame,self.vehicle_frame,rospy.Time(0))
-        except (LookupException, ConnectivityException),err:
+        cur_pos = self.__pose.getPose()
+        if cur_pos is None :
             rospy.loginfo("could not locate vehicle")
             
         return cur_pos
@@ -171,7 +173,7 @@ class NavigateInRowSimple():
         """
         dist = 0
         if self.__start_pose and self.__end_pose:
-            dist = math.sqrt(math.pow(self.__start_pose[0][0] - self.__end_pose[0][0],2) + pow(self.__start_pose[0][1] - self.__end_pose[0][1],2))
+            dist = math.sqrt(math.pow(self.__start_pose[0] - self.__end_pose[0],2) + pow(self.__start_pose[1] - self.__end_pose[1],2))
         return dist
         
             
@@ -183,6 +185,7 @@ class NavigateInRowSimple():
             a set of velocities is produced that will guide the vehicle in the row.
             if the row message reports that headland is detected sufficiently, the executor succeeds.
         """
+        self.timing.start()
         if self._server.is_active():
             if self.cur_row:
                 if (rospy.Time.now() - self.cur_row.header.stamp) > rospy.Duration(1):
@@ -211,6 +214,7 @@ class NavigateInRowSimple():
                 self.__send_safe_velocity()
                 if rospy.Time.now() - self.start_time > rospy.Duration(5):
                     self._server.set_aborted(None, "No row message received within 5s") 
+        self.timing.stop()
                 
     def __send_safe_velocity(self):
         vel  = Twist()
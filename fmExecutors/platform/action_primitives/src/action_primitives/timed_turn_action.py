@@ -34,6 +34,7 @@ import rospy
 import actionlib
 import math
 import tf
+from loop_timing import loop_timing
 
 from fmExecutors.msg import timed_turnAction,timed_turnGoal
 
@@ -72,7 +73,11 @@ class TimedTurn():
         
         self._server.start()
         
-        self.t = rospy.Timer(rospy.Duration(0.1),self.on_timer)
+        self.period = 0.1
+        self.timing = loop_timing.get_timer(name, self.period)
+        loop_timing.start_reporting()
+        
+        self.t = rospy.Timer(rospy.Duration(self.period),self.on_timer)
         
     def preempt_cb(self):
         """
@@ -99,6 +104,7 @@ class TimedTurn():
         self.start_time = rospy.Time.now()
             
     def on_timer(self,e):
+        self.timing.start()
         rospy.loginfo("Running control loop")
         if self._server.is_active():
             if (rospy.Time.now() - self.start_time) > rospy.Duration(self.turn_time):
@@ -114,6 +120,7 @@ class TimedTurn():
             vel.twist.linear.x = self.vel_x
             vel.twist.angular.z = self.vel_z
             self.vel_pub.publish(vel)
+        self.timing.stop()
 
 
 if __name__ == "__main__":
@@ -28,7 +28,7 @@
 #****************************************************************************/
 """
     Action server interface for line planner.
-    Takes a line goal defining begin point and end point
+    Takes a line goal defining begin point and end point, or a path goal with a polyline
 """
 import rospy,actionlib
 from line_action_server.msg import lineAction
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+#/****************************************************************************
+# FroboMind simulate_planner.py
+# Copyright (c) 2011-2013, author Leon Bonde Larsen <leon@bondelarsen.dk>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#****************************************************************************/
+"""
+    Runs a batch of randomized line following scenarios through the offline
+    simulator and prints the performance of each scenario and a summary.
+    Every scenario starts the robot with a random offset from the line and a
+    random heading error. Planner parameters may be given in a YAML file using
+    the same names as the private ROS parameters, e.g. zone1_rabbit_factor: 0.7
+
+    With --segments the line planner follows a random route of that many
+    segments as one path goal like the line_smach build_path route behaviour,
+    or with --per-segment as one goal per segment like build does. The round
+    trip of each goal through actionlib is not simulated.
+
+    Usage: simulate_planner.py [--planner line|position] [--scenarios N] [--params file.yaml]
+                               [--segments N [--max-turn rad] [--per-segment]]
+"""
+import argparse, math, random, time
+import yaml
+from simple_2d_math.vector import Vector
+from line_control.simulator import Goal, VirtualClock, UnicycleModel, PlannerSimulation
+from line_control.planner import LinePlanner
+from position_control.planner import PositionPlanner
+
+planners = {"line" : LinePlanner, "position" : PositionPlanner}
+
+def random_scenario(rnd, max_offset, max_heading_error):
+    offset = rnd.uniform(-max_offset, max_offset)
+    heading = rnd.uniform(-max_heading_error, max_heading_error)
+    return (offset, heading)
+
+def random_path(rnd, segments, length, max_turn):
+    path = [Vector(0.0, 0.0)]
+    heading = 0.0
+    for i in xrange(segments) :
+        if i :
+            heading += rnd.uniform(-max_turn, max_turn)
+        path.append(path[-1] + Vector(length*math.cos(heading), length*math.sin(heading)))
+    return path
+
+def combine(results):
+    """
+        Combine the results of consecutive goals into one
+    """
+    steps = max(sum(r["steps"] for r in results), 1)
+    outcome = "succeeded"
+    for r in results :
+        if r["outcome"] != "succeeded" :
+            outcome = r["outcome"]
+            break
+    return {
+        "outcome" : outcome,
+        "time" : sum(r["time"] for r in results),
+        "distance_to_goal" : results[-1]["distance_to_goal"],
+        "cross_track_rms" : math.sqrt(sum(r["cross_track_rms"]**2 * r["steps"] for r in results) / steps),
+        "cross_track_max" : max(r["cross_track_max"] for r in results),
+        "angular_effort" : sum(r["angular_effort"] for r in results),
+        "steps" : steps
+    }
+
+def run_scenario(planner_class, params, scenario, path, max_time, max_acceleration, per_segment=False):
+    (offset, heading) = scenario
+    clock = VirtualClock()
+    planner = planner_class(params, clock.now)
+    model = UnicycleModel(0.0, offset, heading, max_acceleration, max_acceleration)
+    sim = PlannerSimulation(planner, model, clock, max_time=max_time)
+    if planner_class is PositionPlanner :
+        return combine([sim.run(Goal(x=p[0], y=p[1])) for p in path[1:]])
+    elif per_segment or len(path) == 2 :
+        return combine([sim.run(Goal(a_x=a[0], a_y=a[1], b_x=b[0], b_y=b[1])) for (a, b) in zip(path[:-1], path[1:])])
+    else :
+        return sim.run(Goal(path=path))
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline closed loop simulation of the line and position planners')
+    parser.add_argument('--planner', choices=sorted(planners.keys()), default='line')
+    parser.add_argument('--params', help='YAML file with planner parameters')
+    parser.add_argument('--scenarios', type=int, default=100, help='number of random scenarios')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--length', type=float, default=10.0, help='line length [m]')
+    parser.add_argument('--segments', type=int, default=1, help='number of route segments')
+    parser.add_argument('--max-turn', type=float, default=math.pi/6, help='max turn at route vertices [rad]')
+    parser.add_argument('--per-segment', action='store_true', help='one goal per route segment instead of one path goal')
+    parser.add_argument('--max-offset', type=float, default=1.0, help='max initial distance to line [m]')
+    parser.add_argument('--max-heading-error', type=float, default=math.pi/4, help='max initial heading error [rad]')
+    parser.add_argument('--max-acceleration', type=float, default=None, help='acceleration limit of the model (default: none)')
+    parser.add_argument('--max-time', type=float, default=120.0, help='simulation time limit per scenario [s]')
+    parser.add_argument('--quiet', action='store_true', help='only print the summary')
+    args = parser.parse_args()
+
+    params = {}
+    if args.params :
+        with open(args.params) as f :
+            params = yaml.safe_load(f) or {}
+
+    rnd = random.Random(args.seed)
+    results = []
+    wall = time.time()
+    for i in xrange(args.scenarios) :
+        scenario = random_scenario(rnd, args.max_offset, args.max_heading_error)
+        path = random_path(rnd, args.segments, args.length, args.max_turn)
+        result = run_scenario(planners[args.planner], params, scenario, path, args.max_time, args.max_acceleration, args.per_segment)
+        results.append(result)
+        if not args.quiet :
+            print "%4d offset %6.3f heading %6.3f: %-9s time %7.2f s  xte rms %.3f max %.3f m  effort %.2f rad" % \
+                (i, scenario[0], scenario[1], result["outcome"], result["time"], result["cross_track_rms"], result["cross_track_max"], result["angular_effort"])
+    wall = time.time() - wall
+
+    n = len(results)
+    if n :
+        succeeded = sum(1 for r in results if r["outcome"] == "succeeded")
+        sim_time = sum(r["time"] for r in results)
+        print "Scenarios:          %d (%d succeeded)" % (n, succeeded)
+        print "Mean time to goal:  %.2f s" % (sim_time / n)
+        print "Mean cross track:   %.3f m rms, %.3f m max" % (sum(r["cross_track_rms"] for r in results) / n, max(r["cross_track_max"] for r in results))
+        print "Mean angular effort %.2f rad" % (sum(r["angular_effort"] for r in results) / n)
+        print "Simulated %.1f s in %.2f s wall time (%.0fx real time)" % (sim_time, wall, sim_time / max(wall, 1e-9))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+#/****************************************************************************
+# FroboMind tune_line_planner.py
+# Copyright (c) 2011-2013, author Leon Bonde Larsen <leon@bondelarsen.dk>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#****************************************************************************/
+"""
+    Tunes the line planner zone parameters by offline simulation.
+    Candidates from a search space (see line_control.tuning) are evaluated in
+    parallel on a process pool using all cores, and the Pareto front on cross
+    track RMS, time to goal and angular effort is written as YAML. With
+    --launch-dir every front member is also written as a parameter file that
+    can be loaded directly in a launch file:
+        <rosparam file="$(find my_package)/tuning/front_00.yaml" command="load"/>
+
+    Usage: tune_line_planner.py front.yaml [--candidates N] [--space space.yaml] [--processes N]
+"""
+import argparse, os, sys, time
+import multiprocessing
+import yaml
+from line_control import tuning
+
+def init_worker():
+    # The planner prints a line per goal, keep the workers quiet
+    sys.stdout = open(os.devnull, "w")
+
+def evaluate_candidate(job):
+    (params, scenarios, length, max_time, max_acceleration) = job
+    return (params, tuning.evaluate(params, scenarios, length, max_time, max_acceleration))
+
+def write_params(filename, params, scores):
+    with open(filename, "w") as f :
+        f.write("# Line planner parameters from tune_line_planner.py\n")
+        for name in tuning.score_names :
+            f.write("# %s: %f\n" % (name, scores[name]))
+        yaml.safe_dump(params, f, default_flow_style=False)
+
+def main():
+    parser = argparse.ArgumentParser(description='Tune the line planner zone parameters by parallel offline simulation')
+    parser.add_argument('output', help='YAML file for the Pareto front')
+    parser.add_argument('--space', help='YAML search space (default: all zone parameters)')
+    parser.add_argument('--grid', action='store_true', help='evaluate all combinations of a space of value lists')
+    parser.add_argument('--candidates', type=int, default=200, help='number of random candidates')
+    parser.add_argument('--scenarios', type=int, default=20, help='number of simulated line goals per candidate')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--length', type=float, default=10.0, help='line length [m]')
+    parser.add_argument('--max-acceleration', type=float, default=None, help='acceleration limit of the model (default: none)')
+    parser.add_argument('--max-time', type=float, default=120.0, help='simulation time limit per goal [s]')
+    parser.add_argument('--processes', type=int, default=None, help='number of worker processes (default: all cores)')
+    parser.add_argument('--launch-dir', help='directory for one parameter file per front member')
+    args = parser.parse_args()
+
+    space = tuning.default_space
+    if args.space :
+        with open(args.space) as f :
+            space = yaml.safe_load(f)
+    if args.grid :
+        candidates = tuning.grid_candidates(space)
+    else :
+        candidates = tuning.random_candidates(space, args.candidates, args.seed)
+    candidates = [c for c in candidates if tuning.is_valid(c)]
+    scenarios = tuning.line_scenarios(args.scenarios, args.length, seed=args.seed)
+
+    print "Evaluating %d candidates on %d scenarios" % (len(candidates), len(scenarios))
+    jobs = [(c, scenarios, args.length, args.max_time, args.max_acceleration) for c in candidates]
+    pool = multiprocessing.Pool(args.processes, init_worker)
+    wall = time.time()
+    results = []
+    for result in pool.imap_unordered(evaluate_candidate, jobs) :
+        results.append(result)
+        if len(results) % 10 == 0 :
+            print "%d/%d candidates evaluated" % (len(results), len(jobs))
+    pool.close()
+    pool.join()
+    print "Evaluated in %.1f s" % (time.time() - wall)
+
+    # Only candidates reaching every goal are eligible, unless none does
+    complete = [r for r in results if r[1]["succeeded"] == len(scenarios)]
+    if not complete :
+        print "Warning: no candidate reached all goals"
+        complete = results
+    front = tuning.pareto_front(complete)
+
+    with open(args.output, "w") as f :
+        yaml.safe_dump([{"scores" : scores, "params" : params} for (params, scores) in front], f, default_flow_style=False)
+    print "Pareto front of %d candidates written to %s" % (len(front), args.output)
+    for (params, scores) in front :
+        print "  xte rms %.3f m  time %.2f s  effort %.2f rad" % (scores["cross_track_rms"], scores["time_to_goal"], scores["angular_effort"])
+
+    if args.launch_dir :
+        if not os.path.isdir(args.launch_dir) :
+            os.makedirs(args.launch_dir)
+        for (i, (params, scores)) in enumerate(front) :
+            write_params(os.path.join(args.launch_dir, "front_%02d.yaml" % i), params, scores)
+
+if __name__ == '__main__':
+    main()
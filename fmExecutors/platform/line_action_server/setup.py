@@ -4,7 +4,7 @@ from distutils.core import setup
 from catkin_pkg.python_setup import generate_distutils_setup
 
 d = generate_distutils_setup(
-  scripts=['scripts/lineGoalActionServer.py'],
+  scripts=['scripts/lineGoalActionServer.py','scripts/simulate_planner.py','scripts/tune_line_planner.py'],
   packages=['line_control','line_smach'],
   package_dir={'':'src'}
 )
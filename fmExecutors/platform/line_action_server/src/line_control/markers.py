@@ -25,54 +25,112 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #****************************************************************************/
-from visualization_msgs.msg import Marker
+from visualization_msgs.msg import Marker, MarkerArray
 from geometry_msgs.msg import Point
 import rospy,math
 
 class MarkerUtility():
     """
         Simple utility class to implement different debugging markers
+        
+        By default every update builds a new Marker and publishes it on the topic.
+        If a rate is given the utility runs batched: one marker per namespace is
+        allocated on first use and updated in place, and all markers are published
+        together as one MarkerArray by publish(), at most rate times per second and
+        only while someone subscribes. In batched mode the updates take sequences of
+        coordinate pairs (Vectors or tuples) instead of Points, and isDue() tells if
+        the next publish() will send anything, so callers can skip computing the
+        marker contents altogether. A rate of zero or less disables the batched
+        markers: isDue() is always False and publish() sends nothing.
     """
-    def __init__(self,topic,frame):
-        self.publisher = rospy.Publisher(topic, Marker)
+    def __init__(self,topic,frame,rate=None):
         self.frame = frame
+        self.batched = rate is not None
+        if self.batched :
+            self.publisher = rospy.Publisher(topic, MarkerArray)
+            self.array = MarkerArray()
+            self.markers = {}
+            self.enabled = rate > 0
+            if self.enabled :
+                self.period = rospy.Duration(1.0/rate)
+            self.next_publish = rospy.Time(0)
+        else :
+            self.publisher = rospy.Publisher(topic, Marker)
         
-    def updateLine(self, point_list):
-        marker = Marker()
-        marker.points = point_list 
-        marker.header.frame_id = self.frame
-        marker.type = marker.LINE_STRIP
-        marker.action = marker.ADD
-        marker.scale.x = 0.1
-        marker.color.a = 0.8
-        marker.color.r = 1.0
-        marker.color.g = 1.0
-        marker.color.b = 0.0
-       
-        marker.pose.orientation.w = 1.0
-        marker.pose.position.x = 0
-        marker.pose.position.y = 0 
-        marker.pose.position.z = 0
-        self.publisher.publish(marker)
+    def isDue(self):
+        """
+            True if the batched markers should be updated and published now
+        """
+        if not self.batched :
+            return True
+        return self.enabled and self.publisher.get_num_connections() > 0 and rospy.Time.now() >= self.next_publish
+    
+    def publish(self):
+        """
+            Publish the batched markers if due
+        """
+        if self.isDue() :
+            self.next_publish = rospy.Time.now() + self.period
+            self.publisher.publish(self.array)
+            
+    def updateLine(self, point_list, ns=""):
+        if self.batched :
+            self.setPoints(self.getMarker(ns, Marker.LINE_STRIP), point_list)
+        else :
+            marker = Marker()
+            marker.points = point_list 
+            self.setStyle(marker, Marker.LINE_STRIP)
+            self.publisher.publish(marker)
     
-    def updatePoint(self, point_list):
-        marker = Marker()
-        marker.points = point_list
+    def updatePoint(self, point_list, ns=""):
+        if self.batched :
+            self.setPoints(self.getMarker(ns, Marker.POINTS), point_list)
+        else :
+            marker = Marker()
+            marker.points = point_list
+            self.setStyle(marker, Marker.POINTS)
+            self.publisher.publish(marker)
+        
+    def getMarker(self, ns, marker_type):
+        """
+            Preallocated marker of the namespace, created on first use
+        """
+        if ns not in self.markers :
+            marker = Marker()
+            marker.ns = ns
+            self.setStyle(marker, marker_type)
+            self.markers[ns] = marker
+            self.array.markers.append(marker)
+        return self.markers[ns]
+        
+    def setPoints(self, marker, coordinates):
+        """
+            Copy coordinate pairs into the points of the marker, reusing the Point objects
+        """
+        points = marker.points
+        n = len(coordinates)
+        while len(points) < n :
+            points.append(Point())
+        del points[n:]
+        for i in xrange(n) :
+            points[i].x = coordinates[i][0]
+            points[i].y = coordinates[i][1]
+            
+    def setStyle(self, marker, marker_type):
         marker.header.frame_id = self.frame
-        marker.type = marker.POINTS
+        marker.type = marker_type
         marker.action = marker.ADD
         marker.scale.x = 0.1
-        marker.scale.y = 0.1
         marker.color.a = 0.8
         marker.color.r = 1.0
         marker.color.g = 1.0
-        marker.color.b = 1.0
+        if marker_type == Marker.POINTS :
+            marker.scale.y = 0.1
+            marker.color.b = 1.0
+        else :
+            marker.color.b = 0.0
        
         marker.pose.orientation.w = 1.0
         marker.pose.position.x = 0
         marker.pose.position.y = 0 
         marker.pose.position.z = 0
-        self.publisher.publish(marker)
-        
-        
-    
\ No newline at end of file
@@ -25,14 +25,18 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #****************************************************************************/
-import rospy, tf, math
+import rospy, tf, math, time, threading
 import numpy as np
 from simple_2d_math.vector import Vector
+from simple_2d_math.moving_average import MovingAverage
+from simple_2d_math.segment_index import SegmentIndex
+from simple_2d_math.histogram import Histogram
 from nav_msgs.msg import Odometry
-from geometry_msgs.msg import TwistStamped, Point
+from geometry_msgs.msg import TwistStamped
 from line_control.markers import MarkerUtility
-from velocity_control import Controller
-from tf import TransformListener
+from velocity_control.velocity_control import Controller
+from pose_provider import pose_provider
+from loop_timing import loop_timing
 
 class LinePlanner():
     """
@@ -64,30 +68,62 @@ class LinePlanner():
         1,10,100 : Slower transitions is good for a slowly reacting robot
         
         The filter size acts as a low pass filter so higher filter size means slower reaction, but more robust to noisy sensors
+        
+        A goal may also be a polyline (the path field of the goal), which is followed segment by segment within the
+        same goal. The planner switches to the next segment when the projection of the robot passes the end of the
+        current one. Vertices turning more than path_blend_angle are stop vertices, which are driven like the end of
+        a line goal followed by a new goal. Before other vertices the rabbit is carried around them: it is placed at
+        least rabbit factor times path_lookahead ahead along the path, so the robot starts turning before the vertex
+        and keeps its speed through the corner. The distance to goal is the remaining length of the path up to the
+        next stop vertex or the end, so zone 4 only applies there. With resume_path set, a path is entered at the
+        segment nearest to the robot, found with a spatial index, when it repeats the path of a goal that was
+        preempted or replaced before it was reached, so an interrupted route can be resent and continued.
+        
+        With event_driven set, the control step is triggered by new pose data instead of the fixed period: each
+        odometry message, or with use_tf each tf message carrying a newer pose, wakes the loop, so the command is
+        computed from a pose that is milliseconds old and never twice from the same pose. Steps are at least
+        min_period apart, and if no pose arrives for watchdog_period the step runs anyway on the last pose. The
+        time from pose arrival to published twist is counted in the latency histogram, which is cleared when a goal
+        starts and logged when it ends, and in the command latency of the loop timer over the whole run.
+        
+        The compute time, period jitter and pose age of each step are recorded by the line_planner loop timer, see
+        loop_timing, which publishes them on timing_topic and dumps them to timing_file on shutdown. When running headless the timer is not reported.
+        
+        If a parameter dictionary is given, the planner runs headless: parameters are read from the dictionary
+        instead of the parameter server and no publishers, subscribers, tf listener or markers are created.
+        Time, twist output and pose feedback are then injected through the clock argument, the sleep and
+        publishTwist method pointers and setPose, as done by the offline simulator in line_control.simulator.
         """
-    def __init__(self):
+    def __init__(self, params=None, clock=None):
+        self.params = params
+        self.headless = params is not None
+        
         # Init line
         self.rabbit_factor = 0.2
         self.line_begin = Vector(0,0)
         self.line_end = Vector(0,5)
         self.line = Vector(self.line_end[0]-self.line_begin[0],self.line_end[1]-self.line_begin[1])
+        self.path = [self.line_begin.copy(), self.line_end.copy()]
+        self.remaining = [0.0]
+        self.segment = 0
+        self.interrupted_path = None
         self.yaw = 0.0
         
         # Init control methods
         self.isNewGoalAvailable = self.empty_method()
         self.isPreemptRequested = self.empty_method()
         self.setPreempted = self.empty_method()
+        self.clock = clock or rospy.Time.now
         
         # Get parameters from parameter server
         self.getParameters()
         
         # Set up markers for rviz
-        self.point_marker = MarkerUtility("/point_marker" , self.odom_frame)
-        self.line_marker = MarkerUtility("/line_marker" , self.odom_frame)
-        self.pos_marker = MarkerUtility("/pos_marker" , self.odom_frame)
+        if not self.headless :
+            self.markers = MarkerUtility(self.marker_topic, self.odom_frame, self.marker_rate)
         
         # Init velocity control
-        self.controller = Controller()    
+        self.controller = Controller(params, self.now)    
         self.distance_to_goal = 0
         self.angle_error = 0
         self.goal_angle_error = 0
@@ -95,12 +131,23 @@ class LinePlanner():
         self.sp_angular = 0
         self.distance_to_line = 0
         
-        # Init TF listener
-        self.__listen = TransformListener()    
+        # Init shared tf pose
+        self.pose_stamp = None
+        if self.use_tf and not self.headless :
+            self.pose_provider = pose_provider.get_provider(self.odom_frame, self.base_frame)
+        
+        # Init loop timing, event driven steps have no nominal period
+        loop_period = self.period
+        if self.event_driven :
+            loop_period = None
+        if self.headless :
+            self.timing = loop_timing.LoopTimer("line_planner", loop_period)
+        else :
+            self.timing = loop_timing.get_timer("line_planner", loop_period)
+            loop_timing.start_reporting()
         
         # Init planner
         self.corrected = False
-        self.rate = rospy.Rate(1/self.period)
         self.twist = TwistStamped()
         self.quaternion = np.empty((4, ), dtype=np.float64)
         
@@ -114,75 +161,130 @@ class LinePlanner():
         self.projection = Vector(1,0) # Projection of the position vector on the line
         
         # Set up circular buffer for filter
-        self.zone_filter = [self.z3_value]*self.z_filter_size
+        self.zone_filter = MovingAverage(self.z_filter_size, self.z3_value)
         self.zone = 2
-        self.z_ptr = 0
         
         # Setup Publishers and subscribers 
-        if not self.use_tf :
-            self.odom_sub = rospy.Subscriber(self.odometry_topic, Odometry, self.onOdometry )
-        self.twist_pub = rospy.Publisher(self.cmd_vel_topic, TwistStamped)
+        if not self.headless :
+            if not self.use_tf :
+                self.odom_sub = rospy.Subscriber(self.odometry_topic, Odometry, self.onOdometry )
+            self.twist_pub = rospy.Publisher(self.cmd_vel_topic, TwistStamped)
+            self.rate = rospy.Rate(1/self.period)
+            self.publishTwist = self.twist_pub.publish
+            self.sleep = self.rate.sleep
+            
+            # Trigger the control step on new pose data
+            if self.event_driven :
+                self.pose_event = threading.Event()
+                self.pose_lock = threading.Lock()
+                self.pose_received = None
+                self.trigger_time = None
+                self.last_step = time.time()
+                self.watchdog_ticks = 0
+                self.latency = Histogram(0.0005, 400)
+                if self.use_tf :
+                    self.tf_sub = rospy.Subscriber(self.tf_topic, rospy.AnyMsg, self.onTransform)
+                self.watchdog = rospy.Timer(rospy.Duration(self.watchdog_period/4), self.onWatchdog)
+                rospy.on_shutdown(self.pose_event.set)
+                self.publishTwist = self.publishTriggered
+                self.sleep = self.waitForPose
+        
+    def get_param(self, name, default):
+        """
+            Get a parameter from the parameter dictionary if given, otherwise from the parameter server
+        """
+        if self.params is None :
+            return rospy.get_param(name, default)
+        return self.params.get(name.lstrip("~"), default)
+        
+    def now(self):
+        """
+            Current time from the clock method pointer
+        """
+        return self.clock()
         
     def getParameters(self):
         # Get topics and transforms
-        self.cmd_vel_topic = rospy.get_param("~cmd_vel_topic","/fmSignals/cmd_vel")
-        self.odom_frame = rospy.get_param("~odom_frame","/odom")
-        self.odometry_topic = rospy.get_param("~odometry_topic","/fmKnowledge/odom")
-        self.base_frame = rospy.get_param("~base_frame","/base_footprint")
-        self.use_tf = rospy.get_param("~use_tf",True)
+        self.cmd_vel_topic = self.get_param("~cmd_vel_topic","/fmSignals/cmd_vel")
+        self.odom_frame = self.get_param("~odom_frame","/odom")
+        self.odometry_topic = self.get_param("~odometry_topic","/fmKnowledge/odom")
+        self.base_frame = self.get_param("~base_frame","/base_footprint")
+        self.use_tf = self.get_param("~use_tf",True)
+        self.max_pose_age = self.get_param("~max_pose_age",pose_provider.default_max_age)
+        self.marker_topic = self.get_param("~marker_topic","/line_planner_markers")
+        self.marker_rate = self.get_param("~marker_rate",5.0)
+        self.tf_topic = self.get_param("~tf_topic","/tf")
         
         # Get general parameters
-        self.period = rospy.get_param("~period",0.1)
-        self.max_linear_velocity = rospy.get_param("~max_linear_velocity",2)
-        self.max_angular_velocity = rospy.get_param("~max_angular_velocity",1)
-        self.max_distance_error = rospy.get_param("~max_distance_error",0.05)
+        self.period = self.get_param("~period",0.1)
+        self.event_driven = self.get_param("~event_driven",False)
+        self.min_period = self.get_param("~min_period",0.01)
+        self.watchdog_period = self.get_param("~watchdog_period",2*self.period)
+        self.max_linear_velocity = self.get_param("~max_linear_velocity",2)
+        self.max_angular_velocity = self.get_param("~max_angular_velocity",1)
+        self.max_distance_error = self.get_param("~max_distance_error",0.05)
+        self.path_lookahead = self.get_param("~path_lookahead",2.0)
+        self.path_blend_angle = self.get_param("~path_blend_angle",math.pi/3)
+        self.resume_path = self.get_param("~resume_path",False)
                
         # Get control parameters
-        self.retarder = rospy.get_param("~retarder",0.8)    
+        self.retarder = self.get_param("~retarder",0.8)    
         
         # Get zone parameters       
-        self.z1_value = rospy.get_param("~zone1_value",1)
-        self.z1_lin_vel = rospy.get_param("~zone1_linear_velocity",0.1)
-        self.z1_ang_vel = rospy.get_param("~zone1_angular_velocity",0.2)
-        self.z1_rabbit = rospy.get_param("~zone1_rabbit_factor",0.8)
-        self.z1_max_distance = rospy.get_param("~zone1_max_distance_to_line",0.05)
-        self.z1_max_angle = rospy.get_param("~zone1_max_angle_error",math.pi/36)
-        
-        self.z2_value = rospy.get_param("~zone2_value",5)
-        self.z2_lin_vel = rospy.get_param("~zone2_linear_velocity",0.1)
-        self.z2_ang_vel = rospy.get_param("~zone2_angular_velocity",0.8)
-        self.z2_rabbit = rospy.get_param("~zone2_rabbit_factor",0.7)
-        self.z2_max_distance = rospy.get_param("~zone2_max_distance_to_line",0.25)
-        self.z2_max_angle = rospy.get_param("~zone2_max_angle_error",math.pi/6)
-        
-        self.z3_value = rospy.get_param("~zone3_value",10)
-        self.z3_lin_vel = rospy.get_param("~zone3_linear_velocity",0.1)
-        self.z3_ang_vel = rospy.get_param("~zone3_angular_velocity",1.2)
-        self.z3_rabbit = rospy.get_param("~zone3_rabbit_factor",0.6)
-        
-        self.z4_distance_to_target = rospy.get_param("~zone4_distance_to_target",0.4)
-        self.z_filter_size = rospy.get_param("~transition_filter_size",10)
+        self.z1_value = self.get_param("~zone1_value",1)
+        self.z1_lin_vel = self.get_param("~zone1_linear_velocity",0.4)
+        self.z1_ang_vel = self.get_param("~zone1_angular_velocity",0.2)
+        self.z1_rabbit = self.get_param("~zone1_rabbit_factor",0.8)
+        self.z1_max_distance = self.get_param("~zone1_max_distance_to_line",0.05)
+        self.z1_max_angle = self.get_param("~zone1_max_angle_error",math.pi/36)
+        
+        self.z2_value = self.get_param("~zone2_value",5)
+        self.z2_lin_vel = self.get_param("~zone2_linear_velocity",0.25)
+        self.z2_ang_vel = self.get_param("~zone2_angular_velocity",0.8)
+        self.z2_rabbit = self.get_param("~zone2_rabbit_factor",0.7)
+        self.z2_max_distance = self.get_param("~zone2_max_distance_to_line",0.25)
+        self.z2_max_angle = self.get_param("~zone2_max_angle_error",math.pi/6)
+        
+        self.z3_value = self.get_param("~zone3_value",10)
+        self.z3_lin_vel = self.get_param("~zone3_linear_velocity",0.1)
+        self.z3_ang_vel = self.get_param("~zone3_angular_velocity",1.2)
+        self.z3_rabbit = self.get_param("~zone3_rabbit_factor",0.6)
+        
+        self.z4_distance_to_target = self.get_param("~zone4_distance_to_target",0.4)
+        self.z_filter_size = self.get_param("~transition_filter_size",10)
 
     def stop(self):
         # Publish a zero twist to stop the robot
-        self.twist.header.stamp = rospy.Time.now()
+        self.twist.header.stamp = self.now()
         self.sp_angular = 0
         self.twist.twist.angular.z = 0
-        self.twist_pub.publish(self.twist)
+        self.publishTwist(self.twist)
                 
     def execute(self,goal):
-        # Construct a vector from line goal
-        self.line_begin[0] = goal.a_x
-        self.line_begin[1] = goal.a_y  
-        self.line_end[0] = goal.b_x
-        self.line_end[1] = goal.b_y 
-        self.line = Vector(self.line_end[0]-self.line_begin[0],self.line_end[1]-self.line_begin[1])      
-        rospy.loginfo(rospy.get_name() + " Received goal: (%f,%f) to (%f,%f) ",goal.a_x,goal.a_y,goal.b_x,goal.b_y)
+        # Construct the path from the polyline or line goal
+        if len(goal.path) > 1 :
+            points = [(p.x,p.y) for p in goal.path]
+            self.setPath([Vector(x,y) for (x,y) in points])
+            rospy.loginfo(rospy.get_name() + " Received goal: path of %d points to (%f,%f) ",len(self.path),self.path[-1][0],self.path[-1][1])
+            # Only a resent interrupted path is continued, a new path starts at its beginning
+            if self.resume_path and points == self.interrupted_path :
+                self.get_current_position()
+                self.resumePath()
+            self.interrupted_path = points
+        else :
+            self.setPath([Vector(goal.a_x,goal.a_y), Vector(goal.b_x,goal.b_y)])
+            rospy.loginfo(rospy.get_name() + " Received goal: (%f,%f) to (%f,%f) ",goal.a_x,goal.a_y,goal.b_x,goal.b_y)
+            self.interrupted_path = None
         
         # Clear filter
-        self.zone_filter = [self.z3_value]*self.z_filter_size
+        self.zone_filter.reset(self.z3_value)
         self.corrected = False
         self.target_area = False
+        if self.event_driven and not self.headless :
+            self.last_step = time.time()
+            self.watchdog_ticks = 0
+            self.trigger_time = None
+            self.latency.reset()
         
         while not rospy.is_shutdown() :
             
@@ -197,29 +299,40 @@ class LinePlanner():
                 break
             
             # Update vectors
+            self.timing.start()
             self.update()
+            if self.pose_stamp is not None :
+                self.timing.poseAge((self.now() - self.pose_stamp).to_sec())
             
             # Publish markers for rviz
-            self.line_marker.updateLine( [ Point(self.line_begin[0],self.line_begin[1],0) , Point(self.line_end[0],self.line_end[1],0) ] )
-            self.point_marker.updatePoint( [ Point(self.rabbit[0],self.rabbit[1],0) ] )
-            self.pos_marker.updatePoint( [ Point(self.position[0],self.position[1],0) ] )
+            if not self.headless and self.markers.isDue() :
+                self.markers.updateLine(self.path, "line")
+                self.markers.updatePoint([self.rabbit], "rabbit")
+                self.markers.updatePoint([self.position], "position")
+                self.markers.publish()
             
             # If the goal is unreached
-            if self.distance_to_goal > self.max_distance_error :             
+            if self.distance_to_goal > self.max_distance_error or not self.isLastSegment() :
                 # Spin the loop
                 self.control_loop()
+                self.timing.stop()
                 
                 # Block   
                 try :
-                    self.rate.sleep()
+                    self.sleep()
                 except rospy.ROSInterruptException:
                     print("Interrupted during sleep")
                     return 'preempted'
             else:
                 # Success - position has been reached
                 rospy.loginfo(rospy.get_name() + " Goal reached in distance: %f m",self.distance_to_goal)
-                self.stop()            
+                self.stop()
+                self.interrupted_path = None
                 break
+        self.timing.pause()
+        
+        if self.event_driven and not self.headless :
+            rospy.loginfo(rospy.get_name() + " Pose to command latency [s]: %s, %d watchdog steps",self.latency,self.watchdog_ticks)
         
         # Return statement
         if self.isPreemptRequested() :
@@ -235,55 +348,121 @@ class LinePlanner():
             print("Returning due to success")            
             return 'succeeded'     
 
+    def setPath(self, points):
+        """
+            Set the polyline to follow and start at its first segment
+        """
+        self.path = points
+        
+        # Vertices turning more than the blend angle are stopped at like the end of the path
+        self.stop_vertex = [True]*(len(points)-1)
+        for i in xrange(len(points)-2) :
+            turn = (points[i+1] - points[i]).signedAngle(points[i+2] - points[i+1])
+            self.stop_vertex[i] = math.fabs(turn) > self.path_blend_angle
+        
+        # Length of the path after the end of each segment up to the next stop vertex
+        self.remaining = [0.0]*(len(points)-1)
+        for i in xrange(len(points)-3, -1, -1) :
+            if not self.stop_vertex[i] :
+                self.remaining[i] = self.remaining[i+1] + (points[i+2] - points[i+1]).length()
+        self.path_index = SegmentIndex.fromPath(points)
+        self.setSegment(0)
+        
+    def resumePath(self):
+        """
+            Continue the path from the segment nearest to the current position
+        """
+        (segment, distance) = self.path_index.nearest(self.position)
+        if segment :
+            rospy.loginfo(rospy.get_name() + " Resuming path at segment %d, %f m from the robot",segment,distance)
+            self.setSegment(segment)
+        
+    def setSegment(self, segment):
+        self.segment = segment
+        self.line_begin.set(self.path[segment][0], self.path[segment][1])
+        self.line_end.set(self.path[segment+1][0], self.path[segment+1][1])
+        self.line = self.line_end - self.line_begin
+        
+    def isLastSegment(self):
+        return self.segment >= len(self.path) - 2
+        
+    def isStopSegment(self):
+        return self.stop_vertex[self.segment]
+        
+    def isSegmentDone(self):
+        """
+            True when the projection of the robot has passed the end of the segment, or the robot has reached
+            the end of a segment ending at a stop vertex
+        """
+        if (self.position - self.line_begin).dotWith(self.line) >= self.line.dotWith(self.line) :
+            return True
+        return self.isStopSegment() and (self.line_end - self.position).length() <= self.max_distance_error
+        
+    def pointAlongPath(self, distance):
+        """
+            Point the given distance along the path after the end of the current segment
+        """
+        for i in xrange(self.segment+1, len(self.path)-1) :
+            direction = self.path[i+1] - self.path[i]
+            length = direction.length()
+            if distance <= length :
+                return direction.scale(distance/length) + self.path[i]
+            distance -= length
+        return self.path[-1].copy()
+        
     def update(self):
         # Get current pose and send it to controller
         self.get_current_position()
         self.heading = Vector(math.cos(self.yaw), math.sin(self.yaw))
         self.controller.setFeedback(self.position,self.heading) 
         
+        # Switch to the next segment when the end of the current segment is passed, leaving a stop vertex
+        # like a new goal is started
+        while not self.isLastSegment() and self.isSegmentDone() :
+            if self.isStopSegment() :
+                self.zone_filter.reset(self.z3_value)
+                self.corrected = False
+            self.setSegment(self.segment + 1)
+        
         # Construct projection vector, perpendicular vector path vectors and rabbit vector
         self.projection = (self.position - self.line_begin).projectedOn(self.line)
         if self.projection.angle(self.line) > 0.1 or self.projection.angle(self.line) < -0.1 :
             self.projection = self.projection.scale(-1)
         self.perpendicular = self.projection - self.position + self.line_begin
-        self.goal_path = self.line_end - self.position
+        self.goal_path = self.path[-1] - self.position
         self.rabbit = self.line - self.projection
-        self.rabbit = self.rabbit.scale(self.rabbit_factor)
-        self.rabbit += self.line_begin
-        self.rabbit += self.projection  
+        if self.isStopSegment() :
+            self.rabbit = self.rabbit.scale(self.rabbit_factor)
+            self.rabbit += self.line_begin
+            self.rabbit += self.projection  
+            self.distance_to_goal = (self.line_end - self.position).length()
+        else :
+            # Carry the rabbit around the coming vertices up to the next stop vertex
+            to_segment_end = self.rabbit.length()
+            self.distance_to_goal = to_segment_end + self.remaining[self.segment]
+            rabbit_distance = self.rabbit_factor * max(to_segment_end, min(self.path_lookahead, self.distance_to_goal))
+            if rabbit_distance > to_segment_end :
+                self.rabbit = self.pointAlongPath(rabbit_distance - to_segment_end)
+            else :
+                self.rabbit = self.rabbit.scale(self.rabbit_factor)
+                self.rabbit += self.line_begin
+                self.rabbit += self.projection  
         self.rabbit_path = self.rabbit - Vector(self.position[0], self.position[1])
         
         # Calculate distances
-        self.distance_to_goal = self.goal_path.length()
         self.distance_to_line = self.perpendicular.length()
         
-        # Calculate angle between heading vector and goal/rabbit path vector
-        self.angle_error = self.heading.angle(self.rabbit_path)
-        # Rotate the heading vector according to the calculated angle and test correspondence
-        # with the path vector. If not zero sign must be flipped. This is to avoid the sine trap.
-        t1 = self.heading.rotate(self.angle_error)
-        if self.rabbit_path.angle(t1) != 0 :
-            self.angle_error = -self.angle_error
-                        
-        self.goal_angle_error = self.heading.angle(self.goal_path)
-        # Avoid the sine trap.
-        t1 = self.heading.rotate(self.goal_angle_error)
-        if self.goal_path.angle(t1) != 0 :
-            self.goal_angle_error = -self.goal_angle_error
+        # Calculate signed angle between heading vector and goal/rabbit path vector
+        self.angle_error = self.heading.signedAngle(self.rabbit_path)
+        self.goal_angle_error = self.heading.signedAngle(self.goal_path)
             
         # Determine zone
         if self.distance_to_line < self.z1_max_distance and math.fabs(self.angle_error) < self.z1_max_angle :
-            self.zone_filter[self.z_ptr] = self.z1_value
+            self.zone = self.zone_filter.update(self.z1_value)
         elif self.distance_to_line < self.z2_max_distance and math.fabs(self.angle_error) < self.z2_max_angle :
-            self.zone_filter[self.z_ptr] = self.z2_value
+            self.zone = self.zone_filter.update(self.z2_value)
         else :
-            self.zone_filter[self.z_ptr] = self.z3_value
-                
-        self.z_ptr = self.z_ptr + 1
-        if self.z_ptr >= self.z_filter_size :
-            self.z_ptr = 0  
-        
-        self.zone = (sum(self.zone_filter)/len(self.zone_filter))
+            self.zone = self.zone_filter.update(self.z3_value)
         if self.zone < (self.z1_value + ( (self.z2_value - self.z1_value) /2) ) :
             self.corrected = True
             self.rabbit_factor = self.z1_rabbit
@@ -333,7 +512,7 @@ class LinePlanner():
         # If not preempted, add a time stamp and publish the twist
         if not self.isPreemptRequested() :       
             self.twist = self.controller.generateTwist(self.sp_linear,self.sp_angular)           
-            self.twist_pub.publish(self.twist)
+            self.publishTwist(self.twist)
         
     def onOdometry(self, msg):
         """
@@ -349,6 +528,105 @@ class LinePlanner():
         # Extract the position vector
         self.position[0] = msg.pose.pose.position.x
         self.position[1] = msg.pose.pose.position.y
+        self.pose_stamp = msg.header.stamp
+        
+        if self.event_driven :
+            self.poseReceived()
+    
+    def onTransform(self, msg):
+        """
+            Callback method for tf messages in event driven mode, wakes the loop to look for a newer pose
+        """
+        self.poseReceived()
+    
+    def poseReceived(self):
+        """
+            Record the arrival of new pose data and wake the loop
+        """
+        with self.pose_lock :
+            self.pose_received = time.time()
+        self.pose_event.set()
+    
+    def isNewTransform(self):
+        """
+            Check if the pose provider has a newer pose than the one of the previous step
+        """
+        pose = self.pose_provider.getPose(None)
+        if pose and pose[3] != self.pose_stamp :
+            self.pose_stamp = pose[3]
+            return True
+        return False
+    
+    def onWatchdog(self, event):
+        """
+            Timer callback waking the loop when no pose has arrived for watchdog_period
+        """
+        if time.time() - self.last_step >= self.watchdog_period :
+            self.pose_event.set()
+    
+    def waitForPose(self):
+        """
+            Block until new pose data arrives, keeping at least min_period between steps.
+            Poses arriving within min_period of the previous step are coalesced and acted on
+            when it has passed. Returns without new data when the watchdog timer finds that
+            watchdog_period has passed since the previous step.
+        """
+        # Rate limit
+        delay = self.last_step + self.min_period - time.time()
+        if delay > 0 :
+            time.sleep(delay)
+        
+        # Event.wait with a timeout polls in steps of up to 50 ms in python 2, so wait without one
+        self.trigger_time = None
+        while self.trigger_time is None :
+            self.pose_event.wait()
+            self.pose_event.clear()
+            if rospy.is_shutdown() :
+                raise rospy.ROSInterruptException("ROS shutdown request")
+            with self.pose_lock :
+                received = self.pose_received
+                self.pose_received = None
+            if received is None :
+                if time.time() - self.last_step >= self.watchdog_period :
+                    if not self.watchdog_ticks :
+                        rospy.logwarn(rospy.get_name() + " No pose update for %f s, stepping on the watchdog",self.watchdog_period)
+                    self.watchdog_ticks += 1
+                    break
+                continue
+            
+            # The tf listener receives the same message in its own thread, so give it a moment to catch up.
+            # Messages for other frames do not produce a newer pose and the wait goes on.
+            if self.use_tf :
+                settle = time.time() + 0.002
+                new = self.isNewTransform()
+                while not new and time.time() < settle :
+                    time.sleep(0.0005)
+                    new = self.isNewTransform()
+                if not new :
+                    continue
+            self.trigger_time = received
+        self.last_step = time.time()
+    
+    def publishTriggered(self, twist):
+        """
+            Publish the twist and count the time since the pose it was computed from arrived
+        """
+        self.twist_pub.publish(twist)
+        if self.trigger_time is not None :
+            latency = time.time() - self.trigger_time
+            self.latency.add(latency)
+            self.timing.commandLatency(latency)
+            self.trigger_time = None
+    
+    def setPose(self, x, y, yaw, linear_velocity=0.0, angular_velocity=0.0):
+        """
+            Set the current pose directly, used for injecting pose feedback when running headless.
+            The velocities are accepted for symmetry with the position planner but not used, since
+            the velocity controller estimates them from consecutive poses.
+        """
+        self.position[0] = x
+        self.position[1] = y
+        self.yaw = yaw
     
     def empty_method(self):
         """
@@ -360,13 +638,11 @@ class LinePlanner():
         """
             Get current position from tf
         """
-        if self.use_tf :     
-            try:
-                (position,head) = self.__listen.lookupTransform( self.odom_frame,self.base_frame,rospy.Time(0)) # The transform is returned as position (x,y,z) and an orientation quaternion (x,y,z,w).
-                self.position[0] = position[0]
-                self.position[1] = position[1]
-                (roll,pitch,self.yaw) = tf.transformations.euler_from_quaternion(head)
-            except (tf.LookupException, tf.ConnectivityException),err:
+        if self.use_tf and not self.headless :     
+            pose = self.pose_provider.getPose(self.max_pose_age)
+            if pose :
+                (self.position[0], self.position[1], self.yaw, self.pose_stamp) = pose
+            else :
                 rospy.loginfo("could not locate vehicle")             
 
             
\ No newline at end of file
@@ -0,0 +1,205 @@
+#/****************************************************************************
+# FroboMind simulator.py
+# Copyright (c) 2011-2013, author Leon Bonde Larsen <leon@bondelarsen.dk>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#****************************************************************************/
+"""
+    Offline closed loop simulation of the planners.
+    The real planner classes are run headless against a kinematic unicycle model
+    on a virtual clock, so scenarios execute as fast as the planner code allows
+    and without a ROS master. The planner drives the simulation itself: every
+    call to its sleep method advances the clock one period, integrates the model
+    with the last published twist and feeds the new pose back.
+
+    Example:
+        clock = VirtualClock()
+        planner = LinePlanner({"period":0.1}, clock.now)
+        sim = PlannerSimulation(planner, UnicycleModel(0,-0.5,0), clock)
+        result = sim.run(Goal(a_x=0, a_y=0, b_x=10, b_y=0))
+"""
+import rospy, math
+import numpy as np
+from simple_2d_math.vector import Vector
+from simple_2d_math.vector_array import VectorArray
+
+class Goal():
+    """
+        Plain goal holding the fields of a line goal (a_x, a_y, b_x, b_y or
+        path, a list of points with x and y) or a position goal (x, y)
+    """
+    path = []
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+class VirtualClock():
+    """
+        Simulation time in seconds, handed to the planners as their clock
+    """
+    def __init__(self, start=0.0):
+        self.time = start
+
+    def now(self):
+        return rospy.Time.from_sec(self.time)
+
+    def advance(self, dt):
+        self.time += dt
+
+class UnicycleModel():
+    """
+        Kinematic unicycle model of a differentially steered robot.
+        Velocity set points are followed within optional acceleration limits
+        and the pose is integrated exactly along the resulting arc.
+    """
+    def __init__(self, x=0.0, y=0.0, yaw=0.0, max_linear_acceleration=None, max_angular_acceleration=None):
+        self.x = x
+        self.y = y
+        self.yaw = yaw
+        self.linear = 0.0
+        self.angular = 0.0
+        self.max_linear_acceleration = max_linear_acceleration
+        self.max_angular_acceleration = max_angular_acceleration
+
+    def step(self, linear_sp, angular_sp, dt):
+        # Follow the set points within the acceleration limits
+        self.linear = self.limit(self.linear, linear_sp, self.max_linear_acceleration, dt)
+        self.angular = self.limit(self.angular, angular_sp, self.max_angular_acceleration, dt)
+
+        # Integrate along an arc, or a straight line for negligible turn rates
+        yaw = self.yaw + self.angular * dt
+        if math.fabs(self.angular) > 1e-9 :
+            radius = self.linear / self.angular
+            self.x += radius * (math.sin(yaw) - math.sin(self.yaw))
+            self.y -= radius * (math.cos(yaw) - math.cos(self.yaw))
+        else :
+            self.x += self.linear * dt * math.cos(self.yaw)
+            self.y += self.linear * dt * math.sin(self.yaw)
+        self.yaw = math.atan2(math.sin(yaw), math.cos(yaw))
+
+    def limit(self, current, sp, max_acceleration, dt):
+        if max_acceleration is None :
+            return sp
+        step = max_acceleration * dt
+        return current + max(-step, min(step, sp - current))
+
+def true_pose(model, time):
+    """
+        Default pose feedback: the exact pose and velocities of the model
+    """
+    return (model.x, model.y, model.yaw, model.linear, model.angular)
+
+class PlannerSimulation():
+    """
+        Closed loop simulation of a headless LinePlanner or PositionPlanner.
+
+        pose_feedback is a method taking the model and the simulation time and returning
+        (x, y, yaw, linear_velocity, angular_velocity) as seen by the planner, which allows
+        injecting sensor noise, bias or latency. The goal is preempted when max_time of
+        simulation time has passed.
+    """
+    def __init__(self, planner, model, clock, pose_feedback=true_pose, max_time=120.0):
+        self.planner = planner
+        self.model = model
+        self.clock = clock
+        self.pose_feedback = pose_feedback
+        self.max_time = max_time
+        self.period = planner.period
+
+        # Connect the planner to the simulation
+        planner.publishTwist = self.onTwist
+        planner.sleep = self.step
+        planner.isNewGoalAvailable = planner.empty_method
+        planner.isPreemptRequested = self.isTimedOut
+        planner.setPreempted = planner.empty_method
+        planner.setSucceeded = planner.empty_method
+
+        self.sp_linear = 0.0
+        self.sp_angular = 0.0
+        self.start_time = clock.time
+        self.trajectory = []
+
+    def run(self, goal):
+        """
+            Execute a goal and return a dictionary with the outcome and performance measures.
+            Cross track errors are measured from the true pose to the goal line, which for
+            position goals is the line from the start position to the goal. For paths the
+            distance to the nearest segment is used.
+        """
+        if len(goal.path) > 1 :
+            line = [(p.x, p.y) for p in goal.path]
+        elif hasattr(goal, "a_x") :
+            line = [(goal.a_x, goal.a_y), (goal.b_x, goal.b_y)]
+        else :
+            line = [(self.model.x, self.model.y), (goal.x, goal.y)]
+
+        self.sp_linear = 0.0
+        self.sp_angular = 0.0
+        self.start_time = self.clock.time
+        self.trajectory = [(self.clock.time, self.model.x, self.model.y, self.model.yaw, 0.0, 0.0)]
+        self.feedback()
+        outcome = self.planner.execute(goal)
+        return self.evaluate(outcome, line)
+
+    def step(self):
+        """
+            Sleep replacement: advance time one period and move the robot
+        """
+        self.model.step(self.sp_linear, self.sp_angular, self.period)
+        self.clock.advance(self.period)
+        self.trajectory.append((self.clock.time, self.model.x, self.model.y, self.model.yaw, self.sp_linear, self.sp_angular))
+        self.feedback()
+
+    def feedback(self):
+        self.planner.setPose(*self.pose_feedback(self.model, self.clock.time))
+
+    def onTwist(self, twist):
+        self.sp_linear = twist.twist.linear.x
+        self.sp_angular = twist.twist.angular.z
+
+    def isTimedOut(self):
+        return self.clock.time - self.start_time >= self.max_time
+
+    def evaluate(self, outcome, line):
+        trajectory = np.array(self.trajectory[1:] or self.trajectory)
+        positions = VectorArray(trajectory[:,1], trajectory[:,2])
+        if len(line) == 2 :
+            if line[0] != line[1] :
+                errors = np.fabs(positions.distanceToLine(Vector(*line[0]), Vector(*line[1])))
+            else :
+                errors = (positions - line[0]).length()
+        else :
+            errors = np.fabs(positions.distanceToSegment(Vector(*line[0]), Vector(*line[1])))
+            for i in xrange(1, len(line) - 1) :
+                errors = np.minimum(errors, positions.distanceToSegment(Vector(*line[i]), Vector(*line[i+1])))
+
+        return {
+            "outcome" : outcome,
+            "time" : self.clock.time - self.start_time,
+            "distance_to_goal" : math.hypot(line[-1][0] - self.model.x, line[-1][1] - self.model.y),
+            "cross_track_rms" : math.sqrt(np.mean(errors * errors)),
+            "cross_track_max" : float(errors.max()),
+            "angular_effort" : float(np.sum(np.fabs(trajectory[:,5]))) * self.period,
+            "steps" : len(self.trajectory) - 1
+        }
@@ -0,0 +1,142 @@
+#/****************************************************************************
+# FroboMind tuning.py
+# Copyright (c) 2011-2013, author Leon Bonde Larsen <leon@bondelarsen.dk>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#****************************************************************************/
+"""
+    Parameter tuning of the line planner by offline simulation.
+    Candidate parameter sets are drawn from a search space, every candidate
+    runs the same batch of simulated line goals and is scored on mean cross
+    track RMS error, mean time to goal and mean angular effort. Since the three
+    scores conflict, the result is the Pareto front of candidates that are not
+    beaten on all scores by any other candidate.
+
+    A search space maps parameter names (as the private ROS parameters) either
+    to a list of values or to a range:
+        zone1_rabbit_factor: {min: 0.5, max: 0.95}
+        transition_filter_size: [5, 10, 20]
+    Ranges with integer bounds are sampled as integers.
+"""
+import math, random, itertools
+from line_control.simulator import Goal, VirtualClock, UnicycleModel, PlannerSimulation
+from line_control.planner import LinePlanner
+
+score_names = ["cross_track_rms", "time_to_goal", "angular_effort"]
+
+default_space = {
+    "retarder" : {"min" : 0.5, "max" : 1.0},
+    "zone1_value" : [1],
+    "zone1_linear_velocity" : {"min" : 0.1, "max" : 1.0},
+    "zone1_angular_velocity" : {"min" : 0.1, "max" : 0.8},
+    "zone1_rabbit_factor" : {"min" : 0.5, "max" : 0.95},
+    "zone1_max_distance_to_line" : {"min" : 0.02, "max" : 0.2},
+    "zone1_max_angle_error" : {"min" : math.pi/72, "max" : math.pi/12},
+    "zone2_value" : {"min" : 2, "max" : 15},
+    "zone2_linear_velocity" : {"min" : 0.1, "max" : 0.8},
+    "zone2_angular_velocity" : {"min" : 0.2, "max" : 1.2},
+    "zone2_rabbit_factor" : {"min" : 0.4, "max" : 0.9},
+    "zone2_max_distance_to_line" : {"min" : 0.1, "max" : 0.5},
+    "zone2_max_angle_error" : {"min" : math.pi/12, "max" : math.pi/3},
+    "zone3_value" : {"min" : 10, "max" : 100},
+    "zone3_linear_velocity" : {"min" : 0.1, "max" : 0.5},
+    "zone3_angular_velocity" : {"min" : 0.5, "max" : 1.5},
+    "zone3_rabbit_factor" : {"min" : 0.2, "max" : 0.8},
+    "zone4_distance_to_target" : {"min" : 0.2, "max" : 1.0},
+    "transition_filter_size" : {"min" : 1, "max" : 20}
+}
+
+def sample_value(rnd, spec):
+    if isinstance(spec, dict) :
+        if isinstance(spec["min"], int) and isinstance(spec["max"], int) :
+            return rnd.randint(spec["min"], spec["max"])
+        return rnd.uniform(spec["min"], spec["max"])
+    return rnd.choice(spec)
+
+def random_candidates(space, n, seed=0):
+    """
+        Draw n random parameter sets from the search space
+    """
+    rnd = random.Random(seed)
+    names = sorted(space.keys())
+    return [dict((name, sample_value(rnd, space[name])) for name in names) for i in xrange(n)]
+
+def grid_candidates(space):
+    """
+        All combinations of a search space where every parameter is a list of values
+    """
+    names = sorted(space.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*[space[name] for name in names])]
+
+def is_valid(params):
+    """
+        The zone transitions only make sense for increasing zone values
+    """
+    return params.get("zone1_value", 1) < params.get("zone2_value", 5) < params.get("zone3_value", 10)
+
+def line_scenarios(n, length=10.0, max_offset=1.0, max_heading_error=math.pi/4, seed=0):
+    """
+        Start poses (offset from the line, heading error) for line goals from (0,0) to (length,0)
+    """
+    rnd = random.Random(seed)
+    return [(rnd.uniform(-max_offset, max_offset), rnd.uniform(-max_heading_error, max_heading_error)) for i in xrange(n)]
+
+def evaluate(params, scenarios, length=10.0, max_time=120.0, max_acceleration=None):
+    """
+        Run all scenarios with the given parameters and return the scores as a dictionary.
+        Goals that are not reached count with the full max_time as time to goal.
+    """
+    scores = dict((name, 0.0) for name in score_names)
+    succeeded = 0
+    for (offset, heading) in scenarios :
+        clock = VirtualClock()
+        planner = LinePlanner(params, clock.now)
+        model = UnicycleModel(0.0, offset, heading, max_acceleration, max_acceleration)
+        result = PlannerSimulation(planner, model, clock, max_time=max_time).run(Goal(a_x=0.0, a_y=0.0, b_x=length, b_y=0.0))
+        if result["outcome"] == "succeeded" :
+            succeeded += 1
+            scores["time_to_goal"] += float(result["time"])
+        else :
+            scores["time_to_goal"] += max_time
+        scores["cross_track_rms"] += float(result["cross_track_rms"])
+        scores["angular_effort"] += float(result["angular_effort"])
+
+    n = max(len(scenarios), 1)
+    for name in score_names :
+        scores[name] /= n
+    scores["succeeded"] = succeeded
+    return scores
+
+def dominates(a, b):
+    """
+        True if score a is at least as good as b on all scores and better on one
+    """
+    return all(a[name] <= b[name] for name in score_names) and any(a[name] < b[name] for name in score_names)
+
+def pareto_front(results):
+    """
+        Return the (params, scores) pairs not dominated by any other, sorted by cross track error
+    """
+    front = [r for r in results if not any(dominates(other[1], r[1]) for other in results)]
+    return sorted(front, key=lambda r: r[1]["cross_track_rms"])
@@ -2,7 +2,7 @@ import rospy
 import smach
 import smach_ros
 import actionlib
-from line_smach.states import get_next_line
+from line_smach.states import get_next_line, get_next_path
 from line_action_server import *
 from line_action_server.msg import *
 
@@ -16,4 +16,16 @@ def build(point_list):
                                transitions={'succeeded':'GET_NEXT','preempted':'preempted','aborted':'aborted'},
                                remapping={'a_x':'next_ax','a_y':'next_ay','b_x':'next_bx','b_y':'next_by'})
         
+    return behaviour
+
+def build_path(point_list):
+    behaviour = smach.StateMachine(outcomes=['success','preempted','aborted'])
+    with behaviour :
+        smach.StateMachine.add('GET_NEXT', get_next_path.getNextPath(point_list), 
+                               transitions={'succeeded':'FOLLOW_PATH', 'aborted':'aborted'})
+        smach.StateMachine.add('FOLLOW_PATH', 
+                               smach_ros.SimpleActionState('/platform_executors/lineActionServer', lineAction, goal_slots=['path']),
+                               transitions={'succeeded':'GET_NEXT','preempted':'preempted','aborted':'aborted'},
+                               remapping={'path':'next_path'})
+        
     return behaviour
\ No newline at end of file
@@ -0,0 +1,20 @@
+import rospy, smach, smach_ros
+
+class getNextPath(smach.State):
+    """
+        State giving the route as one path goal, one lap of the closed route at a time,
+        so the line planner can keep its speed through the corners instead of stopping at every point
+    """
+    def __init__(self,point_list):
+        smach.State.__init__(self, outcomes=['succeeded','aborted'], output_keys=['next_path'])
+        self.point_list = point_list
+        
+    def execute(self, userdata):
+        if len(self.point_list) > 1 :
+            # The list may grow while running, so the lap is built from it every time
+            userdata.next_path = list(self.point_list) + [self.point_list[0]]
+            rospy.loginfo("Setting goal to path of %d points through (%f,%f) ", len(userdata.next_path), self.point_list[0].x, self.point_list[0].y)
+            return 'succeeded'
+        else :
+            rospy.loginfo(rospy.get_name() + " GET_NEXT_PATH aborted because no line was present in list")
+            return 'aborted'
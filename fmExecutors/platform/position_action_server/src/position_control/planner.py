@@ -35,50 +35,65 @@ import numpy as np
 from simple_2d_math.vector import Vector
 from nav_msgs.msg import Odometry
 from geometry_msgs.msg import TwistStamped
-from tf import TransformListener
+from pose_provider import pose_provider
+from loop_timing import loop_timing
 
 class PositionPlanner():
     """
         Control class taking position goals and generating twist messages accordingly
+        
+        If a parameter dictionary is given, the planner runs headless: parameters are read from the dictionary
+        instead of the parameter server and no publishers, subscribers or tf listener are created.
+        Time, twist output and pose feedback are then injected through the clock argument, the sleep and
+        publishTwist method pointers and setPose, as done by the offline simulator in line_control.simulator.
+        
+        The compute time, period jitter and pose age of each iteration are recorded by the position_planner
+        loop timer, see loop_timing.
     """
-    def __init__(self):
+    def __init__(self, params=None, clock=None):
+        self.params = params
+        self.headless = params is not None
+        self.clock = clock or rospy.Time.now
+        
         # Init control methods
         self.isNewGoalAvailable = self.empty_method()
         self.isPreemptRequested = self.empty_method()
         self.setPreempted = self.empty_method()
         
         # Get topics and transforms
-        self.cmd_vel_topic = rospy.get_param("~cmd_vel_topic","/fmSignals/cmd_vel")
-        self.odom_frame = rospy.get_param("~odom_frame","/odom")
-        self.odometry_topic = rospy.get_param("~odometry_topic","/fmKnowledge/odom")
-        self.base_frame = rospy.get_param("~base_frame","/base_footprint")
-        self.use_tf = rospy.get_param("~use_tf",False)
+        self.cmd_vel_topic = self.get_param("~cmd_vel_topic","/fmSignals/cmd_vel")
+        self.odom_frame = self.get_param("~odom_frame","/odom")
+        self.odometry_topic = self.get_param("~odometry_topic","/fmKnowledge/odom")
+        self.base_frame = self.get_param("~base_frame","/base_footprint")
+        self.use_tf = self.get_param("~use_tf",False)
+        self.max_pose_age = self.get_param("~max_pose_age",pose_provider.default_max_age)
         
         # Get general parameters
-        self.max_linear_velocity = rospy.get_param("~max_linear_velocity",2)
-        self.max_angular_velocity = rospy.get_param("~max_angular_velocity",1)
-        self.max_initial_error = rospy.get_param("~max_initial_angle_error",1)
+        self.max_linear_velocity = self.get_param("~max_linear_velocity",2)
+        self.max_angular_velocity = self.get_param("~max_angular_velocity",1)
+        self.max_initial_error = self.get_param("~max_initial_angle_error",1)
 
-        self.max_distance_error = rospy.get_param("~max_distance_error",0.2)
-        self.use_tf = rospy.get_param("~use_tf",False)        
-        self.max_angle_error = rospy.get_param("~max_angle_error", math.pi/4)
-        self.retarder = rospy.get_param("~retarder", 0.8)
+        self.max_distance_error = self.get_param("~max_distance_error",0.2)
+        self.use_tf = self.get_param("~use_tf",False)        
+        self.max_angle_error = self.get_param("~max_angle_error", math.pi/4)
+        self.retarder = self.get_param("~retarder", 0.8)
         
         # Control loop
-        self.lin_p = rospy.get_param("~lin_p", 0.4)
-        self.lin_i = rospy.get_param("~lin_i", 0.6)
-        self.lin_d = rospy.get_param("~lin_d", 0.0)
-        self.ang_p = rospy.get_param("~ang_p", 0.8)
-        self.ang_i = rospy.get_param("~ang_i", 0.1)
-        self.ang_d = rospy.get_param("~ang_d", 0.05)
-        self.int_max = rospy.get_param("~int_max", 0.1)
+        self.lin_p = self.get_param("~lin_p", 0.4)
+        self.lin_i = self.get_param("~lin_i", 0.6)
+        self.lin_d = self.get_param("~lin_d", 0.0)
+        self.ang_p = self.get_param("~ang_p", 0.8)
+        self.ang_i = self.get_param("~ang_i", 0.1)
+        self.ang_d = self.get_param("~ang_d", 0.05)
+        self.int_max = self.get_param("~int_max", 0.1)
 
 
         # Setup Publishers and subscribers
-        if not self.use_tf :
-            self.odometry_topic = rospy.get_param("~odometry_topic","/fmKnowledge/odom")
-            self.odom_sub = rospy.Subscriber(self.odometry_topic, Odometry, self.onOdometry )
-        self.twist_pub = rospy.Publisher(self.cmd_vel_topic, TwistStamped)
+        if not self.headless :
+            if not self.use_tf :
+                self.odometry_topic = self.get_param("~odometry_topic","/fmKnowledge/odom")
+                self.odom_sub = rospy.Subscriber(self.odometry_topic, Odometry, self.onOdometry )
+            self.twist_pub = rospy.Publisher(self.cmd_vel_topic, TwistStamped)
                 
         # Parameters for action server
         self.period = 0.1
@@ -100,23 +115,44 @@ class PositionPlanner():
         self.sp_linear = 0.0
         self.sp_angular = 0.0
         
-        # Init TF listener
-        self.__listen = TransformListener()    
+        # Init shared tf pose
+        self.pose_stamp = None
+        if self.use_tf and not self.headless :
+            self.pose_provider = pose_provider.get_provider(self.odom_frame, self.base_frame)
+        
+        # Init loop timing
+        if self.headless :
+            self.timing = loop_timing.LoopTimer("position_planner", self.period)
+        else :
+            self.timing = loop_timing.get_timer("position_planner", self.period)
+            loop_timing.start_reporting()
         
         # Init controller
         self.corrected = False
-        self.rate = rospy.Rate(1/self.period)
         self.twist = TwistStamped()
         self.destination = Vector(0,0)
         self.position = Vector(0,0)
         self.heading = Vector(0,0)
+        self.yaw = 0.0
         self.quaternion = np.empty((4, ), dtype=np.float64)
           
         # Setup Publishers and subscribers
         self.use_tf = False 
-        if not self.use_tf :
-            self.odom_sub = rospy.Subscriber(self.odometry_topic, Odometry, self.onOdometry )
-        self.twist_pub = rospy.Publisher(self.cmd_vel_topic, TwistStamped)
+        if not self.headless :
+            if not self.use_tf :
+                self.odom_sub = rospy.Subscriber(self.odometry_topic, Odometry, self.onOdometry )
+            self.twist_pub = rospy.Publisher(self.cmd_vel_topic, TwistStamped)
+            self.rate = rospy.Rate(1/self.period)
+            self.publishTwist = self.twist_pub.publish
+            self.sleep = self.rate.sleep
+        
+    def get_param(self, name, default):
+        """
+            Get a parameter from the parameter dictionary if given, otherwise from the parameter server
+        """
+        if self.params is None :
+            return rospy.get_param(name, default)
+        return self.params.get(name.lstrip("~"), default)
         
     def execute(self,goal):
         # Construct a vector from position goal
@@ -135,10 +171,15 @@ class PositionPlanner():
                 break  
                               
             # If position is unreached, publish twist
-            if self.publish_twist(self.destination, self.destination) :    
+            self.timing.start()
+            unreached = self.publish_twist(self.destination, self.destination)
+            if self.pose_stamp is not None :
+                self.timing.poseAge((self.clock() - self.pose_stamp).to_sec())
+            self.timing.stop()
+            if unreached :    
                 # Block   
                 try :
-                    self.rate.sleep()
+                    self.sleep()
                 except rospy.ROSInterruptException:
                     return 'preempted'
             else:
@@ -146,6 +187,7 @@ class PositionPlanner():
                 self.setSucceeded()
                 self.stop()           
                 break
+        self.timing.pause()
             
         # Return state
         if self.isPreemptRequested() :
@@ -158,10 +200,10 @@ class PositionPlanner():
             
     def stop(self):
         # Publish a zero twist to stop the robot
-        self.twist.header.stamp = rospy.Time.now()
+        self.twist.header.stamp = self.clock()
         self.twist.twist.linear.x = 0
         self.twist.twist.angular.z = 0
-        self.twist_pub.publish(self.twist)
+        self.publishTwist(self.twist)
     
     def publish_twist(self,target,goal):
         """
@@ -184,29 +226,18 @@ class PositionPlanner():
                 
             # Calculate yaw
             if self.use_tf :
-                (roll,pitch,yaw) = tf.transformations.euler_from_quaternion(self.heading)
+                yaw = self.yaw
             else :
                 (roll,pitch,yaw) = tf.transformations.euler_from_quaternion(self.quaternion)
 
             # Construct heading vector
             head = Vector(math.cos(yaw), math.sin(yaw))
             
-            # Calculate angle between heading vector and target path vector
-            self.angle_error = head.angle(target_path)
-    
-            # Rotate the heading vector according to the calculated angle and test correspondence
-            # with the path vector. If not zero sign must be flipped. This is to avoid the sine trap.
-            t1 = head.rotate(self.angle_error)
-            if target_path.angle(t1) != 0 :
-                self.angle_error = -self.angle_error
+            # Calculate signed angle between heading vector and target path vector
+            self.angle_error = head.signedAngle(target_path)
                     
-            # Calculate angle between heading vector and goal path vector
-            goal_angle_error = head.angle(goal_path)
-    
-            # Avoid the sine trap.
-            t1 = head.rotate(goal_angle_error)
-            if goal_path.angle(t1) != 0 :
-                goal_angle_error = -goal_angle_error
+            # Calculate signed angle between heading vector and goal path vector
+            goal_angle_error = head.signedAngle(goal_path)
              
             # Check if large initial errors have been corrected
             if math.fabs(self.angle_error) < self.max_initial_error :
@@ -266,8 +297,8 @@ class PositionPlanner():
                 
             # If not preempted, add a time stamp and publish the twist
             if not self.isPreemptRequested() :     
-                self.twist.header.stamp = rospy.Time.now()               
-                self.twist_pub.publish(self.twist)
+                self.twist.header.stamp = self.clock()               
+                self.publishTwist(self.twist)
                         
             return True
         else :
@@ -286,11 +317,22 @@ class PositionPlanner():
         # Extract the position vector
         self.position[0] = msg.pose.pose.position.x
         self.position[1] = msg.pose.pose.position.y
+        self.pose_stamp = msg.header.stamp
         
         # Extract twist
         self.fb_linear = msg.twist.twist.linear.x
         self.fb_angular = msg.twist.twist.angular.z       
     
+    def setPose(self, x, y, yaw, linear_velocity=0.0, angular_velocity=0.0):
+        """
+            Set the current pose and velocity directly, used for injecting feedback when running headless
+        """
+        self.quaternion[:] = tf.transformations.quaternion_from_euler(0.0, 0.0, yaw)
+        self.position[0] = x
+        self.position[1] = y
+        self.fb_linear = linear_velocity
+        self.fb_angular = angular_velocity
+    
     def empty_method(self):
         """
             Empty method pointer
@@ -303,9 +345,10 @@ class PositionPlanner():
         """
         if self.use_tf :
             ret = False
-            try:
-                (self.position,self.heading) = self.__listen.lookupTransform( self.odom_frame,self.base_frame,rospy.Time(0)) # The transform is returned as position (x,y,z) and an orientation quaternion (x,y,z,w).
+            pose = self.pose_provider.getPose(self.max_pose_age)
+            if pose :
+                (self.position[0], self.position[1], self.yaw, self.pose_stamp) = pose
                 ret = True
-            except (tf.LookupException, tf.ConnectivityException),err:
+            else :
                 rospy.loginfo("could not locate vehicle")
             return ret          
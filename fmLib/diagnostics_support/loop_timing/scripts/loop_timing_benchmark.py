@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# Loop timing overhead micro-benchmark
+# Copyright (c) 2013, Leon Bonde Larsen <leon@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+    Micro-benchmark of the loop timing instrumentation. The cost of recording
+    one iteration is timed with timeit, reported in microseconds and as the
+    share of the 50 ms and 100 ms ticks used by the planners and action
+    primitives. No ROS master is needed.
+    Usage: loop_timing_benchmark.py [number of iterations]
+"""
+import sys, timeit
+from loop_timing.loop_timing import LoopTimer
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 :
+        number = int(sys.argv[1])
+    else :
+        number = 200000
+
+    setup = 'from __main__ import LoopTimer; timer = LoopTimer("benchmark", 0.1)'
+
+    tests = [
+        ('start, stop', 'timer.start(); timer.stop()'),
+        ('with', 'with timer : pass'),
+        ('start, age, stop', 'timer.start(); timer.poseAge(0.013); timer.stop()'),
+        ('summary', 'timer.status()'),
+    ]
+
+    print('%-18s %10s %10s %10s' % ('operation', 'cost [us]', '50 ms [%]', '100 ms [%]'))
+    for (name, stmt) in tests :
+        n = number
+        if name == 'summary' :
+            n = number / 100
+        t = min(timeit.Timer(stmt, setup=setup).repeat(3, n)) / n
+        print('%-18s %10.3f %10.4f %10.4f' % (name, t*1e6, t/0.05*100, t/0.1*100))
@@ -0,0 +1,9 @@
+from distutils.core import setup
+from catkin_pkg.python_setup import generate_distutils_setup
+
+d = generate_distutils_setup(
+  scripts=['scripts/loop_timing_benchmark.py'],
+  packages=['loop_timing'],
+  package_dir={'':'src'}
+  )
+setup(**d)
@@ -0,0 +1,238 @@
+#*****************************************************************************
+# Loop timing - control loop timing statistics
+# Copyright (c) 2013, Leon Bonde Larsen <leon@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+    Timing statistics for control loops.
+    A LoopTimer records the compute time of each iteration, the deviation of
+    the time between iterations from the nominal period (jitter) and the age
+    of the pose used, in fixed memory histograms. Iterations computing for
+    longer than the period are counted as overruns, and intervals longer
+    than 1.5 periods as missed deadlines. Loops without a nominal period,
+    e.g. triggered by incoming data, are given the period None; the jitter
+    is then the change from one interval to the next and nothing counts as
+    overrun or missed. Such loops may also record the command latency, the
+    time from the arrival of the triggering data to the published command.
+    
+    All timers of a process are summarized periodically as one
+    diagnostic_msgs/DiagnosticArray, and written to a yaml file with the
+    full histograms on shutdown. The reporter reads the private parameters
+    timing_topic (default /diagnostics), timing_interval (default 5 s, 0
+    disables publishing) and timing_file (default loop_timing_<node>.yaml
+    in the ROS home directory, empty string disables the dump).
+    
+    Usage:
+        timing = loop_timing.get_timer("line_planner", 0.1)
+        loop_timing.start_reporting()
+        while ... :
+            timing.start()
+            ...
+            timing.poseAge(age)
+            timing.stop()
+            rate.sleep()
+"""
+import rospy, os, time, threading, yaml
+from simple_2d_math.histogram import Histogram
+from diagnostic_msgs.msg import DiagnosticArray, DiagnosticStatus, KeyValue
+
+_timers = {}
+_lock = threading.Lock()
+_reporter = None
+
+def get_timer(name, period):
+    """
+        The timer of the process with the given name, created and registered for reporting on first use
+    """
+    with _lock :
+        if name not in _timers :
+            _timers[name] = LoopTimer(name, period)
+        return _timers[name]
+
+def start_reporting():
+    """
+        Start publishing summaries and dump on shutdown, only the first call has an effect
+    """
+    global _reporter
+    with _lock :
+        if _reporter is None :
+            _reporter = Reporter()
+        return _reporter
+
+def default_file():
+    ros_home = os.environ.get("ROS_HOME", os.path.join(os.path.expanduser("~"), ".ros"))
+    return os.path.join(ros_home, "loop_timing" + rospy.get_name().replace("/", "_") + ".yaml")
+
+def dump(filename):
+    """
+        Write the statistics and histograms of all timers to a yaml file
+    """
+    with _lock :
+        timers = [timer.toDict() for timer in _timers.itervalues()]
+    with open(filename, "w") as f :
+        yaml.safe_dump({"node": rospy.get_name(), "timers": timers}, f, default_flow_style=None)
+
+def histogram_dict(histogram):
+    counts = [int(count) for count in histogram.counts]
+    while counts and not counts[-1] :
+        counts.pop()
+    return {"bin_width": histogram.bin_width, "counts": counts}
+
+class LoopTimer():
+    """
+        Timing statistics of one control loop with the given nominal period in seconds.
+        Recording costs a few microseconds per iteration, and the histograms are updated
+        without locking, so a summary taken while the loop runs may be off by a sample.
+    """
+    def __init__(self, name, period, bin_width=0.0005, bins=400):
+        self.name = name
+        self.period = period
+        self.compute = Histogram(bin_width, bins)
+        self.jitter = Histogram(bin_width, bins)
+        self.pose_age = Histogram(10*bin_width, bins)
+        self.command_latency = Histogram(bin_width, bins)
+        self.overruns = 0
+        self.missed = 0
+        self.reported_missed = 0
+        self.started = None
+        self.last_start = None
+        self.last_interval = None
+        
+    def start(self):
+        """
+            Mark the beginning of an iteration
+        """
+        now = time.time()
+        if self.last_start is not None :
+            interval = now - self.last_start
+            if self.period is None :
+                if self.last_interval is not None :
+                    self.jitter.add(abs(interval - self.last_interval))
+                self.last_interval = interval
+            else :
+                self.jitter.add(abs(interval - self.period))
+                if interval > 1.5*self.period :
+                    self.missed += 1
+        self.last_start = now
+        self.started = now
+        
+    def stop(self):
+        """
+            Mark the end of the computation of an iteration
+        """
+        if self.started is not None :
+            elapsed = time.time() - self.started
+            self.compute.add(elapsed)
+            if self.period is not None and elapsed > self.period :
+                self.overruns += 1
+            self.started = None
+    
+    def pause(self):
+        """
+            Mark that the loop is idle, so the gap until the next start is not counted as jitter
+        """
+        self.last_start = None
+        self.last_interval = None
+        
+    def poseAge(self, age):
+        """
+            Record the age in seconds of the pose used in this iteration
+        """
+        self.pose_age.add(age)
+        
+    def commandLatency(self, latency):
+        """
+            Record the time in seconds from the arrival of the data triggering this iteration to its command
+        """
+        self.command_latency.add(latency)
+        
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        
+    def status(self):
+        """
+            Summary as a DiagnosticStatus, at warning level if deadlines were missed since the previous summary
+        """
+        status = DiagnosticStatus()
+        status.name = rospy.get_name() + " " + self.name + " timing"
+        if self.missed > self.reported_missed :
+            status.level = DiagnosticStatus.WARN
+            status.message = "%d missed deadlines" % (self.missed - self.reported_missed)
+        else :
+            status.level = DiagnosticStatus.OK
+            status.message = "OK"
+        self.reported_missed = self.missed
+        status.values = [KeyValue("period", str(self.period)),
+                         KeyValue("compute", str(self.compute)),
+                         KeyValue("jitter", str(self.jitter)),
+                         KeyValue("pose_age", str(self.pose_age)),
+                         KeyValue("command_latency", str(self.command_latency)),
+                         KeyValue("overruns", str(self.overruns)),
+                         KeyValue("missed_deadlines", str(self.missed))]
+        return status
+    
+    def toDict(self):
+        return {"name": self.name,
+                "period": self.period,
+                "overruns": self.overruns,
+                "missed_deadlines": self.missed,
+                "compute": histogram_dict(self.compute),
+                "jitter": histogram_dict(self.jitter),
+                "pose_age": histogram_dict(self.pose_age),
+                "command_latency": histogram_dict(self.command_latency),
+                "summary": {"compute": str(self.compute), "jitter": str(self.jitter), "pose_age": str(self.pose_age),
+                            "command_latency": str(self.command_latency)}}
+
+class Reporter():
+    """
+        Periodic publisher of the timer summaries, use start_reporting to get the process wide instance
+    """
+    def __init__(self):
+        self.topic = rospy.get_param("~timing_topic", "/diagnostics")
+        self.interval = rospy.get_param("~timing_interval", 5.0)
+        self.filename = rospy.get_param("~timing_file", default_file())
+        if self.interval > 0 :
+            self.publisher = rospy.Publisher(self.topic, DiagnosticArray)
+            self.timer = rospy.Timer(rospy.Duration(self.interval), self.onTimer)
+        if self.filename :
+            rospy.on_shutdown(self.onShutdown)
+        
+    def onTimer(self, event):
+        msg = DiagnosticArray()
+        msg.header.stamp = rospy.Time.now()
+        with _lock :
+            msg.status = [timer.status() for timer in _timers.itervalues()]
+        self.publisher.publish(msg)
+        
+    def onShutdown(self):
+        try :
+            dump(self.filename)
+            rospy.loginfo(rospy.get_name() + " Loop timing written to " + self.filename)
+        except (IOError, OSError) as e :
+            rospy.logwarn(rospy.get_name() + " Could not write loop timing: " + str(e))
@@ -31,6 +31,7 @@ from msgs.msg import StringStamped
 from sensor_msgs.msg import Joy,JoyFeedback,JoyFeedbackArray
 from std_msgs.msg import Bool
 from geometry_msgs.msg import TwistStamped
+from simple_2d_math.moving_average import MovingAverage
 import smach
 import smach_ros
 
@@ -54,9 +55,8 @@ class WiiInterface():
         self.rumble_on = False
         self.warning = False
         self.filter = rospy.get_param("~filter",10) 
-        self.pitch = [0.0] * self.filter
-        self.roll = [0.0] * self.filter
-        self.ptr = 0
+        self.pitch = MovingAverage(self.filter)
+        self.roll = MovingAverage(self.filter)
         self.twist = TwistStamped()
         self.fb = JoyFeedbackArray( array=[JoyFeedback( type=JoyFeedback.TYPE_LED, intensity=0, id=0 ), 
                                            JoyFeedback( type=JoyFeedback.TYPE_LED, intensity=0, id=1 ),
@@ -145,11 +145,8 @@ class WiiInterface():
             self.deadman = False      
              
         # Generate pitch and roll and save value in list
-        self.pitch[self.ptr] = math.atan2(msg.axes[1], math.sqrt(math.pow(msg.axes[0], 2) + math.pow(msg.axes[2], 2))) / 1.57;
-        self.roll[self.ptr] = math.atan2(msg.axes[0], math.sqrt(math.pow(msg.axes[1], 2) + math.pow(msg.axes[2], 2))) / 1.57;
-        self.ptr = self.ptr + 1
-        if self.ptr >= self.filter :
-            self.ptr = 0
+        self.pitch.update(math.atan2(msg.axes[1], math.sqrt(math.pow(msg.axes[0], 2) + math.pow(msg.axes[2], 2))) / 1.57)
+        self.roll.update(math.atan2(msg.axes[0], math.sqrt(math.pow(msg.axes[1], 2) + math.pow(msg.axes[2], 2))) / 1.57)
 
     def onStatus(self,msg):
         """
@@ -164,9 +161,9 @@ class WiiInterface():
         """
             Method to average and publish twist from wiimote input
         """
-        # Calculate average of the ten latest messages
-        self.linear = (sum(self.pitch)/len(self.pitch))
-        self.angular = -(sum(self.roll)/len(self.roll))      
+        # Calculate average of the latest messages
+        self.linear = self.pitch.mean()
+        self.angular = -self.roll.mean()
         
         # Implement deadband on linear velocity
         if self.linear < self.deadband and self.linear > -self.deadband :
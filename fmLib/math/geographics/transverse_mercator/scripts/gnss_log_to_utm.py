@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# GNSS log to UTM converter
+# Copyright (c) 2013, Kjeld Jensen <kjeld@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+This file contains a Python script that converts a GNSS log to UTM
+coordinates and saves the result as a NumPy .npy file.
+
+The log is read and converted in chunks of a fixed number of lines, and each
+chunk is converted in one vectorized pass using utmconv.geodetic_to_utm_array.
+The converted records are appended to the output file as they are produced,
+so the memory use is independent of the length of the log.
+
+Supported input formats:
+    csv:  time,lat,lon,fix,sat,hdop  (as written by import_bag_to_csv.py)
+    nmea: NMEA 0183 log, all GGA sentences ($GPGGA, $GNGGA etc.) are used and
+          the time is the UTC time of day [s]. Sentences with an invalid
+          checksum are skipped.
+If no format is specified it is detected from the first line of the log.
+
+The output is a one dimensional array of records with the fields:
+    time, lat, lon, fix, sat, hdop, hemisphere, zone, easting, northing
+Positions without a fix have NaN easting and northing. The file may be
+opened without reading it into memory by:
+
+    data = numpy.load('log.npy', mmap_mode='r')
+
+Usage: gnss_log_to_utm.py [-h] [--format {csv,nmea}] [--chunk-size N] log output.npy
+"""
+# imports
+import sys
+import argparse
+import numpy as np
+from time import time
+from itertools import islice
+from numpy.lib.format import dtype_to_descr
+from transverse_mercator.utm import utmconv
+
+# output record
+utm_record = np.dtype([('time', np.float64), ('lat', np.float64), ('lon', np.float64), \
+    ('fix', np.int8), ('sat', np.int8), ('hdop', np.float32), \
+    ('hemisphere', 'S1'), ('zone', np.int8), ('easting', np.float64), ('northing', np.float64)])
+
+#*****************************************************************************
+class npy_stream_writer():
+    """
+    Writes a one dimensional .npy file record by record. The header is
+    written with room for any length and rewritten when the file is closed.
+    """
+    def __init__(self, filename, dtype):
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        self.header_len = len(self.header(10**19)) + 1 + 10 # preamble is 10 bytes
+        self.header_len = (self.header_len + 63)//64*64 # align the data to 64 bytes
+        self.f = open(filename, 'wb')
+        self.write_header()
+
+    def header(self, length):
+        return "{'descr': %s, 'fortran_order': False, 'shape': (%d,), }" % (repr(dtype_to_descr(self.dtype)), length)
+
+    def write_header(self):
+        h = self.header(self.length)
+        h = h + ' '*(self.header_len - 10 - len(h) - 1) + '\n'
+        self.f.seek(0)
+        self.f.write(b'\x93NUMPY\x01\x00')
+        self.f.write(np.array([len(h)], dtype='<u2').tostring())
+        self.f.write(h.encode('latin1'))
+
+    def append(self, records):
+        self.f.write(np.ascontiguousarray(records, dtype=self.dtype).tostring())
+        self.length += len(records)
+
+    def close(self):
+        self.write_header()
+        self.f.close()
+
+#*****************************************************************************
+def nmea_checksum_ok (line):
+    if '*' not in line:
+        return True
+    (sentence, checksum) = line[1:].split('*', 1)
+    cs = 0
+    for c in sentence:
+        cs ^= ord(c)
+    try:
+        return cs == int(checksum[:2], 16)
+    except ValueError:
+        return False
+
+def nmea_deg (value, hemisphere):
+    # convert NMEA (d)ddmm.mmmm to degrees
+    if value == '':
+        return float('nan')
+    dot = value.find('.')
+    if dot < 0:
+        dot = len(value)
+    deg = float(value[:dot-2]) + float(value[dot-2:])/60.0
+    if hemisphere in ('S', 'W'):
+        deg = -deg
+    return deg
+
+def parse_nmea (lines):
+    rows = []
+    for line in lines:
+        line = line.strip()
+        if len(line) < 7 or line[0] != '$' or line[3:6] != 'GGA' or not nmea_checksum_ok (line):
+            continue
+        f = line.split('*')[0].split(',')
+        try:
+            t = f[1]
+            tod = float(t[0:2])*3600.0 + float(t[2:4])*60.0 + float(t[4:])
+            rows.append((tod, nmea_deg (f[2], f[3]), nmea_deg (f[4], f[5]), \
+                int(f[6] or 0), int(f[7] or 0), float(f[8] or 'nan')))
+        except (ValueError, IndexError):
+            continue
+    return rows
+
+def parse_csv (lines):
+    rows = []
+    for line in lines:
+        f = line.split(',')
+        try:
+            rows.append((float(f[0]), float(f[1]), float(f[2]), int(f[3]), int(f[4]), float(f[5])))
+        except (ValueError, IndexError):
+            continue
+    return rows
+
+def convert_chunk (uc, rows):
+    out = np.zeros(len(rows), dtype=utm_record)
+    if len(rows) == 0:
+        return out
+    a = np.array(rows)
+    out['time'] = a[:,0]
+    out['lat'] = a[:,1]
+    out['lon'] = a[:,2]
+    out['fix'] = a[:,3]
+    out['sat'] = a[:,4]
+    out['hdop'] = a[:,5]
+    out['easting'] = np.nan
+    out['northing'] = np.nan
+    valid = (out['fix'] > 0) & np.isfinite(out['lat']) & np.isfinite(out['lon'])
+    if np.any(valid):
+        (hemisphere, zone, easting, northing) = uc.geodetic_to_utm_array (out['lat'][valid], out['lon'][valid])
+        out['hemisphere'][valid] = hemisphere
+        out['zone'][valid] = zone
+        out['easting'][valid] = easting
+        out['northing'][valid] = northing
+    return out
+
+#*****************************************************************************
+def main():
+    parser = argparse.ArgumentParser(description='Convert a GNSS log (csv or NMEA) to UTM coordinates in a .npy file')
+    parser.add_argument('log', help='GNSS log file')
+    parser.add_argument('output', help='output .npy file')
+    parser.add_argument('--format', choices=['csv', 'nmea'], help='log format (default: detect)')
+    parser.add_argument('--chunk-size', type=int, default=100000, help='number of lines converted at a time')
+    args = parser.parse_args()
+
+    log_format = args.format
+    if log_format is None:
+        with open(args.log, 'r') as f:
+            first = f.readline()
+        log_format = 'nmea' if first.lstrip().startswith('$') else 'csv'
+    if log_format == 'nmea':
+        parse = parse_nmea
+    else:
+        parse = parse_csv
+
+    uc = utmconv()
+    out = npy_stream_writer(args.output, utm_record)
+    t = time()
+    lines = 0
+    with open(args.log, 'r') as f:
+        while True:
+            chunk = list(islice(f, args.chunk_size))
+            if chunk == []:
+                break
+            lines += len(chunk)
+            out.append(convert_chunk (uc, parse (chunk)))
+    out.close()
+    print ('Converted %d of %d lines (%s) in %.2fs' % (out.length, lines, log_format, time() - t))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# Transverse Mercator array conversion benchmark
+# Copyright (c) 2013, Kjeld Jensen <kjeld@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+This file contains a simple Python script to benchmark the vectorized
+(array) conversion functions of the tranmerc class against the scalar
+functions. Random test positions within UTM zone 32 are converted both ways
+and the maximum difference between the two implementations is reported.
+
+Usage: tranmerc_benchmark.py [number of points ...]
+"""
+# imports
+import sys
+import numpy as np
+from time import time
+from math import pi
+from transverse_mercator.transverse_mercator import tranmerc
+
+# WGS-84 and UTM zone 32 parameters
+wgs84_a = 6378137.0
+wgs84_f = 1/298.257223563
+deg_to_rad = pi/180.0
+
+if len(sys.argv) > 1:
+    sizes = [int(arg) for arg in sys.argv[1:]]
+else:
+    sizes = [1000, 100000, 1000000]
+
+tm = tranmerc()
+tm.set_params (wgs84_a, wgs84_f, 0.0, 9.0*deg_to_rad, 500000.0, 0.0, 0.9996)
+np.random.seed(0)
+
+print ('%10s %12s %12s %8s %12s %12s %8s' % ('points', 'fwd scalar', 'fwd array', 'speedup', 'inv scalar', 'inv array', 'speedup'))
+for n in sizes:
+    lat = np.random.uniform(54.0, 58.0, n)*deg_to_rad
+    lon = np.random.uniform(6.0, 12.0, n)*deg_to_rad
+
+    # geodetic to transverse mercator
+    lat_list = lat.tolist()
+    lon_list = lon.tolist()
+    t = time()
+    en_scalar = [tm.geodetic_to_tranmerc (lat_list[i], lon_list[i]) for i in xrange(n)]
+    fwd_scalar = time() - t
+    t = time()
+    (e, nn) = tm.geodetic_to_tranmerc_array (lat, lon)
+    fwd_array = time() - t
+    en_scalar = np.array(en_scalar)
+    fwd_err = max(np.max(np.fabs(en_scalar[:,0] - e)), np.max(np.fabs(en_scalar[:,1] - nn)))
+
+    # transverse mercator to geodetic
+    e_list = e.tolist()
+    n_list = nn.tolist()
+    t = time()
+    ll_scalar = [tm.tranmerc_to_geodetic (e_list[i], n_list[i]) for i in xrange(n)]
+    inv_scalar = time() - t
+    t = time()
+    (lat2, lon2) = tm.tranmerc_to_geodetic_array (e, nn)
+    inv_array = time() - t
+    ll_scalar = np.array(ll_scalar)
+    inv_err = max(np.max(np.fabs(ll_scalar[:,0] - lat2)), np.max(np.fabs(ll_scalar[:,1] - lon2)))
+
+    print ('%10d %11.3fs %11.3fs %7.1fx %11.3fs %11.3fs %7.1fx' % (n, fwd_scalar, fwd_array, fwd_scalar/fwd_array, inv_scalar, inv_array, inv_scalar/inv_array))
+    print ('%10s max difference scalar/array: %.3e m, %.3e rad' % ('', fwd_err, inv_err))
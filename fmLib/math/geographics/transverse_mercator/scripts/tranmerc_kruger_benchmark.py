@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# Transverse Mercator engine benchmark
+# Copyright (c) 2013, Kjeld Jensen <kjeld@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+This file contains a simple Python script to compare the accuracy and
+throughput of the two Transverse Mercator implementations: tranmerc
+(TEC-SR-7 series) and tranmerc_kruger (Kruger series).
+
+Random test positions covering a full 6 degree UTM zone between the equator
+and 84N are converted to UTM and back. For each implementation the round trip
+error is reported, and the difference between the projected coordinates of
+the two implementations is reported. The Kruger series is accurate to a few
+nanometers within the zone and serves as reference.
+
+Usage: tranmerc_kruger_benchmark.py [number of points]
+"""
+# imports
+import sys
+import numpy as np
+from time import time
+from math import pi, cos
+from transverse_mercator.transverse_mercator import tranmerc
+from transverse_mercator.kruger import tranmerc_kruger
+
+# WGS-84 and UTM zone 32 parameters
+wgs84_a = 6378137.0
+wgs84_f = 1/298.257223563
+earth_radius = 6378137.0
+deg_to_rad = pi/180.0
+
+if len(sys.argv) > 1:
+    n = int(sys.argv[1])
+else:
+    n = 100000
+
+np.random.seed(0)
+lat = np.random.uniform(0.0, 84.0, n)*deg_to_rad
+lon = np.random.uniform(6.0, 12.0, n)*deg_to_rad
+lat_list = lat.tolist()
+lon_list = lon.tolist()
+
+results = {}
+print ('%-16s %12s %12s %12s %12s %14s' % ('engine', 'fwd scalar', 'inv scalar', 'fwd array', 'inv array', 'round trip err'))
+for engine in [tranmerc, tranmerc_kruger]:
+    tm = engine()
+    tm.set_params (wgs84_a, wgs84_f, 0.0, 9.0*deg_to_rad, 500000.0, 0.0, 0.9996)
+
+    t = time()
+    en = [tm.geodetic_to_tranmerc (lat_list[i], lon_list[i]) for i in xrange(n)]
+    fwd_scalar = time() - t
+    t = time()
+    ll = [tm.tranmerc_to_geodetic (en[i][0], en[i][1]) for i in xrange(n)]
+    inv_scalar = time() - t
+
+    t = time()
+    (e, nn) = tm.geodetic_to_tranmerc_array (lat, lon)
+    fwd_array = time() - t
+    t = time()
+    (lat2, lon2) = tm.tranmerc_to_geodetic_array (e, nn)
+    inv_array = time() - t
+
+    # round trip error [m]
+    err = np.sqrt(((lat2 - lat)*earth_radius)**2 + ((lon2 - lon)*earth_radius*np.cos(lat))**2)
+    results[engine] = (e, nn)
+
+    print ('%-16s %9.3fus %9.3fus %9.3fus %9.3fus %12.3emm' % (engine.__name__, \
+        fwd_scalar/n*1e6, inv_scalar/n*1e6, fwd_array/n*1e6, inv_array/n*1e6, np.max(err)*1000.0))
+
+# difference between the engines
+(e_ref, n_ref) = results[tranmerc_kruger]
+(e_tec, n_tec) = results[tranmerc]
+diff = np.sqrt((e_tec - e_ref)**2 + (n_tec - n_ref)**2)
+print ('\nDifference tranmerc - tranmerc_kruger over %d points [mm]:' % (n))
+print ('  mean: %.3f  max: %.3f' % (np.mean(diff)*1000.0, np.max(diff)*1000.0))
@@ -2,7 +2,7 @@ from distutils.core import setup
 from catkin_pkg.python_setup import generate_distutils_setup
 
 d = generate_distutils_setup(
-  scripts=['scripts/kp2000_test.py','scripts/utm_test.py'],
+  scripts=['scripts/kp2000_test.py','scripts/utm_test.py','scripts/tranmerc_benchmark.py','scripts/tranmerc_kruger_benchmark.py','scripts/gnss_log_to_utm.py'],
   packages=['transverse_mercator'],
   package_dir={'':'src'}
   )
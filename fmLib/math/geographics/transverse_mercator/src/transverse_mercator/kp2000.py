@@ -33,6 +33,11 @@ KP2000 projection.
 The class utilizes the tranmerc class located in transverse_mercator.py
 The functions do not check for out of range or errors in input.
 
+kp2000conv (projection=tranmerc)
+    projection: The Transverse Mercator implementation used for the
+    conversions, tranmerc (TEC-SR-7 series) or tranmerc_kruger (Kruger
+    series) located in kruger.py
+
 geodetic_to_kp2000 (latitude, longitude, projection)
     latitude: Accepted range is [-90;90] [deg]
     longitude: Accepted range is [-180;180] [deg]
@@ -43,12 +48,28 @@ kp2000_to_geodetic (easting, northing, projection)
     projection: kp2000j/kp2000s/kp2000b
     Returns: geodetic latitude [deg], geodetic longitude [deg]
 
+geodetic_to_kp2000_array (latitude, longitude)
+    latitude, longitude: NumPy arrays (or sequences) [deg]
+    The projection is selected per point from the longitude, the points are
+    grouped by projection and each group is converted in one vectorized pass.
+    Returns: easting [m], northing [m] and projection index arrays
+
+kp2000_to_geodetic_array (easting, northing, projection)
+    easting, northing: NumPy arrays (or sequences) [m]
+    projection: projection index array (as returned by
+    geodetic_to_kp2000_array) or a single projection index
+    Returns: geodetic latitude [deg] and geodetic longitude [deg] arrays
+
+select_projection (longitude)
+    Returns the projection index (kp2000j/kp2000s/kp2000b) for each longitude
+
 Revision
 2013-04-05 KJ Library created
 """
 
 # imports
 from math import pi
+import numpy as np
 from transverse_mercator import tranmerc
 
 # WGS-84 defines
@@ -62,9 +83,13 @@ false_easting = [200000.0, 500000.0, 900000.0]
 false_northing = 0.0
 scale_factor = [0.99995, 0.99995, 1.0]
 
+# longitudes [deg] separating the KP2000 projections (Storebaelt and the
+# Baltic Sea between Sealand and Bornholm) used by the array functions
+projection_boundary_longitude = [11.0, 14.0]
+
 #*****************************************************************************
 class kp2000conv():
-    def __init__(self):
+    def __init__(self, projection=tranmerc):
 	self.kp2000j = 0 # KP2000 Jylland (Jutland) & Fyn (Funen) projection 
 	self.kp2000s = 1 # KP2000 Sjaelland (Sealand) projection
 	self.kp2000b = 2 # KP2000 Bornholm projection
@@ -73,28 +98,58 @@ class kp2000conv():
 	self.central_meridian = []
 	for i in xrange(len(central_meridian)):
 	    self.central_meridian.append(central_meridian[i]*self.deg_to_rad)
-	self.tm = tranmerc()
 
-    def geodetic_to_kp2000 (self, latitude, longitude, projection):
-	# set parameters for KP2000
-	self.tm.set_params (wgs84_a, wgs84_f, origin_latitude, \
-            self.central_meridian[projection], false_easting[projection], \
-            false_northing, scale_factor[projection])
+	# prepare a tranmerc or tranmerc_kruger object for each projection
+	self.tm = []
+	for i in xrange(len(central_meridian)):
+	    tm = projection()
+	    tm.set_params (wgs84_a, wgs84_f, origin_latitude, \
+                self.central_meridian[i], false_easting[i], \
+                false_northing, scale_factor[i])
+	    self.tm.append(tm)
 
+    def geodetic_to_kp2000 (self, latitude, longitude, projection):
 	# perform conversion and return KP2000 projection easting and northing
-	return self.tm.geodetic_to_tranmerc \
+	return self.tm[projection].geodetic_to_tranmerc \
             (latitude*self.deg_to_rad, longitude*self.deg_to_rad)
  
     def kp2000_to_geodetic (self, easting, northing, projection):
-	# set parameters for KP2000
-	self.tm.set_params (wgs84_a, wgs84_f, origin_latitude, \
-            self.central_meridian[projection], false_easting[projection], \
-            false_northing, scale_factor[projection])
-
 	# perform conversion
-        (lat,lon) = self.tm.tranmerc_to_geodetic (easting, northing)
+        (lat,lon) = self.tm[projection].tranmerc_to_geodetic (easting, northing)
 
 	# return geodetic latitude and longitude in degrees
 	return (lat*self.rad_to_deg, lon*self.rad_to_deg)
 
+    def select_projection (self, longitude):
+        # return the projection index (kp2000j/kp2000s/kp2000b) for each longitude
+        return np.searchsorted(projection_boundary_longitude, longitude, side='right')
+
+    def geodetic_to_kp2000_array (self, latitude, longitude):
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        projection = self.select_projection (longitude)
+        easting = np.empty(latitude.shape)
+        northing = np.empty(latitude.shape)
+
+        # convert the points of each projection in one vectorized pass
+        for p in np.unique(projection):
+            idx = (projection == p)
+            (easting[idx], northing[idx]) = self.tm[p].geodetic_to_tranmerc_array \
+                (latitude[idx]*self.deg_to_rad, longitude[idx]*self.deg_to_rad)
+        return (easting, northing, projection)
+
+    def kp2000_to_geodetic_array (self, easting, northing, projection):
+        easting = np.asarray(easting, dtype=np.float64)
+        northing = np.asarray(northing, dtype=np.float64)
+        projection = np.broadcast_to(projection, easting.shape)
+        latitude = np.empty(easting.shape)
+        longitude = np.empty(easting.shape)
+
+        # convert the points of each projection in one vectorized pass
+        for p in np.unique(projection):
+            idx = (projection == p)
+            (latitude[idx], longitude[idx]) = self.tm[p].tranmerc_to_geodetic_array \
+                (easting[idx], northing[idx])
+        return (latitude*self.rad_to_deg, longitude*self.rad_to_deg)
+
 #*****************************************************************************
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# Transverse Mercator projection (Kruger series)
+# Copyright (c) 2013, Kjeld Jensen <kjeld@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+The tranmerc_kruger class implements conversion between geodetic coordinates
+and the Transverse Mercator projection using the Kruger series to sixth
+order in the third flattening n as described in:
+
+  "Charles F. F. Karney. Transverse Mercator with an accuracy of a few
+   nanometers. J. Geodesy 85(8), 475-485 (Aug. 2011)
+   http://arxiv.org/abs/1002.1417 "
+
+Within a UTM zone the error of the series is a few nanometers, compared to
+the sub-millimeter to millimeter errors of the TEC-SR-7 series implemented
+by the tranmerc class. The alpha and beta series coefficients depend only on
+the ellipsoid and are computed once in set_params. The series are summed
+using Clenshaw summation with complex arithmetic, and the conversion from
+the conformal to the geodetic latitude uses a few Newton iterations instead
+of the fixed footpoint latitude iteration used by tranmerc.
+
+The class has the same interface as the tranmerc class and can be used
+wherever tranmerc is used, e.g. utmconv (tranmerc_kruger).
+
+set_params( a, f, origin_latitude, central_meridian, false_easting,
+false_northing, scale_factor)
+    See tranmerc.set_params
+
+geodetic_to_tranmerc (lat, lon)
+    lat: Latitude, accepted ange is [-pi/2;pi/2] radians
+    lon: Longitude, accepted range is [-pi;pi] radians
+    Returns: easting [m], northing [m]
+
+tranmerc_to_geodetic (easting, northing)
+    Returns: latitude [rad], longitude [rad]
+
+geodetic_to_tranmerc_array (lat, lon)
+tranmerc_to_geodetic_array (easting, northing)
+    Same as above but accepts NumPy arrays (or sequences) and converts all
+    points in one vectorized pass.
+
+The functions do not check for out of range or errors in input.
+"""
+# imports
+from math import pi, sqrt, sin, cos, tan, atan, atan2, sinh, asinh, atanh, fabs
+import cmath
+import numpy as np
+
+# number of Newton iterations used when converting the conformal latitude
+# to the geodetic latitude (2 is sufficient for double precision)
+conformal_lat_iterations = 2
+
+#*****************************************************************************
+class tranmerc_kruger():
+    def __init__(self):
+        self.deg_to_rad = pi/180.0
+        self.rad_to_deg = 180.0/pi
+
+    def set_params (self, a, f, origin_latitude, central_meridian, false_easting, false_northing, scale_factor):
+        self.a = a 
+        self.f = f 
+        self.central_meridian = central_meridian
+        self.origin_lat = origin_latitude 
+        self.false_e = false_easting 
+        self.false_n = false_northing
+        self.scale = scale_factor 
+
+        self.origin_lon = central_meridian
+        self.es = 2*self.f - self.f**2 # eccentricity squared
+        self.e = sqrt(self.es) # eccentricity
+        n = self.f/(2.0 - self.f) # third flattening
+        n2 = n*n
+        n3 = n2*n
+        n4 = n3*n
+        n5 = n4*n
+        n6 = n5*n
+
+        # rectifying radius multiplied by the scale factor
+        self.ka = self.scale * self.a/(1.0 + n) * (1.0 + n2/4.0 + n4/64.0 + n6/256.0)
+
+        # coefficients of the series from conformal to rectifying latitude (alpha)
+        self.alpha = [ \
+            n/2.0 - 2.0*n2/3.0 + 5.0*n3/16.0 + 41.0*n4/180.0 - 127.0*n5/288.0 + 7891.0*n6/37800.0, \
+            13.0*n2/48.0 - 3.0*n3/5.0 + 557.0*n4/1440.0 + 281.0*n5/630.0 - 1983433.0*n6/1935360.0, \
+            61.0*n3/240.0 - 103.0*n4/140.0 + 15061.0*n5/26880.0 + 167603.0*n6/181440.0, \
+            49561.0*n4/161280.0 - 179.0*n5/168.0 + 6601661.0*n6/7257600.0, \
+            34729.0*n5/80640.0 - 3418889.0*n6/1995840.0, \
+            212378941.0*n6/319334400.0]
+
+        # coefficients of the series from rectifying to conformal latitude (beta)
+        self.beta = [ \
+            n/2.0 - 2.0*n2/3.0 + 37.0*n3/96.0 - n4/360.0 - 81.0*n5/512.0 + 96199.0*n6/604800.0, \
+            n2/48.0 + n3/15.0 - 437.0*n4/1440.0 + 46.0*n5/105.0 - 1118711.0*n6/3870720.0, \
+            17.0*n3/480.0 - 37.0*n4/840.0 - 209.0*n5/4480.0 + 5569.0*n6/90720.0, \
+            4397.0*n4/161280.0 - 11.0*n5/504.0 - 830251.0*n6/7257600.0, \
+            4583.0*n5/161280.0 - 108847.0*n6/3991680.0, \
+            20648693.0*n6/638668800.0]
+
+        # northing of the latitude of origin
+        taup = self.conformal_tan (tan(self.origin_lat))
+        xi = atan(taup)
+        self.xio = xi + self.clenshaw (self.alpha, complex(xi, 0.0)).real
+
+    def geodetic_to_tranmerc (self, lat, lon):
+        dlam = lon - self.origin_lon
+
+        if dlam > pi:
+            dlam -= 2*pi
+        if dlam < -pi:
+            dlam += 2*pi
+
+        # conformal latitude and Gauss-Schreiber coordinates
+        taup = self.conformal_tan (tan(lat))
+        cl = cos(dlam)
+        xip = atan2(taup, cl)
+        etap = asinh(sin(dlam)/sqrt(taup*taup + cl*cl))
+
+        # Kruger series
+        zetap = complex(xip, etap)
+        zeta = zetap + self.clenshaw (self.alpha, zetap)
+
+        easting = self.false_e + self.ka * zeta.imag
+        northing = self.false_n + self.ka * (zeta.real - self.xio)
+        return (easting, northing)
+
+    def tranmerc_to_geodetic (self, easting, northing):
+        xi = (northing - self.false_n)/self.ka + self.xio
+        eta = (easting - self.false_e)/self.ka
+
+        # inverse Kruger series
+        zeta = complex(xi, eta)
+        zetap = zeta - self.clenshaw (self.beta, zeta)
+        xip = zetap.real
+        etap = zetap.imag
+
+        # conformal latitude and longitude
+        shetap = sinh(etap)
+        cxip = cos(xip)
+        taup = sin(xip)/sqrt(shetap*shetap + cxip*cxip)
+        dlam = atan2(shetap, cxip)
+
+        # geodetic latitude from the conformal latitude
+        tau = taup
+        for i in xrange (conformal_lat_iterations):
+            tau += self.conformal_tan_correction (tau, taup)
+        lat = atan(tau)
+        lon = self.origin_lon + dlam
+
+        if lon > pi:
+            lon -= 2*pi
+        if lon < -pi:
+            lon += 2*pi
+        return (lat, lon)
+
+    def geodetic_to_tranmerc_array (self, lat, lon):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        dlam = lon - self.origin_lon
+        dlam = np.where(dlam > pi, dlam - 2*pi, dlam)
+        dlam = np.where(dlam < -pi, dlam + 2*pi, dlam)
+
+        # conformal latitude and Gauss-Schreiber coordinates
+        taup = self.conformal_tan_array (np.tan(lat))
+        cl = np.cos(dlam)
+        xip = np.arctan2(taup, cl)
+        etap = np.arcsinh(np.sin(dlam)/np.sqrt(taup*taup + cl*cl))
+
+        # Kruger series
+        zetap = xip + 1j*etap
+        zeta = zetap + self.clenshaw_array (self.alpha, zetap)
+
+        easting = self.false_e + self.ka * zeta.imag
+        northing = self.false_n + self.ka * (zeta.real - self.xio)
+        return (easting, northing)
+
+    def tranmerc_to_geodetic_array (self, easting, northing):
+        easting = np.asarray(easting, dtype=np.float64)
+        northing = np.asarray(northing, dtype=np.float64)
+        xi = (northing - self.false_n)/self.ka + self.xio
+        eta = (easting - self.false_e)/self.ka
+
+        # inverse Kruger series
+        zeta = xi + 1j*eta
+        zetap = zeta - self.clenshaw_array (self.beta, zeta)
+        xip = zetap.real
+        etap = zetap.imag
+
+        # conformal latitude and longitude
+        shetap = np.sinh(etap)
+        cxip = np.cos(xip)
+        taup = np.sin(xip)/np.sqrt(shetap*shetap + cxip*cxip)
+        dlam = np.arctan2(shetap, cxip)
+
+        # geodetic latitude from the conformal latitude
+        tau = taup
+        for i in xrange (conformal_lat_iterations):
+            tau = tau + self.conformal_tan_correction_array (tau, taup)
+        lat = np.arctan(tau)
+        lon = self.origin_lon + dlam
+
+        lon = np.where(lon > pi, lon - 2*pi, lon)
+        lon = np.where(lon < -pi, lon + 2*pi, lon)
+        return (lat, lon)
+
+    def conformal_tan (self, tau):
+        # tangent of the conformal latitude from the tangent of the latitude
+        sig = sinh(self.e*atanh(self.e*tau/sqrt(1.0 + tau*tau)))
+        return tau*sqrt(1.0 + sig*sig) - sig*sqrt(1.0 + tau*tau)
+
+    def conformal_tan_correction (self, tau, taup):
+        # Newton step for solving conformal_tan (tau) = taup
+        tau1 = sqrt(1.0 + tau*tau)
+        sig = sinh(self.e*atanh(self.e*tau/tau1))
+        taupi = tau*sqrt(1.0 + sig*sig) - sig*tau1
+        return (taup - taupi)/sqrt(1.0 + taupi*taupi) * (1.0 + (1.0 - self.es)*tau*tau)/((1.0 - self.es)*tau1)
+
+    def clenshaw (self, c, zeta):
+        # sum c[j-1]*sin(2*j*zeta) for j = 1..len(c) using Clenshaw summation
+        s2 = cmath.sin(2.0*zeta)
+        c2 = 2.0*cmath.cos(2.0*zeta)
+        b1 = 0j
+        b2 = 0j
+        for j in xrange(len(c)-1, -1, -1):
+            (b1, b2) = (c[j] + c2*b1 - b2, b1)
+        return b1*s2
+
+    def conformal_tan_array (self, tau):
+        sig = np.sinh(self.e*np.arctanh(self.e*tau/np.sqrt(1.0 + tau*tau)))
+        return tau*np.sqrt(1.0 + sig*sig) - sig*np.sqrt(1.0 + tau*tau)
+
+    def conformal_tan_correction_array (self, tau, taup):
+        tau1 = np.sqrt(1.0 + tau*tau)
+        sig = np.sinh(self.e*np.arctanh(self.e*tau/tau1))
+        taupi = tau*np.sqrt(1.0 + sig*sig) - sig*tau1
+        return (taup - taupi)/np.sqrt(1.0 + taupi*taupi) * (1.0 + (1.0 - self.es)*tau*tau)/((1.0 - self.es)*tau1)
+
+    def clenshaw_array (self, c, zeta):
+        s2 = np.sin(2.0*zeta)
+        c2 = 2.0*np.cos(2.0*zeta)
+        b1 = np.zeros_like(zeta)
+        b2 = np.zeros_like(zeta)
+        for j in xrange(len(c)-1, -1, -1):
+            (b1, b2) = (c[j] + c2*b1 - b2, b1)
+        return b1*s2
+
+#*****************************************************************************
@@ -50,9 +50,17 @@ here:
    nanometers. J. Geodesy 85(8), 475-485 (Aug. 2011)
    http://arxiv.org/abs/1002.1417 "
 
+The method is implemented by the tranmerc_kruger class in kruger.py which
+has the same interface as this class.
+
 
 set_params( a, f, origin_latitude, central_meridian, false_easting,
 false_northing, scale_factor)
+    All terms that depend only on the ellipsoid and the projection origin
+    are computed here, so a tranmerc object should be kept and reused for
+    conversions within the same projection rather than calling set_params
+    before each conversion.
+
     Specifying a particular ellipsoid:
         a: Semi-major axis, radius [m] at the Equator
         f: Ratio of the difference between the semi-major axis and polar
@@ -76,6 +84,18 @@ geodetic_to_tranmerc (lat, lon)
     lat: Latitude, accepted ange is [-pi/2;pi/2] radians
     lon: Longitude, accepted range is [-pi;pi] radians
 
+geodetic_to_tranmerc_array (lat, lon)
+    Same as geodetic_to_tranmerc but accepts NumPy arrays (or sequences) of
+    latitudes and longitudes and returns arrays of easting and northing. The
+    series are evaluated for all points in one vectorized pass.
+
+tranmerc_to_geodetic_array (easting, northing)
+    Same as tranmerc_to_geodetic but accepts NumPy arrays (or sequences) of
+    eastings and northings and returns arrays of latitude and longitude.
+
+The array functions give the same results as the scalar functions within
+floating point rounding (well below a micrometer).
+
 The functions do not check for out of range or errors in input.
 
 More information about the Transverse Mercator projection may be found at
@@ -86,6 +106,7 @@ Revision
 """
 # imports
 from math import pi, sqrt, sin, cos, tan, fabs
+import numpy as np
 
 #*****************************************************************************
 class tranmerc():
@@ -117,6 +138,10 @@ class tranmerc():
         self.dp = 35.0 * self.a * (tn3 - tn4 + 11.0 * tn5 / 16.0) / 48.0
         self.ep = 315.0 * self.a * (tn4 - tn5) / 512.0
 
+        # terms depending only on the projection origin
+        self.tmdo = self.sphtmd(self.origin_lat) # true meridional distance for latitude of origin
+        self.sr0 = self.sphsr(0.0) # radius of curvature in the meridian at the equator
+
     def geodetic_to_tranmerc (self, lat, lon):
         dlam = lon - self.origin_lon;
 
@@ -145,10 +170,9 @@ class tranmerc():
 
         sn = self.sphsn(lat) 
         tmd = self.sphtmd(lat) 
-        tmdo = self.sphtmd(self.origin_lat) # origin
 
         # northing
-        t1 = (tmd - tmdo) * self.scale
+        t1 = (tmd - self.tmdo) * self.scale
         t2 = sn * s * c * self.scale/2.0
         t3 = sn * s * c3 * self.scale * (5.0 - tan2 + 9.0 * eta + 4.0 * eta2) /24.0
         t4 = sn * s * c5 * self.scale * (61.0 - 58.0 * tan2 + tan4 + 270.0 * eta - 330.0 * tan2 * eta + 445.0 * eta2 + 324.0 * eta3 -680.0 * tan2 * eta2 + 88.0 * eta4 -600.0 * tan2 * eta3 - 192.0 * tan2 * eta4) / 720.0;
@@ -164,9 +188,8 @@ class tranmerc():
         return (easting, northing)
 
     def tranmerc_to_geodetic (self, easting, northing):
-        tmdo = self.sphtmd(self.origin_lat) # true Meridional Distances for latitude of origin
-        tmd = tmdo + (northing - self.false_n)/self.scale # origin 
-        sr = self.sphsr(0.0) # first estimate
+        tmd = self.tmdo + (northing - self.false_n)/self.scale # origin 
+        sr = self.sr0 # first estimate
         ftphi = tmd/sr
 	for i in xrange (5):
             t10 = self.sphtmd (ftphi)
@@ -222,6 +245,116 @@ class tranmerc():
 
         return (lat, lon)
 
+    def geodetic_to_tranmerc_array (self, lat, lon):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        dlam = lon - self.origin_lon
+        dlam = np.where(dlam > pi, dlam - 2*pi, dlam)
+        dlam = np.where(dlam < -pi, dlam + 2*pi, dlam)
+        dlam = np.where(np.fabs(dlam) < 2.e-10, 0.0, dlam)
+
+        s = np.sin(lat)
+        c = np.cos(lat)
+        c2 = c*c
+        c3 = c2*c
+        c5 = c3*c2
+        c7 = c5*c2
+        t = np.tan(lat)
+        tan2 = t*t
+        tan4 = tan2*tan2
+        tan6 = tan4*tan2
+        eta = self.ebs * c2
+        eta2 = eta*eta
+        eta3 = eta2*eta
+        eta4 = eta3*eta
+
+        sn = self.a/np.sqrt(1.0 - self.es*s*s)
+        tmd = self.sphtmd_array(lat)
+
+        # northing
+        sns = sn * s * self.scale
+        t1 = (tmd - self.tmdo) * self.scale
+        t2 = sns * c /2.0
+        t3 = sns * c3 * (5.0 - tan2 + 9.0 * eta + 4.0 * eta2) /24.0
+        t4 = sns * c5 * (61.0 - 58.0 * tan2 + tan4 + 270.0 * eta - 330.0 * tan2 * eta + 445.0 * eta2 + 324.0 * eta3 -680.0 * tan2 * eta2 + 88.0 * eta4 -600.0 * tan2 * eta3 - 192.0 * tan2 * eta4) / 720.0
+        t5 = sns * c7 * (1385.0 - 3111.0 * tan2 + 543.0 * tan4 - tan6) / 40320.0
+        dlam2 = dlam*dlam
+        northing = self.false_n + t1 + dlam2 * (t2 + dlam2 * (t3 + dlam2 * (t4 + dlam2 * t5)))
+
+        # easting
+        snk = sn * self.scale
+        t6 = snk * c
+        t7 = snk * c3 * (1.0 - tan2 + eta ) /6.0
+        t8 = snk * c5 * (5.0 - 18.0 * tan2 + tan4 + 14.0 * eta - 58.0 * tan2 * eta + 13.0 * eta2 + 4.0 * eta3 - 64.0 * tan2 * eta2 - 24.0 * tan2 * eta3 )/ 120.0
+        t9 = snk * c7 * ( 61.0 - 479.0 * tan2 + 179.0 * tan4 - tan6 ) /5040.0
+        easting = self.false_e + dlam * (t6 + dlam2 * (t7 + dlam2 * (t8 + dlam2 * t9)))
+        return (easting, northing)
+
+    def tranmerc_to_geodetic_array (self, easting, northing):
+        easting = np.asarray(easting, dtype=np.float64)
+        northing = np.asarray(northing, dtype=np.float64)
+        tmd = self.tmdo + (northing - self.false_n)/self.scale # origin 
+        sr = self.sr0 # first estimate
+        ftphi = tmd/sr
+        for i in xrange (5):
+            t10 = self.sphtmd_array (ftphi)
+            sr = self.sphsr_array(ftphi)
+            ftphi = ftphi + (tmd - t10)/sr
+        s = np.sin(ftphi) # sine cosine terms
+        c = np.cos(ftphi)
+        t = np.tan(ftphi) # tangent value
+        den = np.sqrt(1.0 - self.es*s*s)
+        sr = self.a*(1.0 - self.es)/(den*den*den) # radius of Curvature in the meridian
+        sn = self.a/den # radius of Curvature in the prime vertical
+
+        tan2 = t*t
+        tan4 = tan2*tan2
+        tan6 = tan4*tan2
+        eta = self.ebs * c*c
+        eta2 = eta*eta
+        eta3 = eta2*eta
+        eta4 = eta3*eta
+        de = easting - self.false_e
+        de = np.where(np.fabs(de) < 0.0001, 0.0, de)
+        sn2 = sn*sn
+        sn3 = sn2*sn
+        sn5 = sn3*sn2
+        sn7 = sn5*sn2
+
+        # calculate the latitude
+        t10 = t / (2.0 * sr * sn * self.scale**2)
+        t11 = t * (5.0  + 3.0 * tan2 + eta - 4.0 * eta2 - 9.0 * tan2 * eta) / (24.0 * sr * sn3 * self.scale**4)
+        t12 = t * (61.0 + 90.0 * tan2 + 46.0 * eta + 45.0 * tan4 - 252.0 * tan2 * eta  - 3.0 * eta2 + 100.0 * eta3 - 66.0 * tan2 * eta2 - 90.0 * tan4 * eta + 88.0 * eta4 + 225.0 * tan4 * eta2 + 84.0 * tan2* eta3 - 192.0 * tan2 * eta4) / (720.0 * sr * sn5 * self.scale**6)
+        t13 = t * ( 1385.0 + 3633.0 * tan2 + 4095.0 * tan4 + 1575.0 * tan6)/ (40320.0 * sr * sn7 * self.scale**8)
+        de2 = de*de
+        lat = ftphi - de2 * (t10 - de2 * (t11 - de2 * (t12 - de2 * t13)))
+
+        # calculate the longitude
+        t14 = 1.0 / (sn * c * self.scale)
+        t15 = (1.0 + 2.0 * tan2 + eta) / (6.0 * sn3 * c * self.scale**3)
+        t16 = (5.0 + 6.0 * eta + 28.0 * tan2 - 3.0 * eta2 + 8.0 * tan2 * eta + 24.0 * tan4 - 4.0 * eta3 + 4.0 * tan2 * eta2 + 24.0 * tan2 * eta3) / (120.0 * sn5 * c * self.scale**5)
+        t17 = (61.0 +  662.0 * tan2 + 1320.0 * tan4 + 720.0 * tan6) / (5040.0 * sn7 * c * self.scale**7)
+        dlam = de * (t14 - de2 * (t15 - de2 * (t16 - de2 * t17))) # difference in longitude
+        lon = self.origin_lon + dlam
+
+        over = lat > pi/2.0
+        while np.any(over):
+            lat = np.where(over, pi - lat, lat)
+            lon = np.where(over, lon + pi, lon)
+            lon = np.where(over & (lon > pi), lon - 2*pi, lon)
+            over = lat > pi/2.0
+
+        under = lat < -pi/2.0
+        while np.any(under):
+            lat = np.where(under, -(lat+pi), lat)
+            lon = np.where(under, lon + pi, lon)
+            lon = np.where(under & (lon > pi), lon - 2*pi, lon)
+            under = lat < -pi/2.0
+
+        lon = np.where(lon > 2*pi, lon - 2*pi, lon)
+        lon = np.where(lon < -pi, lon + 2*pi, lon)
+        return (lat, lon)
+
     def sphsn (self, lat): 
 	return self.a/sqrt(1.0 - self.es*sin(lat)**2)
 
@@ -234,4 +367,12 @@ class tranmerc():
     def denom (self, lat):
         return sqrt(1.0 - self.es*sin(lat)**2)
 
+    def sphtmd_array (self, lat):
+        return self.ap*lat - self.bp*np.sin(2.0*lat) + self.cp*np.sin(4.0*lat) - self.dp*np.sin(6.0*lat) + self.ep*np.sin(8.0*lat)
+
+    def sphsr_array (self, lat):
+        s = np.sin(lat)
+        den = np.sqrt(1.0 - self.es*s*s)
+        return self.a*(1.0 - self.es)/(den*den*den)
+
 #*****************************************************************************
@@ -33,6 +33,11 @@ Universal Transverse Mercator (UTM) projection.
 The class utilizes the tranmerc class located in transverse_mercator.py
 The functions do not check for out of range or errors in input.
 
+utmconv (projection=tranmerc)
+    projection: The Transverse Mercator implementation used for the
+    conversions, tranmerc (TEC-SR-7 series) or tranmerc_kruger (Kruger
+    series) located in kruger.py
+
 set_zone_override (zone)
     use to override the default zone by one of its neighbouring zones. If
     more distant zone is chosen, the inaccuracies will be significant.
@@ -47,12 +52,31 @@ utm_to_geodetic (hemisphere, zone, easting, northing)
     zone: Valid UTM zone accepted
     Returns: geodetic latitude [deg], geodetic longitude [deg]
 
+geodetic_to_utm_array (latitude, longitude)
+    latitude, longitude: NumPy arrays (or sequences) [deg]
+    The zone is determined per point, the points are grouped by zone and
+    hemisphere and each group is converted in one vectorized pass.
+    Returns: hemisphere ('N'/'S'), zone, easting [m] and northing [m] arrays
+    (the zone letter is not determined)
+
+utm_to_geodetic_array (hemisphere, zone, easting, northing)
+    hemisphere, zone: arrays or single values
+    easting, northing: NumPy arrays (or sequences) [m]
+    Returns: geodetic latitude [deg] and geodetic longitude [deg] arrays
+
+get_tranmerc (zone, hemisphere)
+    Returns the tranmerc object prepared for the zone and hemisphere. The
+    projection parameters are computed the first time a zone is used and
+    cached, so consecutive conversions within the same zone only evaluate
+    the position dependent terms.
+
 Revision
 2013-04-05 KJ Library created
 """
 
 # imports
 from math import pi
+import numpy as np
 from transverse_mercator import tranmerc
 
 # WGS-84 defines
@@ -66,14 +90,15 @@ utm_origin_latitude = 0.0
 
 #*****************************************************************************
 class utmconv():
-    def __init__(self):
+    def __init__(self, projection=tranmerc):
 	self.false_e = 500000.0
 	self.false_n = 0.0
 	self.scale = 0.9996
 	self.zone_override = 0
         self.deg_to_rad = pi/180.0
         self.rad_to_deg = 180.0/pi
-	self.tm = tranmerc()
+	self.projection = projection # tranmerc or tranmerc_kruger
+	self.tm_cache = {} # prepared projection objects indexed by (zone, hemisphere)
 
     def set_zone_override (self, zone):
 	# allow manual override of the utm zone
@@ -107,12 +132,8 @@ class utmconv():
                 if (lon_deg_int>32) and (lon_deg_int<42):
                     zone = 37
 
-	# calculate central meridian for this zone 
-	central_meridian = ((zone - 1)*6 - 180 + 3)*self.deg_to_rad        
-
-	# set false northing based on hemishpere
+	# determine the hemisphere
         if latitude >= 0.0: 
-            false_northing = 0
             hemisphere = 'N'
 	    # determine the UTM zone letter
      	    if  latitude >= 72.0: zlet = 'X'
@@ -126,7 +147,6 @@ class utmconv():
 	    elif latitude >= 8.0: zlet = 'P'
 	    else: zlet = 'N'
         else:
-            false_northing = 10000000
             hemisphere = 'S'
 
 	    # determine the UTM zone letter
@@ -141,33 +161,101 @@ class utmconv():
 	    elif latitude >= -72.0: zlet = 'D'
 	    else: zlet = 'C'
 
-	# set parameters for WGS-84, UTM, the false northing and the zone central meridian
-	self.tm.set_params (wgs84_a, wgs84_f, utm_origin_latitude, central_meridian, utm_false_easting, false_northing, utm_scale_factor)
+	# get the projection for the zone and hemisphere
+	tm = self.get_tranmerc (zone, hemisphere)
 
 	# perform conversion
-	(easting, northing) = self.tm.geodetic_to_tranmerc (lat, lon)
+	(easting, northing) = tm.geodetic_to_tranmerc (lat, lon)
 
 	# return hemisphere, utm zone, utm letter, easting and northing
  	return (hemisphere, zone, zlet, easting, northing)
  
     def utm_to_geodetic (self, hemisphere, zone, easting, northing):
 
-	# calculate the central meridian for the zone
-	central_meridian = ((zone - 1)*6 - 180 + 3)*self.deg_to_rad      
-
-	# determine the false northing based on the hemisphere
-        if hemisphere == 'N':
-            false_northing = 0
-        else:
-            false_northing = 10000000
-
-	# set parameters for WGS-84, UTM, the false northing and the zone central meridian
-	self.tm.set_params (wgs84_a, wgs84_f, utm_origin_latitude, central_meridian, utm_false_easting, false_northing, utm_scale_factor)
+	# get the projection for the zone and hemisphere
+	tm = self.get_tranmerc (zone, hemisphere)
 
 	# perform conversion
-        (lat,lon) = self.tm.tranmerc_to_geodetic (easting, northing)
+        (lat,lon) = tm.tranmerc_to_geodetic (easting, northing)
 
 	# return geodetic latitude and longitude in degrees
 	return (lat*self.rad_to_deg, lon*self.rad_to_deg)
 
+    def geodetic_to_utm_array (self, latitude, longitude):
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        lat_deg_int = np.trunc(latitude)
+        lon_deg_int = np.trunc(longitude)
+
+        # if manually override to a neighbouring zone 
+        if self.zone_override > 0:
+            zone = np.empty(latitude.shape, dtype=np.int32)
+            zone.fill(self.zone_override)
+        else:
+            # calculate the zone based on the longitude
+            zone = np.trunc((longitude + 180)/6).astype(np.int32) + 1
+            # handle areas with special conventions (Denmark & South West Norway)
+            norway = (lat_deg_int>55) & (lat_deg_int<64)
+            zone[norway & (lon_deg_int> -1) & (lon_deg_int< 3)] = 31
+            zone[norway & (lon_deg_int> 2) & (lon_deg_int< 12)] = 32
+            # handle areas with special conventions (Svalbard)
+            svalbard = lat_deg_int > 71
+            zone[svalbard & (lon_deg_int>-1) & (lon_deg_int<9)] = 31
+            zone[svalbard & (lon_deg_int>8) & (lon_deg_int<21)] = 33
+            zone[svalbard & (lon_deg_int>20) & (lon_deg_int<33)] = 35
+            zone[svalbard & (lon_deg_int>32) & (lon_deg_int<42)] = 37
+
+        # determine the hemisphere
+        south = latitude < 0.0
+        hemisphere = np.where(south, 'S', 'N')
+
+        # convert the points of each zone and hemisphere in one vectorized pass
+        easting = np.empty(latitude.shape)
+        northing = np.empty(latitude.shape)
+        key = zone*2 + south
+        for k in np.unique(key):
+            idx = (key == k)
+            tm = self.get_tranmerc (k//2, 'S' if k%2 else 'N')
+            (easting[idx], northing[idx]) = tm.geodetic_to_tranmerc_array \
+                (latitude[idx]*self.deg_to_rad, longitude[idx]*self.deg_to_rad)
+        return (hemisphere, zone, easting, northing)
+
+    def utm_to_geodetic_array (self, hemisphere, zone, easting, northing):
+        easting = np.asarray(easting, dtype=np.float64)
+        northing = np.asarray(northing, dtype=np.float64)
+        zone = np.broadcast_to(zone, easting.shape)
+        south = np.broadcast_to(hemisphere, easting.shape) == 'S'
+        latitude = np.empty(easting.shape)
+        longitude = np.empty(easting.shape)
+
+        # convert the points of each zone and hemisphere in one vectorized pass
+        key = zone*2 + south
+        for k in np.unique(key):
+            idx = (key == k)
+            tm = self.get_tranmerc (k//2, 'S' if k%2 else 'N')
+            (latitude[idx], longitude[idx]) = tm.tranmerc_to_geodetic_array \
+                (easting[idx], northing[idx])
+        return (latitude*self.rad_to_deg, longitude*self.rad_to_deg)
+
+    def get_tranmerc (self, zone, hemisphere):
+        # return the prepared projection for the zone and hemisphere, the
+        # projection parameters are only computed the first time it is used
+        key = (zone, hemisphere)
+        tm = self.tm_cache.get(key)
+        if tm is None:
+            # calculate the central meridian for the zone
+            central_meridian = ((zone - 1)*6 - 180 + 3)*self.deg_to_rad
+
+            # determine the false northing based on the hemisphere
+            if hemisphere == 'N':
+                false_northing = 0
+            else:
+                false_northing = 10000000
+
+            # set parameters for WGS-84, UTM, the false northing and the zone central meridian
+            tm = self.projection()
+            tm.set_params (wgs84_a, wgs84_f, utm_origin_latitude, central_meridian, utm_false_easting, false_northing, utm_scale_factor)
+            self.tm_cache[key] = tm
+        return tm
+
 #*****************************************************************************
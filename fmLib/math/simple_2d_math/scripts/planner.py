@@ -131,14 +131,8 @@ class Planner():
         # Construct heading vector
         head = Vector(math.cos(self.heading), math.sin(self.heading))
                 
-        # Calculate angle between heading vector and path vector
-        self.angle_error = head.angle(path)
-
-        # Rotate the heading vector according to the calculated angle and test correspondence
-        # with the path vector. If not zero sign must be flipped. This is to avoid the sine trap.
-        t1 = head.rotate(self.angle_error)
-        if path.angle(t1) != 0 :
-            self.angle_error = -self.angle_error          
+        # Calculate signed angle between heading vector and path vector
+        self.angle_error = head.signedAngle(path)
         
         # Generate twist from distance and angle errors (For now simply 1:1)
         self.linear_velocity = self.distance_error * self.linear_scale_factor
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# SegmentIndex test
+# Copyright (c) 2013, Leon Bonde Larsen <leon@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+    Test of SegmentIndex. The nearest and within radius queries are compared
+    to a brute force search over all segments on a coverage pattern, on random
+    segments of all lengths and directions including segments through cell
+    corners and zero length segments, and on a route of short segments with
+    one long diagonal segment, which must not take more grid cells than its
+    length in cells.
+    Usage: segment_index_test.py
+"""
+import math, random, sys
+from simple_2d_math.segment_index import SegmentIndex
+
+def brute_nearest(index, point):
+    best = (None, float("inf"))
+    for i in xrange(len(index)) :
+        d = index.distance(i, point[0], point[1])
+        if d < best[1] :
+            best = (i, d)
+    return best
+
+def brute_within(index, point, radius):
+    result = [(i, index.distance(i, point[0], point[1])) for i in xrange(len(index))]
+    return sorted([r for r in result if r[1] <= radius], key=lambda r: (r[1], r[0]))
+
+def check(name, index, points, radius):
+    wrong = 0
+    for p in points :
+        if index.nearest(p) != brute_nearest(index, p) :
+            wrong += 1
+        if index.withinRadius(p, radius) != brute_within(index, p, radius) :
+            wrong += 1
+    cells = sum(len(c) for c in index.cells.values())
+    print('%-16s %5d segments %6d cell entries %5d queries  %s' % \
+        (name, len(index), cells, 2*len(points), 'OK' if wrong == 0 else '%d WRONG' % wrong))
+    return wrong == 0
+
+if __name__ == '__main__':
+    random.seed(0)
+    ok = True
+
+    # coverage pattern of 20 m rows 1 m apart with 1 m waypoints
+    path = []
+    for row in xrange(30) :
+        xs = range(0, 21) if row % 2 == 0 else range(20, -1, -1)
+        path.extend([(x, row) for x in xs])
+    points = [(random.uniform(-5, 25), random.uniform(-5, 35)) for i in xrange(500)]
+    ok = check('coverage', SegmentIndex.fromPath(path), points, 1.5) and ok
+
+    # random segments, through cell corners and of zero length
+    segments = []
+    for i in xrange(300) :
+        a = (random.uniform(-50, 50), random.uniform(-50, 50))
+        l = 10**random.uniform(-2, 2)
+        d = random.uniform(-math.pi, math.pi)
+        segments.append((a, (a[0] + l*math.cos(d), a[1] + l*math.sin(d))))
+    segments += [((0.0, 0.0), (10.0, 10.0)), ((0.0, 10.0), (10.0, 0.0)), ((3.0, 3.0), (3.0, 3.0)), ((-7.0, 2.0), (7.0, 2.0))]
+    points = [(random.uniform(-60, 60), random.uniform(-60, 60)) for i in xrange(500)]
+    ok = check('random', SegmentIndex(segments, 1.0), points, 3.0) and ok
+
+    # short segments and one long diagonal segment
+    path = [(float(i), 0.0) for i in xrange(1001)] + [(0.0, 1000.0)]
+    index = SegmentIndex.fromPath(path)
+    points = [(random.uniform(-10, 1010), random.uniform(-10, 1010)) for i in xrange(200)]
+    ok = check('long diagonal', index, points, 2.0) and ok
+    max_cells = 3 * (1000 + 1000) + 1000 # crossed cells of the diagonal and the short segments
+    cells_ok = len(index.cells) <= max_cells
+    print('%-16s %d cells, at most %d  %s' % ('grid size', len(index.cells), max_cells, 'OK' if cells_ok else 'FAILED'))
+    ok = ok and cells_ok
+
+    if not ok :
+        sys.exit(1)
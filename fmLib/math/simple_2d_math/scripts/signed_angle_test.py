@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# Signed angle test
+# Copyright (c) 2013, Leon Bonde Larsen <leon@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+    Test of Vector.signedAngle and VectorArray.signedAngle. The signed angle is
+    compared to the exact angle used to construct the vectors, including angles
+    near 0 and near +-pi, and to the rotate-and-compare sign recovery which
+    was used by the planners and the velocity controller before signedAngle.
+    Usage: signed_angle_test.py
+"""
+import math, random, sys
+import numpy as np
+from simple_2d_math.vector import Vector
+from simple_2d_math.vector_array import VectorArray
+
+tolerance = 1e-12
+
+def rotate_and_compare(heading, path):
+    """
+        The sign recovery previously used by the planners
+    """
+    angle = heading.angle(path)
+    t1 = heading.rotate(angle)
+    if path.angle(t1) != 0 :
+        angle = -angle
+    return angle
+
+def angle_diff(a, b):
+    """
+        Exact reference: signed difference between two directions wrapped to [-pi;pi]
+    """
+    d = a - b
+    while d > math.pi :
+        d -= 2*math.pi
+    while d < -math.pi :
+        d += 2*math.pi
+    return d
+
+def check(name, cases):
+    """
+        cases is a list of (heading direction, path direction, path length)
+    """
+    max_err = 0.0
+    sign_err = 0
+    rc_err = 0
+    headings = []
+    paths = []
+    expected = []
+    for (a, d, l) in cases :
+        heading = Vector(math.cos(a), math.sin(a))
+        path = Vector(l*math.cos(a+d), l*math.sin(a+d))
+        ref = angle_diff(math.atan2(path.y, path.x), math.atan2(heading.y, heading.x))
+        angle = heading.signedAngle(path)
+        err = math.fabs(angle_diff(angle, ref))
+        max_err = max(max_err, err)
+        if err > tolerance :
+            sign_err += 1
+        if math.fabs(angle_diff(rotate_and_compare(heading, path), ref)) > 1e-6 :
+            rc_err += 1
+        headings.append(heading)
+        paths.append(path)
+        expected.append(ref)
+
+    # the batch implementation must give the same result
+    batch = VectorArray(headings).signedAngle(VectorArray(paths))
+    batch_err = np.max(np.fabs(np.angle(np.exp(1j*(batch - np.array(expected))))))
+
+    ok = max_err <= tolerance and batch_err <= tolerance
+    print('%-12s %6d cases  max error %.2e  batch max error %.2e  rotate-and-compare wrong %5d  %s' % \
+        (name, len(cases), max_err, batch_err, rc_err, 'OK' if ok else 'FAILED'))
+    return ok
+
+if __name__ == '__main__':
+    random.seed(0)
+    n = 10000
+    uniform = [(random.uniform(-math.pi, math.pi), random.uniform(-math.pi, math.pi), random.uniform(0.01, 100.0)) for i in range(n)]
+    near_zero = [(random.uniform(-math.pi, math.pi), random.choice([-1,1])*10**random.uniform(-12, -3), random.uniform(0.01, 100.0)) for i in range(n)]
+    near_pi = [(random.uniform(-math.pi, math.pi), random.choice([-1,1])*(math.pi - 10**random.uniform(-12, -3)), random.uniform(0.01, 100.0)) for i in range(n)]
+    exact = [(a, d, 1.0) for a in [0.0, math.pi/2, -math.pi/2, math.pi] for d in [0.0, math.pi/2, -math.pi/2]]
+
+    ok = True
+    ok = check('uniform', uniform) and ok
+    ok = check('near 0', near_zero) and ok
+    ok = check('near pi', near_pi) and ok
+    ok = check('exact', exact) and ok
+
+    # zero vectors give a zero angle
+    zero = Vector(0,0)
+    zero_ok = zero.signedAngle(Vector(1,2)) == 0.0 and Vector(1,2).signedAngle(zero) == 0.0
+    print('%-12s %s' % ('zero vector', 'OK' if zero_ok else 'FAILED'))
+    ok = ok and zero_ok
+
+    if not ok :
+        sys.exit(1)
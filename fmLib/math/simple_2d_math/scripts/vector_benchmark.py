@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# Simple 2D math vector micro-benchmark
+# Copyright (c) 2013, Leon Bonde Larsen <leon@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+    Micro-benchmark of the Vector class. Each operation is timed with timeit
+    and reported in microseconds per call. The list and numpy based vector used
+    before the Vector class got slots and in-place methods is included as
+    reference for the most common operations. Before the timing the results
+    of the operations with float and int components are verified against the
+    reference.
+    Usage: vector_benchmark.py [number of calls]
+"""
+import sys, timeit, math
+import numpy as np
+from simple_2d_math.vector import Vector
+
+class ListVector():
+    """
+        Reference: the previous list based implementation of the common operations
+    """
+    def __init__(self,a,b):
+        self.vec = [a,b]
+    def __getitem__(self,k):
+        return self.vec[k]
+    def __add__(self,other):
+        return ListVector(self.vec[0] + other[0] , self.vec[1] + other[1])
+    def __sub__(self,other):
+        return ListVector(self.vec[0] - other[0] , self.vec[1] - other[1])
+    def length(self):
+        return math.sqrt(np.dot(self.vec,self.vec))
+    def angle(self,other):
+        if self.length() and other.length() :
+            tmp = np.dot(self.vec,other.vec) / (self.length() * other.length())
+            return math.acos(max(-1.0, min(1.0, tmp)))
+        return 0.0
+    def rotate(self,rad):
+        return ListVector(math.cos(rad)*self.vec[0] - math.sin(rad)*self.vec[1], math.sin(rad)*self.vec[0] + math.cos(rad)*self.vec[1])
+    def scale(self,num):
+        return ListVector(self.vec[0] * num , self.vec[1] * num)
+    def projectedOn(self,other):
+        tmp = np.dot(other.vec,self.vec) / (other.length() * other.length())
+        return ListVector(other.vec[0],other.vec[1]).scale(tmp)
+
+def signed_angle_rotate_compare(a, b):
+    """
+        The sign recovery used by the planners before signedAngle was available
+    """
+    angle = a.angle(b)
+    if b.angle(a.rotate(angle)) != 0 :
+        angle = -angle
+    return angle
+
+def planner_update(V):
+    """
+        Vector work of one LinePlanner.update tick using operators
+    """
+    position = V(1.0, 0.2)
+    line_begin = V(0.0, 0.0)
+    line = V(0.0, 5.0)
+    heading = V(math.cos(1.4), math.sin(1.4))
+    projection = (position - line_begin).projectedOn(line)
+    perpendicular = projection - position + line_begin
+    rabbit = (line - projection).scale(0.8) + line_begin + projection
+    rabbit_path = rabbit - position
+    return (perpendicular.length(), heading.angle(rabbit_path))
+
+scratch = [Vector(0.0, 0.0) for i in range(8)]
+
+def planner_update_inplace():
+    """
+        Vector work of one LinePlanner.update tick using preallocated vectors and the in-place methods
+    """
+    (position, line_begin, line, heading, projection, perpendicular, rabbit, rabbit_path) = scratch
+    position.set(1.0, 0.2)
+    line_begin.set(0.0, 0.0)
+    line.set(0.0, 5.0)
+    heading.set(math.cos(1.4), math.sin(1.4))
+    tmp = (position.x - line_begin.x)*line.x + (position.y - line_begin.y)*line.y
+    projection.set(line.x, line.y).iscale(tmp / (line.x*line.x + line.y*line.y))
+    perpendicular.set(projection.x, projection.y).isub(position).iadd(line_begin)
+    rabbit.set(line.x, line.y).isub(projection).iscale(0.8).iadd(line_begin).iadd(projection)
+    rabbit_path.set(rabbit.x, rabbit.y).isub(position)
+    return (perpendicular.length(), heading.signedAngle(rabbit_path))
+
+def verify():
+    """
+        Compare the results of Vector with the reference for float and int components, returns the number of differences
+    """
+    cases = [((1.5, -0.5), (0.3, 2.0)), ((1, 1), (2, 0)), ((-2, -4), (2, 5)), ((3, 0), (0, 7))]
+    failed = 0
+    for ((ax, ay), (bx, by)) in cases :
+        (a, b, la, lb) = (Vector(ax, ay), Vector(bx, by), ListVector(ax, ay), ListVector(bx, by))
+        for (name, result, ref) in [('projectedOn', a.projectedOn(b), la.projectedOn(lb)), \
+                ('scale', a.scale(0.5), la.scale(0.5)), ('rotate', a.rotate(0.3), la.rotate(0.3))] :
+            if math.fabs(result[0] - ref[0]) > 1e-12 or math.fabs(result[1] - ref[1]) > 1e-12 :
+                print('%s of (%s, %s) and (%s, %s): (%g, %g), reference (%g, %g)' % \
+                    (name, ax, ay, bx, by, result[0], result[1], ref[0], ref[1]))
+                failed += 1
+        if math.fabs(a.length() - la.length()) > 1e-12 or math.fabs(a.angle(b) - la.angle(lb)) > 1e-12 :
+            print('length or angle of (%s, %s) and (%s, %s) differs from the reference' % (ax, ay, bx, by))
+            failed += 1
+    return failed
+
+if __name__ == '__main__':
+    if verify() :
+        sys.exit(1)
+    if len(sys.argv) > 1 :
+        number = int(sys.argv[1])
+    else :
+        number = 200000
+
+    setup = 'from __main__ import Vector, ListVector, signed_angle_rotate_compare, planner_update, planner_update_inplace; a = Vector(1.5, -0.5); b = Vector(0.3, 2.0); la = ListVector(1.5, -0.5); lb = ListVector(0.3, 2.0)'
+
+    tests = [
+        ('construct', 'Vector(1.0, 2.0)', 'ListVector(1.0, 2.0)'),
+        ('add', 'a + b', 'la + lb'),
+        ('sub', 'a - b', 'la - lb'),
+        ('iadd', 'a.iadd(b)', None),
+        ('isub', 'a.isub(b)', None),
+        ('scale', 'a.scale(1.1)', 'la.scale(1.1)'),
+        ('iscale', 'a.iscale(1.0)', None),
+        ('getitem', 'a[0]', 'la[0]'),
+        ('length', 'a.length()', 'la.length()'),
+        ('angle', 'a.angle(b)', 'la.angle(lb)'),
+        ('signed angle', 'a.signedAngle(b)', 'signed_angle_rotate_compare(la, lb)'),
+        ('rotate', 'a.rotate(0.3)', 'la.rotate(0.3)'),
+        ('projectedOn', 'a.projectedOn(b)', 'la.projectedOn(lb)'),
+        ('unit', 'a.unit()', None),
+        ('planner update', 'planner_update(Vector)', 'planner_update(ListVector)'),
+        ('planner in-place', 'planner_update_inplace()', None),
+    ]
+
+    print('%-18s %12s %12s %8s' % ('operation', 'Vector [us]', 'list [us]', 'speedup'))
+    for (name, stmt, ref) in tests :
+        t = min(timeit.Timer(stmt, setup=setup).repeat(3, number))
+        if ref :
+            tr = min(timeit.Timer(ref, setup=setup).repeat(3, number))
+            print('%-18s %12.3f %12.3f %7.1fx' % (name, t/number*1e6, tr/number*1e6, tr/t))
+        else :
+            print('%-18s %12.3f %12s %8s' % (name, t/number*1e6, '-', '-'))
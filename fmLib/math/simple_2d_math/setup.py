@@ -2,7 +2,7 @@ from distutils.core import setup
 from catkin_pkg.python_setup import generate_distutils_setup
 
 d = generate_distutils_setup(
-  scripts=['scripts/planner.py'],
+  scripts=['scripts/planner.py','scripts/vector_benchmark.py','scripts/signed_angle_test.py','scripts/segment_index_test.py'],
   packages=['simple_2d_math'],
   package_dir={'':'src'}
   )
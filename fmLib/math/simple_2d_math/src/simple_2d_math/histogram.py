@@ -0,0 +1,104 @@
+#*****************************************************************************
+# Simple 2D math - fixed bin histogram
+# Copyright (c) 2013, Leon Bonde Larsen <leon@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+    Fixed memory histogram for timing statistics, e.g. control loop latency.
+"""
+from array import array
+
+class Histogram(object):
+    """
+        Counts of samples in bins of equal width starting at zero, with the
+        last bin collecting everything above the range. Memory use and the
+        cost of add do not depend on the number of samples, so a histogram
+        can run for the lifetime of a node. Percentiles are resolved to the
+        upper edge of the bin they fall in.
+    """
+    __slots__ = ('bin_width', 'counts', 'count', 'total', 'minimum', 'maximum')
+
+    def __init__(self, bin_width, bins):
+        if bin_width <= 0 or bins < 1 :
+            raise ValueError("Histogram needs a positive bin width and at least one bin")
+        self.bin_width = float(bin_width)
+        self.counts = array('L', [0]) * (int(bins) + 1)
+        self.reset()
+
+    def reset(self):
+        """
+            Forget all samples
+        """
+        for i in xrange(len(self.counts)) :
+            self.counts[i] = 0
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        """
+            Count value in its bin, negative values are counted in the first bin
+        """
+        index = int(value / self.bin_width)
+        if index < 0 :
+            index = 0
+        elif index >= len(self.counts) :
+            index = len(self.counts) - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum :
+            self.minimum = value
+        if self.maximum is None or value > self.maximum :
+            self.maximum = value
+
+    def mean(self):
+        if not self.count :
+            return 0.0
+        return self.total / self.count
+
+    def percentile(self, percent):
+        """
+            Upper edge of the bin holding the given percentile, the maximum if it is above the range
+        """
+        if not self.count :
+            return 0.0
+        limit = self.count * percent / 100.0
+        accumulated = 0
+        for i in xrange(len(self.counts) - 1) :
+            accumulated += self.counts[i]
+            if accumulated >= limit :
+                return min((i + 1) * self.bin_width, self.maximum)
+        return self.maximum
+
+    def __len__(self):
+        return self.count
+
+    def __str__(self):
+        if not self.count :
+            return "no samples"
+        return "n %d mean %.4f min %.4f p50 %.4f p90 %.4f p99 %.4f max %.4f" % (self.count, self.mean(), self.minimum,
+               self.percentile(50), self.percentile(90), self.percentile(99), self.maximum)
@@ -0,0 +1,79 @@
+#*****************************************************************************
+# Simple 2D math - moving average filter
+# Copyright (c) 2013, Leon Bonde Larsen <leon@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+    Fixed size moving average filter with constant time update and mean.
+"""
+from array import array
+
+class MovingAverage(object):
+    """
+        Ring buffer of the latest samples in a preallocated array of doubles.
+        A running sum is maintained on update, so neither update nor mean
+        depends on the filter size. To keep floating point round off from
+        accumulating, the sum is recomputed from the buffer once per pass
+        through the ring, which amortizes to constant time as well.
+    """
+    __slots__ = ('buffer', 'size', 'ptr', 'total', 'updates')
+
+    def __init__(self, size, value=0.0):
+        if size < 1 :
+            raise ValueError("Moving average size must be at least 1")
+        self.size = int(size)
+        self.buffer = array('d', [value]) * self.size
+        self.reset(value)
+
+    def reset(self, value=0.0):
+        """
+            Fill the filter with value, as if value had been added size times
+        """
+        for i in xrange(self.size) :
+            self.buffer[i] = value
+        self.ptr = 0
+        self.total = value * self.size
+        self.updates = 0
+
+    def update(self, value):
+        """
+            Replace the oldest sample with value and return the new mean
+        """
+        self.total += value - self.buffer[self.ptr]
+        self.buffer[self.ptr] = value
+        self.ptr += 1
+        if self.ptr >= self.size :
+            self.ptr = 0
+        self.updates += 1
+        if self.updates >= self.size :
+            self.total = sum(self.buffer)
+            self.updates = 0
+        return self.total / self.size
+
+    def mean(self):
+        return self.total / self.size
+
+    def __len__(self):
+        return self.size
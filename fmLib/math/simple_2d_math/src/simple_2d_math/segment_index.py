@@ -0,0 +1,222 @@
+#*****************************************************************************
+# Simple 2D math - spatial index of line segments
+# Copyright (c) 2013, Leon Bonde Larsen <leon@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+    Spatial index for nearest segment and within radius queries on long routes.
+"""
+import math
+
+class SegmentIndex(object):
+    """
+        Uniform grid over a set of 2D line segments.
+        Every segment is registered in the grid cells it crosses, so a long
+        diagonal segment takes a number of cells proportional to its length.
+        A nearest segment query searches rings of cells around the query
+        point and stops when no unsearched cell can hold a closer segment, so
+        for routes of evenly sized segments a query only visits a few cells
+        regardless of the number of segments.
+
+        Points may be Vectors, tuples or anything else indexable as p[0], p[1].
+        Segments are identified by their index in the list given to the
+        constructor; for a path built with fromPath segment i runs from point
+        i to point i+1. Exact distance ties are resolved to the lowest index.
+    """
+    def __init__(self, segments, cell_size=None):
+        self.ax = []
+        self.ay = []
+        self.dx = []
+        self.dy = []
+        self.len2 = []
+        for (a, b) in segments :
+            self.ax.append(float(a[0]))
+            self.ay.append(float(a[1]))
+            self.dx.append(float(b[0]) - a[0])
+            self.dy.append(float(b[1]) - a[1])
+            self.len2.append(self.dx[-1]**2 + self.dy[-1]**2)
+
+        # Default cell size is the mean segment length
+        if cell_size is None :
+            total = sum(math.sqrt(l) for l in self.len2)
+            cell_size = total / len(self.len2) if total > 0.0 else 1.0
+        self.cell_size = cell_size
+
+        # Register the segments in the grid
+        self.cells = {}
+        self.min_cx = self.min_cy = self.max_cx = self.max_cy = 0
+        for i in xrange(len(self.ax)) :
+            (cx0, cy0) = self.cell(self.ax[i], self.ay[i])
+            (cx1, cy1) = self.cell(self.ax[i] + self.dx[i], self.ay[i] + self.dy[i])
+            if cx0 > cx1 :
+                (cx0, cx1) = (cx1, cx0)
+            if cy0 > cy1 :
+                (cy0, cy1) = (cy1, cy0)
+            if i == 0 :
+                (self.min_cx, self.min_cy, self.max_cx, self.max_cy) = (cx0, cy0, cx1, cy1)
+            else :
+                self.min_cx = min(self.min_cx, cx0)
+                self.min_cy = min(self.min_cy, cy0)
+                self.max_cx = max(self.max_cx, cx1)
+                self.max_cy = max(self.max_cy, cy1)
+            for c in self.segmentCells(i) :
+                self.cells.setdefault(c, []).append(i)
+
+    @staticmethod
+    def fromPath(points, cell_size=None):
+        """
+            Index of the segments of the polyline through points
+        """
+        return SegmentIndex(zip(points[:-1], points[1:]), cell_size)
+
+    def __len__(self):
+        return len(self.ax)
+
+    def cell(self, x, y):
+        return (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+
+    def segmentCells(self, i):
+        """
+            Grid cells crossed by segment i, found by walking along the segment from cell to cell.
+            Where the segment passes within round off of a cell corner both cells beside the
+            corner are included, so no crossed cell is missed. The number of cells grows with the
+            length of the segment, not with the area of its bounding box.
+        """
+        (x0, y0) = (self.ax[i], self.ay[i])
+        (dx, dy) = (self.dx[i], self.dy[i])
+        (cx, cy) = self.cell(x0, y0)
+        (cx1, cy1) = self.cell(x0 + dx, y0 + dy)
+        step_x = 1 if cx1 > cx else -1
+        step_y = 1 if cy1 > cy else -1
+
+        # Segment parameter t of the next cell boundary crossing in x and y, and between crossings
+        inf = float("inf")
+        (t_x, t_dx, t_y, t_dy) = (inf, inf, inf, inf)
+        if dx != 0.0 :
+            t_x = ((cx + (step_x > 0)) * self.cell_size - x0) / dx
+            t_dx = self.cell_size / abs(dx)
+        if dy != 0.0 :
+            t_y = ((cy + (step_y > 0)) * self.cell_size - y0) / dy
+            t_dy = self.cell_size / abs(dy)
+
+        cells = [(cx, cy)]
+        while cx != cx1 or cy != cy1 :
+            if cy == cy1 or (cx != cx1 and t_x < t_y - 1e-9) :
+                cx += step_x
+                t_x += t_dx
+            elif cx == cx1 or t_y < t_x - 1e-9 :
+                cy += step_y
+                t_y += t_dy
+            else :
+                # Through a corner
+                cells.append((cx + step_x, cy))
+                cells.append((cx, cy + step_y))
+                cx += step_x
+                cy += step_y
+                t_x += t_dx
+                t_y += t_dy
+            cells.append((cx, cy))
+        return cells
+
+    def distance(self, i, x, y):
+        """
+            Distance from (x,y) to segment i
+        """
+        px = x - self.ax[i]
+        py = y - self.ay[i]
+        t = 0.0
+        if self.len2[i] > 0.0 :
+            t = (px * self.dx[i] + py * self.dy[i]) / self.len2[i]
+            if t < 0.0 :
+                t = 0.0
+            elif t > 1.0 :
+                t = 1.0
+        return math.hypot(px - t * self.dx[i], py - t * self.dy[i])
+
+    def ring(self, cx, cy, r):
+        """
+            Grid cells at Chebyshev distance r from cell (cx,cy), limited to the occupied part of the grid
+        """
+        x0 = max(cx - r, self.min_cx)
+        x1 = min(cx + r, self.max_cx)
+        y0 = max(cy - r, self.min_cy)
+        y1 = min(cy + r, self.max_cy)
+        for x in xrange(x0, x1 + 1) :
+            if x == cx - r or x == cx + r :
+                for y in xrange(y0, y1 + 1) :
+                    yield (x, y)
+            else :
+                if cy - r >= self.min_cy :
+                    yield (x, cy - r)
+                if r > 0 and cy + r <= self.max_cy :
+                    yield (x, cy + r)
+
+    def nearest(self, point):
+        """
+            Return (index, distance) of the segment nearest to point, or (None, inf) for an empty index
+        """
+        (x, y) = (point[0], point[1])
+        (cx, cy) = self.cell(x, y)
+        best = None
+        best_distance = float("inf")
+        seen = set()
+
+        # Skip the empty rings between a point outside the grid and the grid
+        r = max(self.min_cx - cx, cx - self.max_cx, self.min_cy - cy, cy - self.max_cy, 0)
+        r_max = max(cx - self.min_cx, self.max_cx - cx, cy - self.min_cy, self.max_cy - cy)
+        while r <= r_max :
+            for c in self.ring(cx, cy, r) :
+                for i in self.cells.get(c, ()) :
+                    if i not in seen :
+                        seen.add(i)
+                        d = self.distance(i, x, y)
+                        if d < best_distance or (d == best_distance and i < best) :
+                            best = i
+                            best_distance = d
+            # Cells in the next ring are at least r cells away
+            if best_distance <= r * self.cell_size :
+                break
+            r += 1
+        return (best, best_distance)
+
+    def withinRadius(self, point, radius):
+        """
+            Return a list of (index, distance) of all segments within radius of point, sorted by distance
+        """
+        (x, y) = (point[0], point[1])
+        (cx0, cy0) = self.cell(x - radius, y - radius)
+        (cx1, cy1) = self.cell(x + radius, y + radius)
+        result = []
+        seen = set()
+        for cx in xrange(max(cx0, self.min_cx), min(cx1, self.max_cx) + 1) :
+            for cy in xrange(max(cy0, self.min_cy), min(cy1, self.max_cy) + 1) :
+                for i in self.cells.get((cx, cy), ()) :
+                    if i not in seen :
+                        seen.add(i)
+                        d = self.distance(i, x, y)
+                        if d <= radius :
+                            result.append((i, d))
+        result.sort(key=lambda r: (r[1], r[0]))
+        return result
@@ -29,110 +29,171 @@
     This library was developed as an alternative to the far more complex libraries
     available for handling advanced linear algebra and only handles simple 2D vectors.
 """
-import numpy as np
 import math
 
-class Vector():
+class Vector(object):
     """
-        Utility class to handle simple 2D vector calculations
+        Utility class to handle simple 2D vector calculations.
+        The components are stored as two floats in slots and all math is done
+        with plain float operations. Operators returning a new vector allocate
+        a new object, the in-place methods (iadd, isub, iscale, set) modify
+        and return the vector itself and should be used in control loops.
     """
+    __slots__ = ('x', 'y')
+
     def __init__(self,a,b):
         """
             Constructor. Implement the concept of a 2D vector
             Usage: vector = Vector(1,2)
         """
-        self.vec = [a,b]
+        self.x = a
+        self.y = b
+    
+    @property
+    def vec(self):
+        """
+            The components as a list. Kept for compatibility, modifying the list does not modify the vector
+            Usage: (x,y) = vector.vec
+        """
+        return [self.x, self.y]
     
     def __sub__(self,other):
         """
             Method to handle subtraction of two vectors.
             Usage: result = vector_a - vector_b
         """        
-        return Vector(self.vec[0] - other[0] , self.vec[1] - other[1])
+        if isinstance(other, Vector):
+            return Vector(self.x - other.x , self.y - other.y)
+        return Vector(self.x - other[0] , self.y - other[1])
     
     def __neg__(self):
         """
             Method to handle negation of a vector vectors.
             Usage: result = -vector_a
         """        
-        return Vector(-self[0],-self[1])
+        return Vector(-self.x,-self.y)
     
     def __add__(self,other):
         """
             Method to handle addition of two vectors
             Usage: result = vector_a + vector_b
         """  
-        return Vector(self.vec[0] + other[0] , self.vec[1] + other[1])
+        if isinstance(other, Vector):
+            return Vector(self.x + other.x , self.y + other.y)
+        return Vector(self.x + other[0] , self.y + other[1])
+    
+    def __iadd__(self,other):
+        """
+            Method to handle in-place addition of two vectors
+            Usage: vector_a += vector_b
+        """  
+        return self.iadd(other)
+    
+    def __isub__(self,other):
+        """
+            Method to handle in-place subtraction of two vectors
+            Usage: vector_a -= vector_b
+        """  
+        return self.isub(other)
     
     def __getitem__(self,k):
         """
             Accessor. Access vector as list or tuple
             Usage: x_component = vector[0] 
         """  
-        return self.vec[k]
+        if k == 0 :
+            return self.x
+        elif k == 1 :
+            return self.y
+        return (self.x, self.y)[k]
     
     def __setitem__(self,k,value):
         """
             Mutator. Mutate vector as list or tuple
             Usage: vector[1] = y_component
         """        
-        self.vec[k] = value
+        if k == 0 or k == -2 :
+            self.x = value
+        elif k == 1 or k == -1 :
+            self.y = value
+        else :
+            raise IndexError("Vector index out of range")
+    
+    def __len__(self):
+        """
+            Number of components, always 2
+        """
+        return 2
+    
+    def __iter__(self):
+        """
+            Iterate over the components
+            Usage: (x,y) = vector
+        """
+        yield self.x
+        yield self.y
         
     def length(self):
         """
             Method returning the length of a vector
             Usage: dist = vector.length()
         """    
-        return math.sqrt(np.dot(self.vec,self.vec))
+        return math.hypot(self.x, self.y)
     
     def dotWith(self,other):
         """
             Method returning the dot product of two vectors
             Usage: dot = vector_a.dotWith(vector_b)
         """ 
-        return np.dot(self.vec,other.vec)
+        return self.x*other.x + self.y*other.y
+    
+    def crossWith(self,other):
+        """
+            Method returning the z component of the cross product of two vectors
+            Usage: cross = vector_a.crossWith(vector_b)
+        """ 
+        return self.x*other.y - self.y*other.x
     
     def angle(self,other):
         """
-            Method returning angle between two vectors. Beware the sine trap!
+            Method returning the unsigned angle [0;pi] between two vectors. Use signedAngle to get the direction.
             Usage: angle = vector_a.angle(vector_b)
         """ 
-        if self.length() and other.length() :
-            tmp = np.dot(self.vec,other.vec) / (self.length() * other.length())
-            if tmp > 1 :
-                return math.acos(1)
-            elif  tmp < -1 :
-                return math.acos(-1)
-            else :
-                return math.acos(tmp)
-        else:
-            return 0.0
+        return math.atan2(math.fabs(self.x*other.y - self.y*other.x), self.x*other.x + self.y*other.y)
+    
+    def signedAngle(self,other):
+        """
+            Method returning the signed angle [-pi;pi] to rotate this vector by to get the direction of the other.
+            Positive angles are counter clockwise. Returns 0 if one of the vectors is the zero vector.
+            Usage: angle = vector_a.signedAngle(vector_b)
+        """ 
+        return math.atan2(self.x*other.y - self.y*other.x, self.x*other.x + self.y*other.y)
     
     def hat(self):
         """
             Method returning the perpendicular vector
             Usage: hat_vector = vector_a.hat()
         """ 
-        return Vector(self.vec[1],-self.vec[0])
+        return Vector(self.y,-self.x)
     
     def rotate(self,rad):
         """
             Method returning a vector rotated according to input
             Usage: new_vector = vector_a.rotate(math.pi/3)
         """ 
-        new_x = math.cos(rad)*self.vec[0] - math.sin(rad)*self.vec[1]
-        new_y = math.sin(rad)*self.vec[0] + math.cos(rad)*self.vec[1]
-        return Vector(new_x,new_y)
+        c = math.cos(rad)
+        s = math.sin(rad)
+        return Vector(c*self.x - s*self.y, s*self.x + c*self.y)
     
     def projectedOn(self,other):
         """
             Method returning a projection of the vector
             Usage: projection = vector_a.projectedOn(vector_b)
         """ 
-        if other.length() :
-            tmp = np.dot(other.vec,self.vec) / (other.length() * other.length())
-            new = Vector(other.vec[0],other.vec[1])
-            return new.scale(tmp)
+        len2 = other.x*other.x + other.y*other.y
+        if len2 :
+            tmp = (other.x*self.x + other.y*self.y) / float(len2) # float also for int components
+            return Vector(other.x * tmp, other.y * tmp)
         else :
             print("Vector was projected on the zero vector")
             return Vector(0,0)
@@ -142,15 +203,66 @@ class Vector():
             Method returning the vector scaled by a scalar
             Usage: new_vector = vector_a.scale(7.3)
         """ 
-        return Vector(self.vec[0] * num , self.vec[1] * num)
+        return Vector(self.x * num , self.y * num)
     
     def unit(self):
         """
             Method returning the vector normalised too length 1
             Usage: norm_vector = vector_a.unit()
         """ 
-        if self.length() :
-            return Vector(self.vec[0] / self.length() , self.vec[1] / self.length())
+        length = math.hypot(self.x, self.y)
+        if length :
+            return Vector(self.x / length , self.y / length)
         else :
             return Vector(0,0)
-    
\ No newline at end of file
+    
+    def copy(self):
+        """
+            Method returning a copy of the vector
+            Usage: new_vector = vector_a.copy()
+        """ 
+        return Vector(self.x, self.y)
+    
+    def set(self,a,b):
+        """
+            In-place method setting both components
+            Usage: vector.set(1,2)
+        """ 
+        self.x = a
+        self.y = b
+        return self
+    
+    def iadd(self,other):
+        """
+            In-place method adding a vector
+            Usage: vector_a.iadd(vector_b)
+        """ 
+        if isinstance(other, Vector):
+            self.x += other.x
+            self.y += other.y
+        else :
+            self.x += other[0]
+            self.y += other[1]
+        return self
+    
+    def isub(self,other):
+        """
+            In-place method subtracting a vector
+            Usage: vector_a.isub(vector_b)
+        """ 
+        if isinstance(other, Vector):
+            self.x -= other.x
+            self.y -= other.y
+        else :
+            self.x -= other[0]
+            self.y -= other[1]
+        return self
+    
+    def iscale(self,num):
+        """
+            In-place method scaling the vector by a scalar
+            Usage: vector_a.iscale(7.3)
+        """ 
+        self.x *= num
+        self.y *= num
+        return self
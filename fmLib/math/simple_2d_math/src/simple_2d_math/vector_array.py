@@ -0,0 +1,224 @@
+#*****************************************************************************
+# Simple 2D math - arrays of vectors
+# Copyright (c) 2013, Leon Bonde Larsen <leon@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+    Batch counterpart of the Vector class. A VectorArray holds N 2D vectors in
+    an Nx2 numpy array and implements the Vector operations element-wise, so
+    whole trajectories can be analysed without a python loop per point.
+"""
+import numpy as np
+from simple_2d_math.vector import Vector
+
+class VectorArray(object):
+    """
+        Utility class to handle calculations on many 2D vectors at once.
+        Operations taking another vector accept a VectorArray of the same
+        length, a single Vector or a tuple (broadcast to all elements).
+    """
+    __slots__ = ('xy',)
+
+    def __init__(self,a,b=None):
+        """
+            Constructor. Takes an Nx2 array (or list of pairs or Vectors) or two arrays of x and y components
+            Usage: vectors = VectorArray([[0,1],[2,3]]) or VectorArray(x_array,y_array)
+        """
+        if b is None :
+            if len(a) and isinstance(a[0], Vector) :
+                a = [(v.x, v.y) for v in a]
+            self.xy = np.array(a, dtype=np.float64).reshape(-1,2)
+        else :
+            self.xy = np.column_stack((np.asarray(a, dtype=np.float64).ravel(), np.asarray(b, dtype=np.float64).ravel()))
+
+    @staticmethod
+    def fromAngles(rad):
+        """
+            Method returning unit vectors pointing in the given directions, e.g. headings from yaw angles
+            Usage: headings = VectorArray.fromAngles(yaw_array)
+        """
+        rad = np.asarray(rad, dtype=np.float64)
+        return VectorArray(np.cos(rad), np.sin(rad))
+
+    @property
+    def x(self):
+        """
+            The x components (a view)
+        """
+        return self.xy[:,0]
+
+    @property
+    def y(self):
+        """
+            The y components (a view)
+        """
+        return self.xy[:,1]
+
+    def __len__(self):
+        return self.xy.shape[0]
+
+    def __getitem__(self,k):
+        """
+            Accessor. An integer index returns a Vector, a slice or index array returns a VectorArray
+            Usage: vector = vectors[3]
+        """
+        if isinstance(k, (int, np.integer)) :
+            return Vector(float(self.xy[k,0]), float(self.xy[k,1]))
+        return VectorArray(self.xy[k])
+
+    def _other(self,other):
+        """
+            Returns the other operand as an array broadcastable against xy
+        """
+        if isinstance(other, VectorArray) :
+            return other.xy
+        return np.array((other[0], other[1]), dtype=np.float64)
+
+    def __add__(self,other):
+        return VectorArray(self.xy + self._other(other))
+
+    def __sub__(self,other):
+        return VectorArray(self.xy - self._other(other))
+
+    def __neg__(self):
+        return VectorArray(-self.xy)
+
+    def __iadd__(self,other):
+        self.xy += self._other(other)
+        return self
+
+    def __isub__(self,other):
+        self.xy -= self._other(other)
+        return self
+
+    def length(self):
+        """
+            Method returning the length of each vector
+            Usage: dist = vectors.length()
+        """
+        return np.hypot(self.xy[:,0], self.xy[:,1])
+
+    def dotWith(self,other):
+        """
+            Method returning the element-wise dot product
+            Usage: dot = vectors_a.dotWith(vectors_b)
+        """
+        o = self._other(other)
+        return self.xy[:,0]*o[...,0] + self.xy[:,1]*o[...,1]
+
+    def crossWith(self,other):
+        """
+            Method returning the z component of the element-wise cross product
+            Usage: cross = vectors_a.crossWith(vectors_b)
+        """
+        o = self._other(other)
+        return self.xy[:,0]*o[...,1] - self.xy[:,1]*o[...,0]
+
+    def angle(self,other):
+        """
+            Method returning the unsigned angles [0;pi] between the vectors
+            Usage: angle = vectors_a.angle(vectors_b)
+        """
+        return np.arctan2(np.fabs(self.crossWith(other)), self.dotWith(other))
+
+    def signedAngle(self,other):
+        """
+            Method returning the signed angles [-pi;pi] to rotate the vectors by to get the direction of the other.
+            With headings and paths to a target this is the signed heading error.
+            Usage: angle_error = headings.signedAngle(target - positions)
+        """
+        return np.arctan2(self.crossWith(other), self.dotWith(other))
+
+    def hat(self):
+        """
+            Method returning the perpendicular vectors
+            Usage: hat_vectors = vectors.hat()
+        """
+        return VectorArray(self.xy[:,1], -self.xy[:,0])
+
+    def rotate(self,rad):
+        """
+            Method returning the vectors rotated by an angle or an array of angles
+            Usage: new_vectors = vectors.rotate(math.pi/3)
+        """
+        c = np.cos(rad)
+        s = np.sin(rad)
+        return VectorArray(c*self.xy[:,0] - s*self.xy[:,1], s*self.xy[:,0] + c*self.xy[:,1])
+
+    def projectedOn(self,other):
+        """
+            Method returning the projections of the vectors on another vector (or vectors).
+            Projections on the zero vector are the zero vector.
+            Usage: projections = vectors.projectedOn(line)
+        """
+        o = self._other(other)
+        len2 = o[...,0]*o[...,0] + o[...,1]*o[...,1]
+        tmp = np.where(len2 > 0.0, self.dotWith(other) / np.where(len2 > 0.0, len2, 1.0), 0.0)
+        return VectorArray(tmp*o[...,0], tmp*o[...,1])
+
+    def scale(self,num):
+        """
+            Method returning the vectors scaled by a scalar or an array of scalars
+            Usage: new_vectors = vectors.scale(7.3)
+        """
+        num = np.asarray(num, dtype=np.float64)
+        if num.ndim :
+            num = num[:,np.newaxis]
+        return VectorArray(self.xy * num)
+
+    def unit(self):
+        """
+            Method returning the vectors normalised too length 1, zero vectors stay zero
+            Usage: norm_vectors = vectors.unit()
+        """
+        length = self.length()
+        return VectorArray(self.xy / np.where(length > 0.0, length, 1.0)[:,np.newaxis])
+
+    def distanceToLine(self,begin,end):
+        """
+            Method returning the signed perpendicular distance from the points to the infinite line
+            through begin and end. Points to the left of the line direction are positive.
+            Where begin and end coincide the line has no direction and the distance to begin is returned.
+            Usage: cross_track_error = positions.distanceToLine(line_begin, line_end)
+        """
+        b = self._other(begin)
+        d = self._other(end) - b
+        length = np.hypot(d[...,0], d[...,1])
+        px = self.xy[:,0] - b[...,0]
+        py = self.xy[:,1] - b[...,1]
+        return np.where(length > 0.0, (py*d[...,0] - px*d[...,1]) / np.where(length > 0.0, length, 1.0), np.hypot(px, py))
+
+    def distanceToSegment(self,begin,end):
+        """
+            Method returning the (unsigned) distance from the points to the line segment from begin to end
+            Usage: dist = positions.distanceToSegment(line_begin, line_end)
+        """
+        b = self._other(begin)
+        d = self._other(end) - b
+        len2 = d[...,0]*d[...,0] + d[...,1]*d[...,1]
+        px = self.xy[:,0] - b[...,0]
+        py = self.xy[:,1] - b[...,1]
+        t = np.clip(np.where(len2 > 0.0, (px*d[...,0] + py*d[...,1]) / np.where(len2 > 0.0, len2, 1.0), 0.0), 0.0, 1.0)
+        return np.hypot(px - t*d[...,0], py - t*d[...,1])
@@ -0,0 +1,8 @@
+from distutils.core import setup
+from catkin_pkg.python_setup import generate_distutils_setup
+
+d = generate_distutils_setup(
+  packages=['pose_provider'],
+  package_dir={'':'src'}
+  )
+setup(**d)
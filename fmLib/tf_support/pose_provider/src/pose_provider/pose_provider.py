@@ -0,0 +1,108 @@
+#*****************************************************************************
+# Pose provider - cached vehicle pose from tf
+# Copyright (c) 2013, Leon Bonde Larsen <leon@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+    Shared access to the vehicle pose in the odometry frame.
+    All users in a process share one tf listener, and one PoseProvider per
+    pair of frames caches the latest (x, y, yaw) with its time stamp. The
+    transform lookup and the quaternion conversion are only done when tf has
+    a newer transform than the cached one, no matter how many planners and
+    actions ask for the pose on every tick.
+
+    Usage:
+        provider = pose_provider.get_provider("/odom", "/base_footprint")
+        pose = provider.getPose()
+        if pose :
+            (x, y, yaw, stamp) = pose
+"""
+import rospy, tf, threading
+
+# Poses older than this many seconds are considered stale by default
+default_max_age = 1.0
+
+_listener = None
+_providers = {}
+_lock = threading.Lock()
+
+def get_listener():
+    """
+        The tf listener of the process, created on first use
+    """
+    global _listener
+    with _lock :
+        if _listener is None :
+            _listener = tf.TransformListener()
+        return _listener
+
+def get_provider(odom_frame, base_frame):
+    """
+        The shared pose provider for base_frame in odom_frame
+    """
+    get_listener()
+    with _lock :
+        key = (odom_frame, base_frame)
+        if key not in _providers :
+            _providers[key] = PoseProvider(odom_frame, base_frame)
+        return _providers[key]
+
+class PoseProvider():
+    """
+        Latest pose of base_frame in odom_frame, use get_provider to get the shared instance
+    """
+    def __init__(self, odom_frame, base_frame):
+        self.odom_frame = odom_frame
+        self.base_frame = base_frame
+        self.lock = threading.Lock()
+        self.x = 0.0
+        self.y = 0.0
+        self.yaw = 0.0
+        self.stamp = None
+
+    def getPose(self, max_age=default_max_age):
+        """
+            Return (x, y, yaw, stamp) of the latest pose, or None if the vehicle has not been
+            located or the pose is more than max_age seconds old (None disables the check).
+            Never waits for tf.
+        """
+        listener = get_listener()
+        with self.lock :
+            try :
+                latest = listener.getLatestCommonTime(self.odom_frame, self.base_frame)
+                if self.stamp is None or latest > self.stamp :
+                    (position, quaternion) = listener.lookupTransform(self.odom_frame, self.base_frame, latest)
+                    self.x = position[0]
+                    self.y = position[1]
+                    self.yaw = tf.transformations.euler_from_quaternion(quaternion)[2]
+                    self.stamp = latest
+            except (tf.Exception, tf.LookupException, tf.ConnectivityException, tf.ExtrapolationException) :
+                pass
+
+            if self.stamp is None :
+                return None
+            if max_age is not None and (rospy.Time.now() - self.stamp).to_sec() > max_age :
+                return None
+            return (self.x, self.y, self.yaw, self.stamp)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# Pose 2D Estimator - batch evaluation of noise parameters
+# Copyright (c) 2013, Kjeld Jensen <kjeld@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+This file contains a Python script that evaluates the Pose 2D Estimator on
+a number of recorded logs for each combination of a grid of noise
+parameters, and reports the position error of each combination.
+
+A log is a directory containing the binary log (sim_index.json) or the text
+files sim_odometry.txt and sim_gnss.txt as written by import_bag_to_csv.py. All directories below the given log directories
+are searched for logs. Each log is replayed event by event for each
+combination of the parameters, and the replays are distributed over a pool
+of processes.
+
+The ground truth is the RTK fixed GNSS positions: at each RTK fixed position
+the position error is the distance from the estimate before the position is
+used by the EKF (the a priori estimate) to the position. Positions within
+the settle time from the start of a log are not evaluated, to leave out the
+convergence from the initial guess. Implausible positions are not used as
+ground truth: positions with the latitude or longitude out of range, and
+positions further from the previous ground truth position than the robot
+can drive at max speed in the time between them (plus gt_tolerance), as
+the corrupt positions in sim_gnss.txt.
+
+The combinations are listed in order of increasing 95th percentile of the
+error on all logs, which is less sensitive than the RMS error to the few
+large errors after the EKF has used a corrupt position. With --csv the
+error of each combination on each log is saved as well.
+
+Usage: batch_evaluation.py [-h] [--var-dist V [V ...]] [--var-angle V [V ...]]
+	[--std-dev-rtk-fixed S [S ...]] [--std-dev-rtk-float S [S ...]]
+	[--std-dev-dgps S [S ...]] [--std-dev-sps S [S ...]] [--settle SECONDS]
+	[--max-speed M] [--processes N] [--csv FILE] log_dir [log_dir ...]
+
+Revision
+2013-05-08 KJ First version
+"""
+
+# imports
+import os, sys, csv
+import argparse
+import numpy as np
+from time import time
+from math import sqrt, pi
+from itertools import product
+from multiprocessing import Pool, cpu_count
+from pose_2d_estimator import pose_2d_gnss_preprocessor, pose_2d_ekf
+from sim_import import odometry_data, gnss_data, merge_events, log_files, index_file
+
+# parameters
+odo_file = 'sim_odometry.txt'
+gnss_file = 'sim_gnss.txt'
+rtk_fixed = 4 # GNSS fix quality of the ground truth
+gt_tolerance = 0.1 # [m] position jump allowed between ground truth positions in addition to max speed
+parameters = ['var_dist', 'var_angle', 'std_dev_rtk_fixed', 'std_dev_rtk_float', 'std_dev_dgps', 'std_dev_sps']
+
+# return signed difference between new and old angle
+def angle_diff (angle_new, angle_old):
+	diff = angle_new - angle_old
+	while diff < -pi:
+		diff += 2*pi
+	while diff > pi:
+		diff -= 2*pi
+	return diff
+
+def find_logs (dirs):
+	logs = []
+	for d in dirs:
+		for (path, dirnames, filenames) in os.walk(d):
+			dirnames.sort()
+			if index_file in filenames or (odo_file in filenames and gnss_file in filenames):
+				logs.append(path)
+	return logs
+
+# the log last imported by this process, the tasks are ordered by log
+imported = [None, None]
+
+def import_log (log):
+	if imported[0] != log:
+		imported[1] = None # release the previous log before importing the next
+		files = log_files(log)
+		odo = odometry_data(files['odometry'], 0)
+		gnss = gnss_data(files['gnss'], 0, True)
+		imported[:] = [log, (odo, gnss)]
+	return imported[1]
+
+def plausible (sample, prev, max_speed):
+	"""
+	Returns True if the GNSS position is plausible as ground truth following
+	the previous ground truth position
+	"""
+	if not (-90.0 <= sample[1] <= 90.0 and -180.0 <= sample[2] <= 180.0):
+		return False
+	if prev != None:
+		jump = sqrt((sample[6]-prev[6])**2 + (sample[7]-prev[7])**2)
+		if jump > max_speed*abs(sample[0]-prev[0]) + gt_tolerance:
+			return False
+	return True
+
+def evaluate (task):
+	"""
+	Replays a log with one combination of the noise parameters and returns
+	the position errors [m] at the RTK fixed GNSS positions and the number
+	of RTK fixed positions rejected as ground truth
+	"""
+	(log, config, settle, max_speed) = task
+	(var_dist, var_angle, std_dev_rtk_fixed, std_dev_rtk_float, std_dev_dgps, std_dev_sps) = config
+	(odo, gnss) = import_log (log)
+	gp = pose_2d_gnss_preprocessor(std_dev_rtk_fixed, std_dev_rtk_float, std_dev_dgps, std_dev_sps)
+	ekf = pose_2d_ekf()
+	ekf.set_initial_guess([1.0, 1.0, 180.0*pi/180.0])
+	errors = []
+	rejected = 0
+	if gnss.length == 0:
+		return (log, config, np.array(errors), rejected)
+	evaluate_from = gnss.data[0][0] + settle
+	prev_odometry = None
+	prev_truth = None
+	for (log_time, source, sample) in merge_events (odo, gnss):
+		if source == 0:
+			# EKF system update (odometry), the log positions are in mm
+			odometry = [sample[0], sample[1]/1000.0, sample[2]/1000.0, sample[3]]
+			if prev_odometry != None:
+				delta_dist = sqrt((odometry[1]-prev_odometry[1])**2 + (odometry[2]-prev_odometry[2])**2)
+				delta_angle = angle_diff (odometry[3], prev_odometry[3])
+				ekf.system_update (delta_dist, var_dist, delta_angle, var_angle)
+			prev_odometry = odometry
+		else:
+			# position error of the a priori estimate
+			if sample[3] == rtk_fixed:
+				if plausible (sample, prev_truth, max_speed):
+					prev_truth = sample
+					if log_time >= evaluate_from:
+						errors.append(sqrt((ekf.prevX[0]-sample[6])**2 + (ekf.prevX[1]-sample[7])**2))
+				else:
+					rejected += 1
+
+			# EKF measurement update (GNSS)
+			gp.add_gnss_measurement (sample)
+			ekf.measurement_update_gnss ([sample[6], sample[7]], gp.estimate_variance())
+	return (log, config, np.array(errors), rejected)
+
+def error_statistics (errors):
+	if len(errors) == 0:
+		return [0, float('nan'), float('nan'), float('nan'), float('nan')]
+	return [len(errors), sqrt(np.mean(errors**2)), np.mean(errors), np.percentile(errors, 95), np.max(errors)]
+
+# main
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Evaluate the Pose 2D Estimator on recorded logs for a grid of noise parameters')
+	parser.add_argument('log_dir', nargs='+', help='directory searched for logs')
+	parser.add_argument('--var-dist', type=float, nargs='+', default=[0.0000000001], metavar='V', \
+		help='odometry distance variances')
+	parser.add_argument('--var-angle', type=float, nargs='+', default=[0.001], metavar='V', \
+		help='odometry angle variances')
+	parser.add_argument('--std-dev-rtk-fixed', type=float, nargs='+', default=[0.02], metavar='S', \
+		help='GNSS RTK fixed standard deviations [m]')
+	parser.add_argument('--std-dev-rtk-float', type=float, nargs='+', default=[2.0], metavar='S', \
+		help='GNSS RTK float standard deviations [m]')
+	parser.add_argument('--std-dev-dgps', type=float, nargs='+', default=[7.0], metavar='S', \
+		help='GNSS DGPS standard deviations [m]')
+	parser.add_argument('--std-dev-sps', type=float, nargs='+', default=[15.0], metavar='S', \
+		help='GNSS SPS standard deviations [m]')
+	parser.add_argument('--settle', type=float, default=10.0, metavar='SECONDS', \
+		help='time from the start of each log before the error is evaluated (default 10)')
+	parser.add_argument('--max-speed', type=float, default=5.0, metavar='M', \
+		help='maximum speed of the robot for rejecting ground truth positions [m/s] (default 5)')
+	parser.add_argument('--processes', type=int, default=cpu_count(), metavar='N', \
+		help='number of processes (default the number of CPUs)')
+	parser.add_argument('--csv', metavar='FILE', help='save the error of each combination on each log')
+	args = parser.parse_args()
+
+	logs = find_logs (args.log_dir)
+	if logs == []:
+		print ('No logs (directories containing %s, or %s and %s) found' % (index_file, odo_file, gnss_file))
+		sys.exit(1)
+	configs = list(product(args.var_dist, args.var_angle, args.std_dev_rtk_fixed, \
+		args.std_dev_rtk_float, args.std_dev_dgps, args.std_dev_sps))
+	print ('Evaluating %d combinations of parameters on %d logs using %d processes' % \
+		(len(configs), len(logs), args.processes))
+
+	# the tasks of a log are kept together so each process imports few logs
+	tasks = [(log, config, args.settle, args.max_speed) for log in logs for config in configs]
+	chunksize = max(1, min(len(configs), len(tasks)//(4*args.processes)))
+	start = time()
+	pool = Pool(args.processes)
+	results = pool.map(evaluate, tasks, chunksize)
+	pool.close()
+	pool.join()
+	elapsed = time() - start
+	print ('%d replays in %.1fs' % (len(tasks), elapsed))
+	rejected = sum(r for (log, config, e, r) in results if config == configs[0])
+	print ('%d implausible RTK fixed positions rejected as ground truth' % rejected)
+
+	# save the error of each combination on each log
+	if args.csv:
+		f = open(args.csv, 'wb')
+		w = csv.writer(f)
+		w.writerow(['log'] + parameters + ['fixes', 'rms', 'mean', 'p95', 'max'])
+		for (log, config, errors, r) in results:
+			w.writerow([log] + list(config) + error_statistics(errors))
+		f.close()
+
+	# error of each combination on all logs
+	errors = {}
+	for (log, config, e, r) in results:
+		errors.setdefault(config, []).append(e)
+	summary = []
+	for config in configs:
+		summary.append((config, error_statistics(np.concatenate(errors[config]))))
+	summary.sort(key=lambda s: (np.isnan(s[1][3]), s[1][3]))
+
+	print ('%10s %10s %8s %8s %8s %8s %8s %9s %9s %9s %9s' % ('var_dist', 'var_angle', 'sd_fixed', \
+		'sd_float', 'sd_dgps', 'sd_sps', 'fixes', 'rms [m]', 'mean [m]', 'p95 [m]', 'max [m]'))
+	for (config, stat) in summary:
+		print ('%10.3g %10.3g %8.3g %8.3g %8.3g %8.3g %8d %9.4f %9.4f %9.4f %9.4f' % (tuple(config) + tuple(stat)))
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# Pose 2D Estimator - convert text logs to binary logs
+# Copyright (c) 2013, Kjeld Jensen <kjeld@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+This file contains a Python script that converts the comma delimited text
+files of logs, as written by import_bag_to_csv.py --csv or by earlier
+versions of it, to the binary log format of sim_import.py, and reports the
+time to load each log with odometry_data and gnss_data from the text files
+and from the binary files.
+
+Usage: convert_csv_log.py [log_dir ...]
+
+Revision
+2013-05-18 KJ First version
+"""
+
+# imports
+import os, sys, csv, gc
+import numpy as np
+from time import time
+from sim_import import odometry_dtype, imu_dtype, gnss_dtype, log_topics, write_log_index, gnss_to_utm
+from sim_import import odometry_data, gnss_data
+
+dtypes = {'odometry': odometry_dtype, 'imu': imu_dtype, 'gnss': gnss_dtype}
+
+def read_text (filename, dtype):
+	f = open(filename, 'rb')
+	fields = len(dtype.names)
+	if dtype == gnss_dtype:
+		fields -= 2 # easting and northing are not in the text file
+	samples = [tuple(row[:fields]) + (0.0,)*(len(dtype.names) - fields) for row in csv.reader(f, delimiter=',')]
+	f.close()
+	return np.array(samples, dtype)
+
+def load_time (loader, *args):
+	gc.collect() # leave out the release of the previous log
+	start = time()
+	loader (*args)
+	return time() - start
+
+# main
+if __name__ == '__main__':
+	dirs = sys.argv[1:]
+	if dirs == []:
+		dirs = ['.']
+	for d in dirs:
+		logs = {}
+		for (name, topic, binary_file, text_file) in log_topics:
+			if os.path.exists(os.path.join(d, text_file)):
+				data = read_text (os.path.join(d, text_file), dtypes[name])
+				if name == 'gnss':
+					gnss_to_utm (data)
+				np.save(os.path.join(d, binary_file), data)
+				logs[name] = (topic, binary_file, data)
+		if logs == {}:
+			print ('%s: no text files' % d)
+			continue
+		write_log_index (d, logs, 'text files')
+
+		# load time of the text and binary files
+		for (name, loader, args) in [('odometry', odometry_data, (0,)), ('gnss', gnss_data, (0, True))]:
+			if name in logs:
+				(topic, binary_file, data) = logs[name]
+				text = load_time (loader, os.path.join(d, dict((l[0], l[3]) for l in log_topics)[name]), *args)
+				binary = load_time (loader, os.path.join(d, binary_file), *args)
+				print ('%s %s: %d samples, load %.1f ms from text, %.2f ms from binary' % \
+					(d, name, len(data), text*1e3, binary*1e3))
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# Pose 2D Estimator - EKF backend benchmark
+# Copyright (c) 2013, Kjeld Jensen <kjeld@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+This file contains a Python script that tests and benchmarks the backends
+of the Pose 2D Estimator EKF. The GNSS log sim_gnss.txt is replayed with
+odometry synthesized at 200 Hz along the GNSS track (see ekf_benchmark.py)
+by the numpy backend, by the numba backend if numba can be imported, and by
+the numba backend kernels run by the Python interpreter. The script verifies
+that the estimates after each update and the final covariance of each are
+bit for bit the same as those of the numpy backend, with and without
+Joseph form and with the process noise reset to the identity or to zero
+(zero_q_reset), and reports the updates per second of each.
+
+Usage: ekf_backend_benchmark.py [number of replays]
+
+Revision
+2013-05-10 KJ First version
+"""
+
+# imports
+import sys, time
+import numpy as np
+import ekf_benchmark
+import pose_2d_estimator
+from ekf_benchmark import build_updates, replay
+from pose_2d_estimator import pose_2d_ekf, ekf_system_update, ekf_measurement_update_gnss
+from sim_import import gnss_data
+
+# parameters
+gnss_file = 'sim_gnss.txt'
+ekf_benchmark.odo_rate = 200.0 # [Hz]
+
+def interpreted_kernels (ekf):
+	"""
+	Replaces the updates of a numpy backend EKF by the kernels of the numba
+	backend run by the Python interpreter
+	"""
+	def system_update (delta_dist, var_dist, delta_angle, var_angle):
+		ekf_system_update (ekf.prevX, ekf.prevCov, ekf.Q, delta_dist, var_dist, delta_angle, var_angle, \
+			ekf.zero_q_reset)
+		return ekf.prevX
+	def measurement_update_gnss (pos, var_pos):
+		ekf_measurement_update_gnss (ekf.prevX, ekf.prevCov, ekf.Q, ekf.K, ekf.A, ekf.tmp, \
+			pos[0], pos[1], var_pos, ekf.joseph_form, ekf.zero_q_reset)
+		return ekf.prevX
+	ekf.system_update = system_update
+	ekf.measurement_update_gnss = measurement_update_gnss
+	return ekf
+
+def new_ekf (backend, joseph_form, zero_q_reset=False):
+	if backend == 'interpreted':
+		return interpreted_kernels (pose_2d_ekf(joseph_form, 'numpy', zero_q_reset))
+	return pose_2d_ekf(joseph_form, backend, zero_q_reset)
+
+# main
+if __name__ == '__main__':
+	if len(sys.argv) > 1:
+		replays = int(sys.argv[1])
+	else:
+		replays = 3
+
+	gnss = gnss_data(gnss_file, 0, True).data
+	updates = build_updates (gnss)
+	n_odo = sum(1 for update in updates if update[0] == 'odo')
+	print ('Replay: %d odometry and %d GNSS updates' % (n_odo, len(updates) - n_odo))
+
+	backends = ['numpy', 'interpreted']
+	if pose_2d_estimator.njit != None:
+		backends.insert(1, 'numba')
+		start = time.time()
+		replay (pose_2d_ekf(backend='numba'), updates[:2])
+		print ('Numba compilation: %.2fs' % (time.time() - start))
+	else:
+		print ('Numba is not available, the numba backend is not tested')
+
+	# verify that the estimates are bit for bit the same
+	failed = False
+	for (joseph_form, zero_q_reset) in [(True, False), (False, False), (True, True)]:
+		for backend in backends:
+			ekf = new_ekf (backend, joseph_form, zero_q_reset)
+			estimates = []
+			replay (ekf, updates, estimates)
+			estimates = np.array(estimates)
+			if backend == 'numpy':
+				reference = (estimates, ekf.prevCov.copy())
+				continue
+			same = np.array_equal(estimates, reference[0]) and np.array_equal(ekf.prevCov, reference[1])
+			print ('%-12s Joseph form %-5s zero Q reset %-5s %s' % (backend, joseph_form, zero_q_reset, \
+				'identical to numpy' if same else 'DIFFERS from numpy, max %.3g' % np.abs(estimates - reference[0]).max()))
+			failed = failed or not same
+
+	# throughput
+	print ('%-12s %14s %12s' % ('backend', 'updates/s', 'us/update'))
+	for backend in backends:
+		best = None
+		for i in xrange(replays):
+			ekf = new_ekf (backend, True)
+			start = time.time()
+			replay (ekf, updates)
+			elapsed = time.time() - start
+			if best == None or elapsed < best:
+				best = elapsed
+		print ('%-12s %14.0f %12.2f' % (backend, len(updates)/best, best/len(updates)*1e6))
+
+	if failed:
+		sys.exit(1)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# Pose 2D Estimator - robot drive simulation
+# Copyright (c) 2013, Kjeld Jensen <kjeld@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+This file contains a Python script that replays the GNSS log sim_gnss.txt
+through the Pose 2D Estimator EKF and through the previous np.matrix based
+implementation, which is included below as reference. Odometry is
+synthesized at 100 Hz along the GNSS track, as the bundled odometry log
+does not cover the GNSS log. The script verifies that the estimates with
+and without Joseph form agree with those of the reference within round
+off, and reports the updates per second of each.
+
+Usage: ekf_benchmark.py [number of replays]
+
+Revision
+2013-05-06 KJ First version
+"""
+
+# imports
+import sys, time
+import numpy as np
+from math import sqrt, pi, sin, cos, atan2
+from numpy import matrix, array, linalg, mat
+from pose_2d_estimator import pose_2d_gnss_preprocessor, pose_2d_ekf
+from sim_import import gnss_data
+
+# parameters
+gnss_file = 'sim_gnss.txt'
+tolerance_pos = 1e-5 # [m]
+tolerance_yaw = 1e-6 # [rad]
+odo_rate = 100.0 # [Hz]
+var_dist = 0.0000000001
+var_angle = 0.001
+
+class pose_2d_ekf_matrix():
+	"""
+	Reference: the previous np.matrix based EKF
+	"""
+	def __init__(self):
+		self.prevX = self.set_initial_guess([0.0, 0.0, 0.0])
+		self.prevCov = np.matrix([[1000.0,0.0,0.0],[0.,1000.0,0.0], \
+			[0.0,0.0,2.0*pi]]) # high variance for the initial guess 
+		self.Q = np.identity(3)
+		self.Hgnss = np.matrix([[1., 0., 0.,],[0., 1., 0.]]) # GNSS observation matrix
+
+	def set_initial_guess (self, x):
+		self.prevX = np.matrix(x)
+
+	def system_update (self, delta_dist, var_dist, delta_angle, var_angle):
+		u = [delta_dist, delta_angle]
+		priX = self.f(self.prevX, u)
+		self.Q = self.Q + np.matrix([[delta_dist*var_dist, 0.0, 0.0], \
+			[0.0, delta_dist*var_dist, 0.0], \
+			[0.0, 0.0, delta_angle/(2*pi)*var_angle]])
+		Gm = self.G(self.prevX, u)
+		priCov = Gm*self.prevCov*Gm.T + self.Q 
+		self.prevX = priX
+		self.prevCov = priCov
+		return array(self.prevX)[0]
+
+	def measurement_update_gnss (self, pos, var_pos):
+		K = self.prevCov*self.Hgnss.T*linalg.inv(self.Hgnss*self.prevCov*self.Hgnss.T + self.R(var_pos))
+		prev_pos = [array(self.prevX)[0][0], array(self.prevX)[0][1]]
+		y = np.matrix(pos).T - np.matrix(prev_pos).T
+		postX = self.prevX + (K*y).T
+		postCov = (mat(np.identity(3))-K*self.Hgnss)*self.prevCov
+		self.Q = np.identity(3)
+		self.prevX = postX
+		self.prevCov = postCov
+		return self.prevX
+
+	def R (self, var_pos):
+		return np.matrix([[var_pos, 0.],[0., var_pos]])
+
+	def f (self, x, u):
+		x = array(x)[0]
+		theta = x[2]
+		dTheta = u[1]
+		l1 = [x[0]+u[0]*cos(theta+dTheta/2.),x[1]+u[0]*sin(theta+dTheta/2.),theta+dTheta]
+		return np.matrix(l1)
+
+	def G (self, x, u):
+		x = array(x)[0]
+		theta = x[2]
+		dTheta = u[1]
+		l1 = [1., 0., -u[0]*sin(theta+dTheta/2.)]
+		l2 = [0., 1., u[0]*cos(theta+dTheta/2.)]
+		l3 = [0., 0., 1.]
+		return (np.matrix([l1, l2, l3]))
+
+# return signed difference between new and old angle
+def angle_diff (angle_new, angle_old):
+	diff = angle_new - angle_old
+	while diff < -pi:
+		diff += 2*pi
+	while diff > pi:
+		diff -= 2*pi
+	return diff
+
+def build_updates (gnss):
+	"""
+	Sequence of EKF updates replaying the GNSS log: ('odo', delta_dist,
+	delta_angle) at odo_rate along the straight line between fixes, and
+	('gnss', pos, var_pos) for each fix
+	"""
+	gp = pose_2d_gnss_preprocessor()
+	updates = []
+	heading = 0.0
+	for i in xrange(len(gnss)):
+		if i > 0:
+			dx = gnss[i][6] - gnss[i-1][6]
+			dy = gnss[i][7] - gnss[i-1][7]
+			steps = max(1, int(round((gnss[i][0] - gnss[i-1][0])*odo_rate)))
+			dist = sqrt(dx**2 + dy**2)
+			turn = 0.0
+			if dist > 0.01:
+				turn = angle_diff(atan2(dy, dx), heading)
+				heading += turn
+			for j in xrange(steps):
+				updates.append(('odo', dist/steps, turn/steps))
+		gp.add_gnss_measurement (gnss[i])
+		updates.append(('gnss', [gnss[i][6], gnss[i][7]], gp.estimate_variance()))
+	return updates
+
+def replay (ekf, updates, estimates=None):
+	ekf.set_initial_guess([1.0, 1.0, 180.0*pi/180.0])
+	for update in updates:
+		if update[0] == 'odo':
+			pose = ekf.system_update (update[1], var_dist, update[2], var_angle)
+		else:
+			pose = ekf.measurement_update_gnss (update[1], update[2])
+		if estimates != None:
+			estimates.append(np.array(pose).ravel())
+
+# main
+if __name__ == '__main__':
+	if len(sys.argv) > 1:
+		replays = int(sys.argv[1])
+	else:
+		replays = 3
+
+	gnss = gnss_data(gnss_file, 0, True).data
+	updates = build_updates (gnss)
+	n_odo = sum(1 for update in updates if update[0] == 'odo')
+	print ('Replay: %d odometry and %d GNSS updates' % (n_odo, len(updates) - n_odo))
+
+	# verify that the estimates agree
+	reference = []
+	replay (pose_2d_ekf_matrix(), updates, reference)
+	reference = np.array(reference)
+	failed = False
+	for joseph_form in [False, True]:
+		estimates = []
+		replay (pose_2d_ekf(joseph_form), updates, estimates)
+		diff = np.abs(reference - np.array(estimates))
+		print ('Max difference to reference, Joseph form %s: %.3g m position, %.3g rad yaw' % \
+			(joseph_form, diff[:,0:2].max(), diff[:,2].max()))
+		if diff[:,0:2].max() > tolerance_pos or diff[:,2].max() > tolerance_yaw:
+			failed = True
+	print ('Final estimate: %.6f %.6f %.6f' % tuple(estimates[-1]))
+
+	# throughput
+	print ('%-10s %14s %12s' % ('EKF', 'updates/s', 'us/update'))
+	results = []
+	for (name, new_ekf) in [('matrix', pose_2d_ekf_matrix), ('ndarray', lambda: pose_2d_ekf(False)), ('joseph', pose_2d_ekf)]:
+		best = None
+		for i in xrange(replays):
+			ekf = new_ekf()
+			t = time.time()
+			replay (ekf, updates)
+			t = time.time() - t
+			if best == None or t < best:
+				best = t
+		results.append(best)
+		print ('%-10s %14.0f %12.2f' % (name, len(updates)/best, best/len(updates)*1e6))
+	print ('Speedup: %.1fx, %.1fx with Joseph form' % (results[0]/results[1], results[0]/results[2]))
+
+	if failed:
+		print ('Estimates differ by more than %g m or %g rad' % (tolerance_pos, tolerance_yaw))
+		sys.exit(1)
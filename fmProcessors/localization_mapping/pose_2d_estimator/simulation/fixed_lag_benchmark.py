@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# Pose 2D Estimator - delayed GNSS fix benchmark
+# Copyright (c) 2013, Kjeld Jensen <kjeld@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+This file contains a Python script that shows the effect and the cost of
+applying delayed GNSS fixes at their true time using pose_2d_ekf_history.
+
+The GNSS log sim_gnss.txt is replayed with odometry synthesized at 200 Hz
+along the GNSS track, and each fix is delivered a fixed delay after its
+time. For each delay the fixes are applied:
+	at arrival: to the current state, as by pose_2d_ekf
+	history: at their true time using pose_2d_ekf_history
+The position estimate after each odometry update, which can only include
+the fixes that have arrived, is compared to that of a replay without delay.
+When all fixes are within the history window the estimate after the last
+fix has arrived is the same as without delay, which the script verifies. The
+cost per fix is the time of the measurement update including the
+re-propagation. The RMS difference is dominated by the few corrupt fixes
+in sim_gnss.txt, the 95th percentile shows the typical lag.
+
+Usage: fixed_lag_benchmark.py [history length]
+
+Revision
+2013-05-12 KJ First version
+"""
+
+# imports
+import sys
+import numpy as np
+from time import time
+from math import sqrt, pi, atan2
+from pose_2d_estimator import pose_2d_gnss_preprocessor, pose_2d_ekf, pose_2d_ekf_history
+from sim_import import gnss_data
+
+# parameters
+gnss_file = 'sim_gnss.txt'
+odo_rate = 200.0 # [Hz]
+delays = [0.0, 0.1, 0.2, 0.3] # [s]
+var_dist = 0.0000000001
+var_angle = 0.001
+
+# return signed difference between new and old angle
+def angle_diff (angle_new, angle_old):
+	diff = angle_new - angle_old
+	while diff < -pi:
+		diff += 2*pi
+	while diff > pi:
+		diff -= 2*pi
+	return diff
+
+def build_events (gnss, delay):
+	"""
+	Odometry (time, 0, time, delta_dist, delta_angle) at odo_rate along the
+	straight line between fixes, and fixes (arrival time, 1, time, pos,
+	var_pos) in order of arrival. The odometry starts with a standstill at
+	the time of the first fix, so the history covers the first fix as well.
+	"""
+	gp = pose_2d_gnss_preprocessor()
+	events = [(gnss[0][0], 0, gnss[0][0], 0.0, 0.0)]
+	heading = 0.0
+	for i in xrange(len(gnss)):
+		if i > 0:
+			dt = gnss[i][0] - gnss[i-1][0]
+			dx = gnss[i][6] - gnss[i-1][6]
+			dy = gnss[i][7] - gnss[i-1][7]
+			steps = max(1, int(round(dt*odo_rate)))
+			dist = sqrt(dx**2 + dy**2)
+			turn = 0.0
+			if dist > 0.01:
+				turn = angle_diff(atan2(dy, dx), heading)
+				heading += turn
+			for j in xrange(steps):
+				t = gnss[i-1][0] + dt*(j+1)/steps
+				events.append((t, 0, t, dist/steps, turn/steps))
+		gp.add_gnss_measurement (gnss[i])
+		events.append((gnss[i][0] + delay, 1, gnss[i][0], [gnss[i][6], gnss[i][7]], gp.estimate_variance()))
+	events.sort()
+	return events
+
+def replay (events, history_len):
+	"""
+	Returns the position estimates after each odometry update, the final
+	state, the time of each fix update and the number of fixes not rolled
+	back
+	"""
+	ekf = pose_2d_ekf()
+	ekf.set_initial_guess([1.0, 1.0, 180.0*pi/180.0])
+	if history_len > 0:
+		history = pose_2d_ekf_history(ekf, history_len)
+	estimates = []
+	fix_times = []
+	for event in events:
+		if event[1] == 0:
+			if history_len > 0:
+				pose = history.system_update (event[2], event[3], var_dist, event[4], var_angle)
+			else:
+				pose = ekf.system_update (event[3], var_dist, event[4], var_angle)
+			estimates.append((pose[0], pose[1]))
+		else:
+			start = time()
+			if history_len > 0:
+				history.measurement_update_gnss (event[2], event[3], event[4])
+			else:
+				ekf.measurement_update_gnss (event[3], event[4])
+			fix_times.append(time() - start)
+	not_rolled_back = history.fixes_not_rolled_back if history_len > 0 else 0
+	return (np.array(estimates), ekf.prevX.copy(), np.array(fix_times), not_rolled_back)
+
+# main
+if __name__ == '__main__':
+	if len(sys.argv) > 1:
+		history_len = int(sys.argv[1])
+	else:
+		history_len = 100
+	print ('History: %d updates (%.2fs at %.0f Hz odometry)' % (history_len, history_len/odo_rate, odo_rate))
+
+	gnss = gnss_data(gnss_file, 0, True).data
+	replay (build_events(gnss[:10], 0.0), history_len) # compile the numba kernels
+
+	(reference, reference_final, fix_times, n) = replay (build_events(gnss, 0.0), 0)
+	print ('%-6s %-11s %13s %13s %12s %12s %11s %12s' % ('delay', 'fixes', 'rms diff [m]', \
+		'p95 diff [m]', 'us/fix mean', 'us/fix max', 'not rolled', 'final diff'))
+	failed = False
+	for delay in delays:
+		events = build_events(gnss, delay)
+		for (name, length) in [('at arrival', 0), ('history', history_len)]:
+			(estimates, final, fix_times, not_rolled_back) = replay (events, length)
+			diff = np.sqrt(np.sum((estimates - reference)**2, axis=1))
+			final_diff = np.abs(final - reference_final).max()
+			print ('%5.2fs %-11s %13.4f %13.4f %12.1f %12.1f %11d %12.3g' % (delay, name, sqrt(np.mean(diff**2)), \
+				np.percentile(diff, 95), np.mean(fix_times)*1e6, np.max(fix_times)*1e6, not_rolled_back, final_diff))
+			if length > 0 and not_rolled_back == 0 and final_diff != 0.0:
+				failed = True
+
+	if failed:
+		print ('The final estimate with the history differs from that without delay')
+		sys.exit(1)
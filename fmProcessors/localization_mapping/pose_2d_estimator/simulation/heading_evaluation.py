@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# Pose 2D Estimator - heading convergence evaluation
+# Copyright (c) 2013, Kjeld Jensen <kjeld@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+This file contains a Python script that evaluates how fast the yaw of the
+Pose 2D Estimator converges from the initial guess and after each headland
+turn, with the yaw change of the system update from the wheel odometry or
+from a gyro, and with or without yaw measurement updates from the GNSS track
+(pose_2d_gnss_preprocessor.estimate_yaw). Each combination is run with the
+process noise of the EKF reset to the identity at each GNSS update, and
+reset to zero (zero_q_reset). measurement_update_ahrs is only fed the GNSS
+track yaw: no AHRS orientation is simulated, and the integrated gyro is not
+fed to it as it already drives the system update.
+
+A field run is simulated: rows row_length apart driven at row_speed,
+connected by headland U-turns driven at turn_speed, with the robot starting
+at the beginning of the first row with the yaw of the initial guess off by
+pi. The GNSS gives RTK fixed positions at gnss_rate with the standard
+deviation gnss_std_dev in the rows and RTK float positions with the
+standard deviation gnss_float_std_dev in the headlands, as near hedges and
+trees, so the yaw after a turn depends on the yaw change of the system
+update. The wheel odometry at odo_rate overestimates the
+distance by odo_scale_error and the yaw change by odo_turn_slip, as a skid
+steered robot does when turning. The gyro has the bias gyro_bias and white
+noise. The odometry and GNSS logs are replayed through merge_events.
+
+For each combination the yaw error in the rows and in the turns is
+reported along with the settling distance of each row: the distance from
+the start of the row until the yaw error is within settle_threshold for the
+rest of the row. The settling distance of the first row is the convergence
+from the initial guess.
+
+Usage: heading_evaluation.py
+
+Revision
+2013-05-14 KJ First version
+"""
+
+# imports
+import numpy as np
+from math import pi, sin, cos
+from pose_2d_estimator import pose_2d_gnss_preprocessor, pose_2d_ekf
+from sim_import import merge_events
+
+# parameters
+rows = 6
+row_length = 20.0 # [m]
+row_spacing = 3.0 # [m]
+row_speed = 1.0 # [m/s]
+turn_speed = 0.5 # [m/s]
+odo_rate = 100.0 # [Hz]
+odo_scale_error = 0.01 # relative distance error of the wheel odometry
+odo_turn_slip = 0.2 # relative yaw change error of the wheel odometry
+gyro_bias = 0.002 # [rad/s]
+gyro_noise = 0.0005 # [rad] standard deviation per odometry update
+gnss_rate = 5.0 # [Hz]
+gnss_std_dev = 0.02 # [m]
+gnss_float_std_dev = 0.3 # [m]
+var_dist = 0.0000000001
+var_angle = 0.001
+settle_threshold = 5.0*pi/180.0 # [rad]
+
+class samples():
+	def __init__(self, data):
+		self.data = data
+		self.length = len(data)
+
+def simulate_run ():
+	"""
+	Returns the odometry [time, delta_dist, wheel delta_angle, gyro
+	delta_angle, true x, true y, true yaw, row] at odo_rate, row is -1 in the
+	turns, and the GNSS positions in the format of sim_import.gnss_data
+	"""
+	np.random.seed(1)
+	dt = 1.0/odo_rate
+	(t, x, y, yaw) = (0.0, 0.0, 0.0, 0.0)
+	odometry = [[t, 0.0, 0.0, 0.0, x, y, yaw, 0]]
+	gnss = [[t, 0.0, 0.0, 4, 10, 1.0, x + np.random.normal(0, gnss_std_dev), y + np.random.normal(0, gnss_std_dev)]]
+	segments = []
+	for row in xrange(rows):
+		segments.append((row, row_length, 0.0, row_speed))
+		if row < rows - 1:
+			direction = 1 if row % 2 == 0 else -1 # alternate left and right turns
+			segments.append((-1, pi*row_spacing/2, direction*pi, turn_speed))
+	for (row, length, turn, speed) in segments:
+		steps = int(round(length/speed*odo_rate))
+		for i in xrange(steps):
+			dist = length/steps
+			delta_yaw = turn/steps
+			x += dist*cos(yaw + delta_yaw/2)
+			y += dist*sin(yaw + delta_yaw/2)
+			yaw += delta_yaw
+			t += dt
+			gyro = delta_yaw + gyro_bias*dt + np.random.normal(0, gyro_noise)
+			odometry.append([t, dist*(1 + odo_scale_error), delta_yaw*(1 + odo_turn_slip), gyro, x, y, yaw, row])
+			if int(round(t*odo_rate)) % int(round(odo_rate/gnss_rate)) == 0:
+				if row >= 0:
+					(fix, std_dev) = (4, gnss_std_dev)
+				else:
+					(fix, std_dev) = (5, gnss_float_std_dev)
+				gnss.append([t, 0.0, 0.0, fix, 10, 1.0, x + np.random.normal(0, std_dev), \
+					y + np.random.normal(0, std_dev)])
+	return (odometry, gnss)
+
+def replay (odometry, gnss, gyro, gnss_yaw, zero_q_reset):
+	"""
+	Returns the yaw error after each odometry update
+	"""
+	gp = pose_2d_gnss_preprocessor(std_dev_rtk_fixed=gnss_std_dev, std_dev_rtk_float=gnss_float_std_dev)
+	ekf = pose_2d_ekf(zero_q_reset=zero_q_reset)
+	ekf.set_initial_guess([0.0, 0.0, pi])
+	errors = []
+	odometry_yaw = 0.0
+	for (log_time, source, sample) in merge_events (samples(odometry), samples(gnss)):
+		if source == 0:
+			delta_angle = sample[3] if gyro else sample[2]
+			odometry_yaw += delta_angle
+			gp.add_odometry ([sample[0], 0.0, 0.0, odometry_yaw])
+			pose = ekf.system_update (sample[1], var_dist, delta_angle, var_angle)
+			errors.append((pose[2] - sample[6] + pi) % (2*pi) - pi)
+		else:
+			gp.add_gnss_measurement (sample)
+			ekf.measurement_update_gnss ([sample[6], sample[7]], gp.estimate_variance())
+			if gnss_yaw:
+				yaw = gp.estimate_yaw()
+				if yaw != None:
+					ekf.measurement_update_ahrs (yaw[0], yaw[1])
+	return np.abs(errors)
+
+def settling (odometry, errors):
+	"""
+	Returns the distance from the start of each row until the yaw error is
+	within settle_threshold for the rest of the row
+	"""
+	settle = []
+	for row in xrange(rows):
+		i = [j for j in xrange(len(odometry)) if odometry[j][7] == row]
+		above = [j for j in i if errors[j] > settle_threshold]
+		end = above[-1] if above != [] else i[0]
+		settle.append(sum(odometry[j][1] for j in xrange(i[0], end+1))/(1 + odo_scale_error))
+	return settle
+
+# main
+if __name__ == '__main__':
+	(odometry, gnss) = simulate_run ()
+	in_rows = np.array([o[7] >= 0 for o in odometry])
+	print ('%d rows of %.0fm, %d headland turns, %d odometry and %d GNSS updates' % \
+		(rows, row_length, rows - 1, len(odometry), len(gnss)))
+	print ('%-20s %-8s %14s %14s %14s  %s' % ('yaw source', 'Q reset', 'rows mean [deg]', 'rows p95 [deg]', \
+		'turns p95 [deg]', 'settling distance [m] in each row'))
+	for zero_q_reset in [False, True]:
+		for (name, gyro, gnss_yaw) in [('odometry', False, False), ('odometry + GNSS yaw', False, True), \
+			('gyro', True, False), ('gyro + GNSS yaw', True, True)]:
+			errors = replay (odometry, gnss, gyro, gnss_yaw, zero_q_reset)
+			settle = settling (odometry, errors)
+			print ('%-20s %-8s %14.2f %14.2f %14.2f  %s' % (name, 'zero' if zero_q_reset else 'identity', \
+				np.degrees(np.mean(errors[in_rows])), np.degrees(np.percentile(errors[in_rows], 95)), \
+				np.degrees(np.percentile(errors[~in_rows], 95)), ' '.join('%.1f' % s for s in settle)))
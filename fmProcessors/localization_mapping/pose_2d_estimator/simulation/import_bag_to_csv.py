@@ -27,41 +27,70 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #*****************************************************************************
 """
-This script extract relevant data from a rosbag and saves it in csv files.
+This script extract relevant data from a rosbag and saves it as a binary log
+for the simulation: a numpy structured array (.npy) per topic and the index
+sim_index.json (see sim_import.py), which the simulation loads memory mapped.
+With --csv the data is saved in csv files as well.
+
+Usage: import_bag_to_csv.py [-h] [--csv] [bag]
 """
 # imports
+import argparse
+import numpy as np
 import roslib
 import rosbag
 from tf.transformations import euler_from_quaternion
 from geometry_msgs.msg import Quaternion
+from sim_import import odometry_dtype, imu_dtype, gnss_dtype, log_topics, write_log_index, gnss_to_utm
 
-bag = rosbag.Bag ('sim.bag')
+parser = argparse.ArgumentParser(description='Extract the simulation data from a rosbag')
+parser.add_argument('bag', nargs='?', default='sim.bag', help='rosbag (default sim.bag)')
+parser.add_argument('--csv', action='store_true', help='save csv files as well')
+args = parser.parse_args()
 
-# extract odometry data
-f = open ('sim_odometry.txt', 'w')
-for topic, msg, t in bag.read_messages(topics=['/fmKnowledge/encoder_odom']):
-	msecs = int(msg.header.stamp.nsecs/1000000.0+0.5)
-	(roll,pitch,yaw) = euler_from_quaternion([msg.pose.pose.orientation.x, \
-		msg.pose.pose.orientation.y, msg.pose.pose.orientation.z, msg.pose.pose.orientation.w])
-	f.write ('%d.%03d,%.3f,%.3f,%.6f\n' % (msg.header.stamp.secs,msecs, \
-		msg.pose.pose.position.x, msg.pose.pose.position.y, yaw))
-f.close()
+bag = rosbag.Bag (args.bag)
+dtypes = {'odometry': odometry_dtype, 'imu': imu_dtype, 'gnss': gnss_dtype}
 
-# extract IMU data
-f = open ('sim_imu.txt', 'w')
-for topic, msg, t in bag.read_messages(topics=['/fmInformation/imu']):
-	msecs = int(msg.header.stamp.nsecs/1000000.0+0.5)
-	f.write ('%d.%03d,%.9f,%.9f\n' % (msg.header.stamp.secs, msecs, \
-		msg.angular_velocity.z, msg.orientation.z))
-f.close()
+def sample (name, msg):
+	if name == 'odometry':
+		(roll,pitch,yaw) = euler_from_quaternion([msg.pose.pose.orientation.x, \
+			msg.pose.pose.orientation.y, msg.pose.pose.orientation.z, msg.pose.pose.orientation.w])
+		return (msg.header.stamp.to_sec(), msg.pose.pose.position.x, msg.pose.pose.position.y, yaw)
+	elif name == 'imu':
+		return (msg.header.stamp.to_sec(), msg.angular_velocity.z, msg.orientation.z)
+	else: # GPGGA, the UTM position is set when all samples are extracted
+		return (msg.header.stamp.to_sec(), msg.lat, msg.lon, msg.fix, msg.sat, msg.hdop, 0.0, 0.0)
 
-# extract GPGGA data
-f = open ('sim_gnss.txt', 'w')
-for topic, msg, t in bag.read_messages(topics=['/fmInformation/gpgga']):
+def csv_line (name, msg, s):
 	msecs = int(msg.header.stamp.nsecs/1000000.0+0.5)
-	f.write ('%d.%03d,%.10f,%.10f,%d,%d,%.2f\n' % (msg.header.stamp.secs,msecs, \
-		msg.lat, msg.lon, msg.fix, msg.sat, msg.hdop))
-
-bag.close()
+	if name == 'odometry':
+		return '%d.%03d,%.3f,%.3f,%.6f\n' % ((msg.header.stamp.secs, msecs) + s[1:4])
+	elif name == 'imu':
+		return '%d.%03d,%.9f,%.9f\n' % ((msg.header.stamp.secs, msecs) + s[1:3])
+	else:
+		return '%d.%03d,%.10f,%.10f,%d,%d,%.2f\n' % ((msg.header.stamp.secs, msecs) + s[1:6])
 
+# extract odometry, IMU and GPGGA data
+logs = {}
+for (name, topic, binary_file, text_file) in log_topics:
+	# the array is written to the file through a memory map as it is filled
+	n = bag.get_message_count(topic_filters=[topic])
+	data = np.lib.format.open_memmap(binary_file, mode='w+', dtype=dtypes[name], shape=(n,))
+	if args.csv:
+		f = open (text_file, 'w')
+	i = 0
+	for topic, msg, t in bag.read_messages(topics=[topic]):
+		data[i] = sample (name, msg)
+		if args.csv:
+			f.write (csv_line (name, msg, data[i].tolist()))
+		i += 1
+	if args.csv:
+		f.close()
+	if name == 'gnss':
+		gnss_to_utm (data)
+	data.flush()
+	logs[name] = (topic, binary_file, data)
+	print ('%s: %d samples' % (topic, n))
 
+write_log_index ('.', logs, args.bag)
+bag.close()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+#*****************************************************************************
+# Pose 2D Estimator - long replay memory benchmark
+# Copyright (c) 2013, Kjeld Jensen <kjeld@frobomind.org>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name FroboMind nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#*****************************************************************************
+"""
+This file contains a Python script that shows that the memory use of the
+Pose 2D Estimator stays flat on long missions. A drive of the given number
+of hours is synthesized, odometry at odo_rate and GNSS at gnss_rate with
+periods of RTK float and a varying HDOP, and replayed through
+pose_2d_gnss_preprocessor and pose_2d_ekf including the GNSS yaw updates.
+
+For each hour the maximum resident memory of the process, the number of
+measurements in the preprocessor buffers, the windowed statistics and the
+time per odometry update are reported. The script verifies that the memory
+has not grown after the first hour and that the windowed statistics equal
+those computed from the measurements in the window.
+
+Usage: long_replay_benchmark.py [hours]
+
+Revision
+2013-05-16 KJ First version
+"""
+
+# imports
+import sys, resource
+import numpy as np
+from time import time
+from math import pi, sin, cos
+from pose_2d_estimator import pose_2d_gnss_preprocessor, pose_2d_ekf
+
+# parameters
+odo_rate = 100.0 # [Hz]
+gnss_rate = 5.0 # [Hz]
+speed = 1.0 # [m/s]
+float_period = 600.0 # [s] RTK float for the last 10% of each period
+var_dist = 0.0000000001
+var_angle = 0.001
+max_growth = 1.0 # [MB] allowed memory growth after the first hour
+
+def max_rss ():
+	# maximum resident memory [MB] of the process
+	return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024.0
+
+def window_statistics (gp):
+	"""
+	Returns the windowed statistics computed from the measurements in the
+	preprocessor buffer
+	"""
+	g = gp.gnss
+	m = np.array([g[i] for i in xrange(len(g))], g.data.dtype)
+	span = m['time'][-1] - m['time'][0]
+	dist = np.sum(np.sqrt(np.diff(m['easting'])**2 + np.diff(m['northing'])**2))
+	return (dist/span, np.mean(m['fix'] == 4), np.mean(m['hdop']))
+
+# main
+if __name__ == '__main__':
+	if len(sys.argv) > 1:
+		hours = float(sys.argv[1])
+	else:
+		hours = 12.0
+
+	gp = pose_2d_gnss_preprocessor()
+	ekf = pose_2d_ekf()
+	ekf.set_initial_guess([0.0, 0.0, 0.0])
+	np.random.seed(1)
+	gnss_every = int(round(odo_rate/gnss_rate))
+	(x, y, yaw) = (0.0, 0.0, 0.0)
+	steps_per_hour = int(round(3600*odo_rate))
+	first_hour_rss = None
+	failed = False
+	print ('%5s %9s %9s %9s %11s %10s %10s %10s %12s' % ('hour', 'rss [MB]', 'gnss buf', 'odo buf', \
+		'speed [m/s]', 'rtk fixed', 'hdop mean', 'stat diff', 'us/update'))
+	for hour in xrange(int(np.ceil(hours))):
+		start = time()
+		steps = min(steps_per_hour, int(round((hours - hour)*3600*odo_rate)))
+		for step in xrange(steps):
+			n = hour*steps_per_hour + step + 1
+			t = n/odo_rate
+			delta_dist = speed/odo_rate
+			delta_angle = 0.2*sin(t/20.0)/odo_rate
+			x += delta_dist*cos(yaw + delta_angle/2)
+			y += delta_dist*sin(yaw + delta_angle/2)
+			yaw += delta_angle
+			gp.add_odometry ([t, x, y, yaw])
+			ekf.system_update (delta_dist, var_dist, delta_angle, var_angle)
+			if n % gnss_every == 0:
+				fix = 5 if t % float_period > 0.9*float_period else 4
+				hdop = 0.8 + 0.4*np.random.random()
+				gp.add_gnss_measurement ([t, 0.0, 0.0, fix, 10, hdop, \
+					x + np.random.normal(0, 0.02), y + np.random.normal(0, 0.02)])
+				ekf.measurement_update_gnss ([x, y], gp.estimate_variance())
+				estimate = gp.estimate_yaw()
+				if estimate != None:
+					ekf.measurement_update_ahrs (estimate[0], estimate[1])
+		elapsed = time() - start
+
+		stats = (gp.window_speed(), gp.window_fix_fraction(4), gp.window_hdop_mean())
+		diff = np.max(np.abs(np.array(stats) - np.array(window_statistics(gp))))
+		rss = max_rss()
+		if first_hour_rss == None:
+			first_hour_rss = rss
+		print ('%5d %9.1f %9d %9d %11.3f %10.3f %10.3f %10.2g %12.2f' % (hour + 1, rss, len(gp.gnss), \
+			len(gp.odo), stats[0], stats[1], stats[2], diff, elapsed/steps*1e6))
+		sys.stdout.flush()
+		if diff > 1e-9:
+			failed = True
+			print ('The windowed statistics differ from those of the measurements in the window')
+	if max_rss() - first_hour_rss > max_growth:
+		failed = True
+		print ('The memory has grown %.1f MB after the first hour' % (max_rss() - first_hour_rss))
+
+	if failed:
+		sys.exit(1)
@@ -57,117 +57,634 @@ Revision
 """
 # imports
 import numpy as np
-from math import sqrt, pi, sin, cos
-from numpy import matrix, array, linalg, mat
+from math import sqrt, pi, sin, cos, atan2, floor
+try:
+	from numba import njit
+except ImportError:
+	njit = None # the EKF falls back to the numpy backend
 
 # defines
+gnss_dtype = np.dtype([('time', 'f8'), ('lat', 'f8'), ('lon', 'f8'), ('fix', 'i4'), ('sat', 'i4'), \
+	('hdop', 'f8'), ('easting', 'f8'), ('northing', 'f8'), ('dist', 'f8')])
+odometry_dtype = np.dtype([('time', 'f8'), ('x', 'f8'), ('y', 'f8'), ('yaw', 'f8')])
+
+class measurement_buffer():
+	"""
+	Fixed capacity ring buffer of measurements in the structured numpy array
+	data, allocated once in the constructor. Measurement i is counted from
+	the oldest, negative i from the newest as for a list, and index(i) is its
+	position in data, so a field is read as data['time'][index(i)].
+	"""
+	def __init__(self, dtype, capacity):
+		self.data = np.zeros(capacity, dtype)
+		self.capacity = capacity
+		self.first = 0 # position of the oldest measurement
+		self.count = 0
+
+	def __len__(self):
+		return self.count
+
+	def __getitem__(self, i):
+		return self.data[self.index(i)]
+
+	def index(self, i):
+		if i < 0:
+			i += self.count
+		return (self.first + i) % self.capacity
+
+	def append(self, measurement):
+		# the buffer must not be full
+		self.data[(self.first + self.count) % self.capacity] = measurement
+		self.count += 1
+
+	def remove_oldest(self):
+		self.first = (self.first + 1) % self.capacity
+		self.count -= 1
 
 class pose_2d_gnss_preprocessor():
-	def __init__(self):
-		self.gnss = []
-		self.odo = []
+	"""
+	The std_dev_* arguments are the standard deviations [m] of the GNSS
+	position for each fix quality. The yaw_* arguments are the limits of
+	the GNSS track used by estimate_yaw: the minimum distance [m] between
+	the positions, the maximum deviation [m] of the positions between them
+	from a straight line, the maximum time [s] between them and the maximum
+	change [rad] of the odometry yaw between them.
+
+	The GNSS measurements and the odometry are kept in ring buffers of
+	gnss_capacity and odometry_capacity measurements, and measurements more
+	than window [s] older than the newest are removed, so the memory use is
+	fixed. The window must be at least yaw_max_time, and the capacities must
+	hold the window at the highest measurement rates, otherwise the oldest
+	measurements are overwritten. The windowed statistics window_speed,
+	window_fix_fraction and window_hdop_mean are kept as running sums, which
+	are recomputed from the buffer once per pass through it to keep the
+	round off from accumulating.
+
+	estimate_variance adds speed_std_dev [s] times the window speed to the
+	standard deviation of the position, for the distance driven during the
+	GNSS latency, and with hdop_scaling multiplies it by the window HDOP
+	mean. By default the variance depends on the fix quality only.
+	"""
+	def __init__(self, std_dev_rtk_fixed=0.02, std_dev_rtk_float=2.0, std_dev_dgps=7.0, \
+		std_dev_sps=15.0, std_dev_no_fix=20000000.0, yaw_baseline=1.0, yaw_max_deviation=0.05, \
+		yaw_max_time=10.0, yaw_max_turn=0.05, window=10.0, gnss_capacity=200, odometry_capacity=4000, \
+		speed_std_dev=0.0, hdop_scaling=False):
+		self.gnss = measurement_buffer(gnss_dtype, gnss_capacity)
+		self.odo = measurement_buffer(odometry_dtype, odometry_capacity)
+		self.std_dev_rtk_fixed = std_dev_rtk_fixed
+		self.std_dev_rtk_float = std_dev_rtk_float
+		self.std_dev_dgps = std_dev_dgps
+		self.std_dev_sps = std_dev_sps
+		self.std_dev_no_fix = std_dev_no_fix
+		self.yaw_baseline = yaw_baseline
+		self.yaw_max_deviation = yaw_max_deviation
+		self.yaw_max_time = yaw_max_time
+		self.yaw_max_turn = yaw_max_turn
+		self.window = window
+		self.speed_std_dev = speed_std_dev
+		self.hdop_scaling = hdop_scaling
+
+		# running sums of the GNSS measurements in the window
+		self.dist_sum = 0.0 # distance between the positions
+		self.hdop_sum = 0.0
+		self.fix_count = {}
+		self.gnss_updates = 0 # since the sums were recomputed
 	
 	def add_gnss_measurement (self, gnss_measurement):
-		self.gnss.append(gnss_measurement)
+		"""
+		Adds a GNSS measurement [time, lat, lon, fix, sat, hdop, easting,
+		northing]
+		"""
+		g = self.gnss
+		(fix, hdop, easting, northing) = (gnss_measurement[3], gnss_measurement[5], gnss_measurement[6], gnss_measurement[7])
+		dist = 0.0
+		if g.count > 0:
+			newest = g.index(-1)
+			dist = sqrt((easting - g.data['easting'][newest])**2 + (northing - g.data['northing'][newest])**2)
+		if g.count == g.capacity:
+			self.remove_oldest_gnss()
+		g.append(tuple(gnss_measurement[:8]) + (dist,))
+		if g.count > 1:
+			self.dist_sum += dist
+		self.hdop_sum += hdop
+		self.fix_count[fix] = self.fix_count.get(fix, 0) + 1
+
+		self.gnss_updates += 1
+		if self.gnss_updates >= g.capacity:
+			self.recompute_sums()
+		self.remove_old_measurements()
 
 	def add_odometry(self, odometry):
-		self.odo.append(odometry)
+		"""
+		Adds odometry [time, x, y, yaw]
+		"""
+		if self.odo.count == self.odo.capacity:
+			self.odo.remove_oldest()
+		self.odo.append(tuple(odometry[:4]))
+		self.remove_old_measurements()
+
+	def remove_old_measurements (self):
+		"""
+		Removes the measurements more than window older than the newest of
+		their kind
+		"""
+		g = self.gnss
+		if g.count > 0:
+			oldest = g.data['time'][g.index(-1)] - self.window
+			while g.data['time'][g.first] < oldest:
+				self.remove_oldest_gnss()
+		o = self.odo
+		if o.count > 0:
+			oldest = o.data['time'][o.index(-1)] - self.window
+			while o.data['time'][o.first] < oldest:
+				o.remove_oldest()
+
+	def remove_oldest_gnss (self):
+		g = self.gnss
+		oldest = g.data[g.first]
+		self.hdop_sum -= oldest['hdop']
+		self.fix_count[oldest['fix']] -= 1
+		g.remove_oldest()
+		if g.count > 0:
+			self.dist_sum -= g.data['dist'][g.first] # the distance to the removed position
+		else:
+			self.dist_sum = 0.0
+			self.hdop_sum = 0.0
+
+	def recompute_sums (self):
+		g = self.gnss
+		i = (g.first + np.arange(g.count)) % g.capacity
+		self.hdop_sum = float(np.sum(g.data['hdop'][i]))
+		self.dist_sum = float(np.sum(g.data['dist'][i[1:]]))
+		self.gnss_updates = 0
+
+	def window_speed (self):
+		# mean speed [m/s] along the GNSS track in the window
+		g = self.gnss
+		if g.count < 2:
+			return 0.0
+		span = g.data['time'][g.index(-1)] - g.data['time'][g.first]
+		if span <= 0.0:
+			return 0.0
+		return self.dist_sum/span
+
+	def window_fix_fraction (self, fix):
+		# fraction of the GNSS measurements in the window with the fix quality
+		if self.gnss.count == 0:
+			return 0.0
+		return self.fix_count.get(fix, 0)/float(self.gnss.count)
+
+	def window_hdop_mean (self):
+		if self.gnss.count == 0:
+			return 0.0
+		return self.hdop_sum/self.gnss.count
+
+	def fix_std_dev (self, fix):
+		if fix == 4: # rtk fixed solution
+			std_dev = self.std_dev_rtk_fixed
+		elif fix == 5: # rtk float solution
+			std_dev = self.std_dev_rtk_float
+		elif fix == 2: # dgps solution
+			std_dev = self.std_dev_dgps
+		elif fix == 1: # sps solution
+			std_dev = self.std_dev_sps
+		else:
+			std_dev = self.std_dev_no_fix
+		return std_dev
 
 	def estimate_variance(self):
-		# estimate speed
+		# variance of the latest GNSS position
+		std_dev = self.fix_std_dev (self.gnss.data['fix'][self.gnss.index(-1)])
+
 		# use known speed to increase variance
-		if len(self.gnss) > 0:
-			if self.gnss[-1][3] == 4: # rtk fixed solution
-				std_dev = 0.02
-			elif self.gnss[-1][3] == 5: # rtk float solution
-				std_dev = 2.0
-			elif self.gnss[-1][3] == 2: # dgps solution
-				std_dev = 7.0
-			elif self.gnss[-1][3] == 1: # sps solution
-				std_dev = 15.0
-			else:
-				std_dev = 20000000.0
+		if self.speed_std_dev > 0.0:
+			std_dev += self.speed_std_dev*self.window_speed()
+		if self.hdop_scaling:
+			std_dev *= self.window_hdop_mean()
 		return std_dev**2
 
 	def estimate_yaw(self):
-		pass
+		"""
+		Estimates the yaw from the direction of the GNSS track to the latest
+		position from the last position at least yaw_baseline before it,
+		assuming the robot drives forward. Returns (yaw, variance) or None if
+		the track is not straight, no such position is within yaw_max_time or
+		the odometry (gyro) yaw has changed between the positions, as when the
+		robot turns on the spot. The odometry [time, x, y, yaw] is added by
+		add_odometry, without odometry the last check is skipped.
+		"""
+		g = self.gnss
+		if g.count < 2:
+			return None
+		(t, east, north) = (g.data['time'], g.data['easting'], g.data['northing'])
+		latest = g.index(-1)
+		(x, y) = (east[latest], north[latest])
+		k = g.count - 2
+		while k >= 0 and t[latest] - t[g.index(k)] <= self.yaw_max_time:
+			i = g.index(k)
+			dx = x - east[i]
+			dy = y - north[i]
+			baseline = sqrt(dx**2 + dy**2)
+			if baseline >= self.yaw_baseline:
+				break
+			k -= 1
+		else:
+			return None
 
-	def remove_old_measurements (self):
-		pass
+		# the positions between must be on the line
+		for m in xrange(k+1, g.count-1):
+			j = g.index(m)
+			if abs((east[j] - x)*dy - (north[j] - y)*dx)/baseline > self.yaw_max_deviation:
+				return None
+
+		# the robot must not have turned between the positions
+		if self.odo.count > 0:
+			turn = self.odometry_yaw(t[latest]) - self.odometry_yaw(t[i])
+			if abs(turn - 2*pi*floor((turn + pi)/(2*pi))) > self.yaw_max_turn:
+				return None
+		fix = g.data['fix']
+		var = (self.fix_std_dev(fix[latest])**2 + self.fix_std_dev(fix[i])**2)/baseline**2
+		return (atan2(dy, dx), var)
+
+	def odometry_yaw (self, time):
+		# yaw of the last odometry at or before time (the oldest if none), by bisection
+		o = self.odo
+		t = o.data['time']
+		(low, high) = (0, o.count - 1)
+		while low < high:
+			mid = (low + high + 1)//2
+			if t[o.index(mid)] > time:
+				high = mid - 1
+			else:
+				low = mid
+		return o.data['yaw'][o.index(low)]
+
+def ekf_system_update (x, P, Q, delta_dist, var_dist, delta_angle, var_angle, zero_q_reset):
+	"""
+	Kernel of pose_2d_ekf.system_update for the numba backend. The matrix
+	products are written out element by element in the order numpy sums
+	them, so the result is the same as that of the numpy backend.
+	"""
+	angle = x[2] + delta_angle/2.
+	c = cos(angle)
+	s = sin(angle)
+	g02 = -delta_dist*s # system jacobian G = [[1, 0, g02], [0, 1, g12], [0, 0, 1]]
+	g12 = delta_dist*c
+	x[0] += delta_dist*c
+	x[1] += delta_dist*s
+	x[2] += delta_angle
+
+	# P-[t] = G*P[t-1]*G.T + Q
+	Q[0,0] += delta_dist*var_dist
+	Q[1,1] += delta_dist*var_dist
+	if zero_q_reset:
+		Q[2,2] += abs(delta_angle)/(2*pi)*var_angle
+	else:
+		Q[2,2] += delta_angle/(2*pi)*var_angle
+	t00 = P[0,0] + g02*P[2,0] # G*P[t-1]
+	t01 = P[0,1] + g02*P[2,1]
+	t02 = P[0,2] + g02*P[2,2]
+	t10 = P[1,0] + g12*P[2,0]
+	t11 = P[1,1] + g12*P[2,1]
+	t12 = P[1,2] + g12*P[2,2]
+	t20 = P[2,0]
+	t21 = P[2,1]
+	t22 = P[2,2]
+	P[0,0] = t00 + t02*g02 + Q[0,0]
+	P[0,1] = t01 + t02*g12 + Q[0,1]
+	P[0,2] = t02 + Q[0,2]
+	P[1,0] = t10 + t12*g02 + Q[1,0]
+	P[1,1] = t11 + t12*g12 + Q[1,1]
+	P[1,2] = t12 + Q[1,2]
+	P[2,0] = t20 + t22*g02 + Q[2,0]
+	P[2,1] = t21 + t22*g12 + Q[2,1]
+	P[2,2] = t22 + Q[2,2]
+
+def ekf_measurement_update_gnss (x, P, Q, K, A, T, pos_x, pos_y, var_pos, joseph_form, zero_q_reset):
+	"""
+	Kernel of pose_2d_ekf.measurement_update_gnss for the numba backend,
+	K (3x2), A and T (3x3) are work buffers. The matrix products are summed
+	in the order numpy sums them, so the result is the same as that of the
+	numpy backend.
+	"""
+	# S^-1 in closed form
+	s00 = P[0,0] + var_pos
+	s01 = P[0,1]
+	s10 = P[1,0]
+	s11 = P[1,1] + var_pos
+	det = s00*s11 - s01*s10
+	i00 = s11/det
+	i01 = -s01/det
+	i10 = -s10/det
+	i11 = s00/det
+
+	# K[t] = P-[t]*H.T*S^-1
+	for i in range(3):
+		K[i,0] = P[i,0]*i00 + P[i,1]*i10
+		K[i,1] = P[i,0]*i01 + P[i,1]*i11
+
+	# X[t] = X-[t] + K[t]*(z[t] - H*X-[t])
+	y0 = pos_x - x[0]
+	y1 = pos_y - x[1]
+	for i in range(3):
+		x[i] += K[i,0]*y0 + K[i,1]*y1
+
+	# A = I - K*H, T = A*P-[t]
+	for i in range(3):
+		A[i,0] = -K[i,0]
+		A[i,1] = -K[i,1]
+		A[i,2] = 0.0
+	A[0,0] += 1.0
+	A[1,1] += 1.0
+	A[2,2] = 1.0
+	for i in range(3):
+		for j in range(3):
+			T[i,j] = A[i,0]*P[0,j] + A[i,1]*P[1,j] + A[i,2]*P[2,j]
+
+	if joseph_form:
+		# P[t] = A*P-[t]*A.T + K*R*K.T
+		for i in range(3):
+			for j in range(3):
+				P[i,j] = T[i,0]*A[j,0] + T[i,1]*A[j,1] + T[i,2]*A[j,2] + (K[i,0]*K[j,0] + K[i,1]*K[j,1])*var_pos
+	else:
+		# P[t] = A*P-[t]
+		for i in range(3):
+			for j in range(3):
+				P[i,j] = T[i,j]
+
+	# reset the process noise covariance matrix
+	for i in range(3):
+		for j in range(3):
+			Q[i,j] = 0.0
+		if not zero_q_reset:
+			Q[i,i] = 1.0
+
+if njit != None:
+	ekf_system_update_jit = njit(ekf_system_update)
+	ekf_measurement_update_gnss_jit = njit(ekf_measurement_update_gnss)
 
 class pose_2d_ekf():
-	def __init__(self):
-		self.prevX = self.set_initial_guess([0.0, 0.0, 0.0])
-		self.prevCov = np.matrix([[1000.0,0.0,0.0],[0.,1000.0,0.0], \
+	"""
+	EKF on float64 ndarrays. The state prevX [X, Y, theta] and covariance
+	prevCov are updated in place, and all intermediate matrices live in
+	buffers allocated once in the constructor, so an update allocates
+	nothing but the numpy scalars of the trigonometry. The 2x2 innovation
+	covariance of the GNSS update is inverted in closed form, and the
+	covariance is updated in Joseph form, which keeps it symmetric and
+	positive definite despite round off. With joseph_form False the short
+	form P = (I - K*H)*P- of the previous np.matrix implementation is used.
+	On sim_gnss.txt the estimates of both forms agree with those of the
+	np.matrix implementation within a few micrometres.
+
+	The updates return the state buffer itself, it is overwritten by the
+	next update, so copy it if it is kept.
+
+	The backend is 'numba' or 'numpy', by default numba if it can be
+	imported. The numba backend runs the updates as the JIT compiled
+	kernels ekf_system_update and ekf_measurement_update_gnss, which are
+	compiled at the first update. Both backends give the same estimates.
+
+	The process noise Q accumulated by the system updates is reset to the
+	identity at each GNSS update, as in the previous implementation, so
+	every system update adds at least 1 rad^2 to the yaw variance and the
+	yaw is uncertain again right after each fix. With zero_q_reset Q is
+	reset to zero instead and only holds the odometry noise since the last
+	fix, so yaw measurement updates keep their effect through turns. The
+	yaw variance then grows with the turned angle in either direction,
+	where the previous implementation subtracted it for right turns.
+	"""
+	def __init__(self, joseph_form=True, backend=None, zero_q_reset=False):
+		self.joseph_form = joseph_form
+		self.zero_q_reset = zero_q_reset
+		if backend == None:
+			backend = 'numba' if njit != None else 'numpy'
+		if backend == 'numba':
+			if njit == None:
+				raise ImportError('the numba backend of pose_2d_ekf requires numba')
+			self.system_update = self.system_update_numba
+			self.measurement_update_gnss = self.measurement_update_gnss_numba
+		elif backend != 'numpy':
+			raise ValueError('unknown pose_2d_ekf backend: %s' % backend)
+		self.backend = backend
+		self.prevX = np.zeros(3)
+		self.prevCov = np.array([[1000.0,0.0,0.0],[0.,1000.0,0.0], \
 			[0.0,0.0,2.0*pi]]) # high variance for the initial guess 
-		self.Q = np.identity(3)
-		self.Hgnss = np.matrix([[1., 0., 0.,],[0., 1., 0.]]) # GNSS observation matrix
+		self.I = np.identity(3)
+		self.Q = np.zeros((3,3)) if zero_q_reset else np.identity(3)
+		self.Hgnss = np.array([[1., 0., 0.,],[0., 1., 0.]]) # GNSS observation matrix
+
+		# preallocated buffers
+		self.Gm = np.identity(3) # system jacobian
+		self.A = np.identity(3) # I - K*H
+		self.K = np.zeros((3,2)) # Kalman gain
+		self.Sinv = np.zeros((2,2)) # inverse innovation covariance
+		self.y = np.zeros(2) # measurement residual
+		self.tmp = np.zeros((3,3))
+		self.KKt = np.zeros((3,3))
+		self.Ky = np.zeros(3)
 
 	def set_initial_guess (self, x):
-		self.prevX = np.matrix(x)
+		self.prevX[:] = x
 
 	def system_update (self, delta_dist, var_dist, delta_angle, var_angle):
-		u = [delta_dist, delta_angle]
-
 		# predicted (A priori) state estimate: X-[t] = X[t-1] + u[t]
-		priX = self.f(self.prevX, u)
+		# the jacobian is evaluated at X[t-1] before the state is advanced
+		x = self.prevX
+		angle = x[2] + delta_angle/2.
+		c = cos(angle)
+		s = sin(angle)
+		self.Gm[0,2] = -delta_dist*s
+		self.Gm[1,2] = delta_dist*c
+		x[0] += delta_dist*c
+		x[1] += delta_dist*s
+		x[2] += delta_angle
 
-		# predicted (A priori) error covariance estimate: P-[t] = P[t-1] + Q
-		self.Q = self.Q + np.matrix([[delta_dist*var_dist, 0.0, 0.0], \
-			[0.0, delta_dist*var_dist, 0.0], \
-			[0.0, 0.0, delta_angle/(2*pi)*var_angle]])
-		Gm = self.G(self.prevX, u)
-		priCov = Gm*self.prevCov*Gm.T + self.Q 
-
-		# housekeeping
-		self.prevX = priX # advance to next update step
-		self.prevCov = priCov
-		return array(self.prevX)[0]
+		# predicted (A priori) error covariance estimate: P-[t] = G*P[t-1]*G.T + Q
+		self.Q[0,0] += delta_dist*var_dist
+		self.Q[1,1] += delta_dist*var_dist
+		if self.zero_q_reset:
+			self.Q[2,2] += abs(delta_angle)/(2*pi)*var_angle
+		else:
+			self.Q[2,2] += delta_angle/(2*pi)*var_angle
+		np.dot(self.Gm, self.prevCov, out=self.tmp)
+		np.dot(self.tmp, self.Gm.T, out=self.prevCov)
+		self.prevCov += self.Q
+		return self.prevX
 
 	def measurement_update_gnss (self, pos, var_pos):
-		# Compute Kalman gain: K[t] = P-[t]/(P-[t] + R)
-		K = self.prevCov*self.Hgnss.T*linalg.inv(self.Hgnss*self.prevCov*self.Hgnss.T + self.R(var_pos))
+		P = self.prevCov
+
+		# innovation covariance S = H*P-[t]*H.T + R, inverted in closed form
+		s00 = P[0,0] + var_pos
+		s01 = P[0,1]
+		s10 = P[1,0]
+		s11 = P[1,1] + var_pos
+		det = s00*s11 - s01*s10
+		self.Sinv[0,0] = s11/det
+		self.Sinv[0,1] = -s01/det
+		self.Sinv[1,0] = -s10/det
+		self.Sinv[1,1] = s00/det
 
-		# updated (A posteriori) estimate with measurement z[t]: X[t] = X-[t] + K[t]*(z[t] - X-[t])
-		#gpsEN = [gpsSim[-1][GPS_E], gpsSim[-1][GPS_N]] # measurement
-		prev_pos = [array(self.prevX)[0][0], array(self.prevX)[0][1]] # A priori position
-		y = np.matrix(pos).T - np.matrix(prev_pos).T # measurement residual
+		# Kalman gain: K[t] = P-[t]*H.T*S^-1
+		np.dot(P[:,0:2], self.Sinv, out=self.K)
 
-		postX = self.prevX + (K*y).T # updated state estimate
+		# updated (A posteriori) estimate with measurement z[t]: X[t] = X-[t] + K[t]*(z[t] - H*X-[t])
+		self.y[0] = pos[0] - self.prevX[0]
+		self.y[1] = pos[1] - self.prevX[1]
+		np.dot(self.K, self.y, out=self.Ky)
+		self.prevX += self.Ky
 
-		# updated (A posteriori) error covariance: P[t] = (1 - K[t])*P-[t]
-		postCov = (mat(np.identity(3))-K*self.Hgnss)*self.prevCov
+		# updated (A posteriori) error covariance
+		self.A[:] = self.I
+		self.A[:,0:2] -= self.K
+		np.dot(self.A, P, out=self.tmp)
+		if self.joseph_form:
+			# Joseph form: P[t] = (I - K*H)*P-[t]*(I - K*H).T + K*R*K.T
+			np.dot(self.tmp, self.A.T, out=P)
+			np.dot(self.K, self.K.T, out=self.KKt)
+			self.KKt *= var_pos
+			P += self.KKt
+		else:
+			# P[t] = (I - K*H)*P-[t]
+			P[:] = self.tmp
 
 		# housekeeping
-		self.Q = np.identity(3) # reset the process noise covariance matrix
-		self.prevX = postX # advance to next update step
-		self.prevCov = postCov # save A posteriori error variance estimate
+		if self.zero_q_reset:
+			self.Q.fill(0.0) # reset the process noise covariance matrix
+		else:
+			self.Q[:] = self.I
 		return self.prevX
 
-	def measurement_update_ahrs (self):
-		pass
-
-	def R (self, var_pos): # measurement error covariance matrix
-		return np.matrix([[var_pos, 0.],[0., var_pos]])
-
-	def f (self, x, u): # predict state
-		# x is the state vector at timestep k: [X, Y, theta].T
-		# u is the system input vector at timestep k: [delta_dist, delta_angle].T
-		x = array(x)[0]
-		theta = x[2]
-		dTheta = u[1]
-		l1 = [x[0]+u[0]*cos(theta+dTheta/2.),x[1]+u[0]*sin(theta+dTheta/2.),theta+dTheta]
-		return np.matrix(l1)
-
-	def G (self, x, u): # system error covariance matrix
-		# x is the state vector at timestep k: [X, Y, theta].T
-		# u is the system input vector at timestep k: [delta_dist, delta_angle].T
-		x = array(x)[0]
-		theta = x[2]
-		dTheta = u[1]
-		l1 = [1., 0., -u[0]*sin(theta+dTheta/2.)]
-		l2 = [0., 1., u[0]*cos(theta+dTheta/2.)]
-		l3 = [0., 0., 1.]
-		return (np.matrix([l1, l2, l3]))
+	def system_update_numba (self, delta_dist, var_dist, delta_angle, var_angle):
+		ekf_system_update_jit (self.prevX, self.prevCov, self.Q, delta_dist, var_dist, delta_angle, var_angle, \
+			self.zero_q_reset)
+		return self.prevX
+
+	def measurement_update_gnss_numba (self, pos, var_pos):
+		ekf_measurement_update_gnss_jit (self.prevX, self.prevCov, self.Q, self.K, self.A, self.tmp, \
+			pos[0], pos[1], var_pos, self.joseph_form, self.zero_q_reset)
+		return self.prevX
+
+	def measurement_update_ahrs (self, yaw, var_yaw):
+		"""
+		Measurement update with an absolute yaw [rad], from an AHRS aligned with
+		the map or from pose_2d_gnss_preprocessor.estimate_yaw
+		"""
+		P = self.prevCov
+
+		# innovation wrapped to [-pi; pi], the state yaw is not wrapped
+		y = yaw - self.prevX[2]
+		y -= 2*pi*floor((y + pi)/(2*pi))
+
+		# Kalman gain: K[t] = P-[t]*H.T*S^-1 with H = [0, 0, 1]
+		k = self.Ky
+		np.divide(P[:,2], P[2,2] + var_yaw, out=k)
+
+		# updated (A posteriori) estimate and error covariance
+		self.prevX[0] += k[0]*y
+		self.prevX[1] += k[1]*y
+		self.prevX[2] += k[2]*y
+		self.A[:] = self.I
+		self.A[:,2] -= k
+		np.dot(self.A, P, out=self.tmp)
+		if self.joseph_form:
+			np.dot(self.tmp, self.A.T, out=P)
+			np.multiply(k[:,np.newaxis], k[np.newaxis,:], out=self.KKt)
+			self.KKt *= var_yaw
+			P += self.KKt
+		else:
+			P[:] = self.tmp
+		return self.prevX
+
+
+class pose_2d_ekf_history():
+	"""
+	Fixed-lag history of a pose_2d_ekf, used to apply GNSS fixes that arrive
+	after the odometry of the same time at their true time.
+
+	Each system update is recorded in a ring buffer of the last length
+	updates with its time, its odometry and the state, covariance and
+	process noise after the update. A fix is applied to the recorded state
+	of the last system update at or before the time of the fix, and the
+	odometry after it is re-propagated, rewriting the history. The work of
+	a fix is thus bounded by length system updates. The rollback window is
+	length divided by the odometry rate, e.g. 100 gives 0.5s at 200 Hz.
+
+	A fix older than the history, or older than the previous fix, is
+	applied to the current state as by pose_2d_ekf and counted in
+	fixes_not_rolled_back.
+
+	A yaw measurement update is applied to the current state and recorded
+	as the state of the newest system update. It is not re-applied when a
+	later fix rolls back past it, so use it with fixes that are not delayed
+	or after the delayed fix of the same time.
+	"""
+	def __init__(self, ekf, length):
+		self.ekf = ekf
+		self.length = length
+		self.time = np.zeros(length)
+		self.u = np.zeros((length, 4)) # delta_dist, var_dist, delta_angle, var_angle
+		self.X = np.zeros((length, 3))
+		self.P = np.zeros((length, 3, 3))
+		self.Q = np.zeros((length, 3, 3))
+		self.newest = -1 # index of the newest update
+		self.count = 0
+		self.prev_fix_time = None
+		self.fixes_not_rolled_back = 0
+
+	def record (self, i):
+		self.X[i] = self.ekf.prevX
+		self.P[i] = self.ekf.prevCov
+		self.Q[i] = self.ekf.Q
+
+	def system_update (self, time, delta_dist, var_dist, delta_angle, var_angle):
+		pose = self.ekf.system_update (delta_dist, var_dist, delta_angle, var_angle)
+		self.newest = (self.newest + 1) % self.length
+		self.count = min(self.count + 1, self.length)
+		i = self.newest
+		self.time[i] = time
+		u = self.u[i]
+		u[0] = delta_dist
+		u[1] = var_dist
+		u[2] = delta_angle
+		u[3] = var_angle
+		self.record (i)
+		return pose
+
+	def measurement_update_gnss (self, time, pos, var_pos):
+		ekf = self.ekf
+
+		# number of system updates after the fix
+		n = 0
+		i = self.newest
+		while n < self.count and self.time[i] > time:
+			n += 1
+			i = (i - 1) % self.length
 
+		if n == 0 or n == self.count or (self.prev_fix_time != None and time < self.prev_fix_time):
+			# newer than the history (no rollback needed), or older than the history or previous fix
+			if n > 0:
+				self.fixes_not_rolled_back += 1
+			pose = ekf.measurement_update_gnss (pos, var_pos)
+			if self.count > 0 and n == 0:
+				self.record (self.newest)
+		else:
+			# roll back to the last system update before the fix, apply the fix and re-propagate
+			ekf.prevX[:] = self.X[i]
+			ekf.prevCov[:] = self.P[i]
+			ekf.Q[:] = self.Q[i]
+			ekf.measurement_update_gnss (pos, var_pos)
+			self.record (i)
+			for j in xrange(n):
+				i = (i + 1) % self.length
+				u = self.u[i]
+				pose = ekf.system_update (u[0], u[1], u[2], u[3])
+				self.record (i)
+		self.prev_fix_time = time
+		return pose
 
+	def measurement_update_ahrs (self, yaw, var_yaw):
+		pose = self.ekf.measurement_update_ahrs (yaw, var_yaw)
+		if self.count > 0:
+			self.record (self.newest)
+		return pose
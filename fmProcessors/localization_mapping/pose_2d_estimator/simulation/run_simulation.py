@@ -31,26 +31,50 @@ This file contains a Python script to test the Pose 2D Estimator using system
 feedback and sensor data from test drives with the Armadillo Pichi field 
 robot platform: http://www.frobomind.org/index.php?title=Robot:Armadillo_Pichi
 
+With --fast-forward the odometry and GNSS logs are merged into one stream of
+events in time order and the estimator is updated event by event as fast as
+possible. The simulation then runs without a display and the plot is drawn
+and saved once at the end.
+
+Usage: run_simulation.py [-h] [--fast-forward]
+
 Revision
 2013-04-23 KJ First version
 """
 
 # imports
 import signal
+import argparse
+from time import time
 from math import sqrt, pi
 from pose_2d_estimator import pose_2d_gnss_preprocessor, pose_2d_ekf
-from sim_import import odometry_data, gnss_data
-from pose_2d_estimator_plot import estimator_plot
+from sim_import import odometry_data, gnss_data, merge_events, log_files
 
 # parameters
-odo_file = 'sim_odometry.txt'
+log_dir = '.' # the binary log if it contains sim_index.json, otherwise the text files
 odo_max_lines = 0 # read the entire file
-gnss_file = 'sim_gnss.txt'
 gnss_max_lines = 0 # read the entire file
 sim_step_interval = 0.01 # 100 Hz
 relative_coordinates = True # first gnss coordinate set to (0,0)
+var_dist = 0.0000000001 # odometry distance variance
+var_angle = 0.001 # odometry angle variance
+std_dev_rtk_fixed = 0.02 # GNSS position standard deviation for each fix quality [m]
+std_dev_rtk_float = 2.0
+std_dev_dgps = 7.0
+std_dev_sps = 15.0
+gnss_yaw_update = True # EKF yaw update from the GNSS track (pose_2d_gnss_preprocessor.estimate_yaw)
 steps_btw_plot_updates = 600
 
+# command line
+parser = argparse.ArgumentParser(description='Pose 2D Estimator robot drive simulation')
+parser.add_argument('--fast-forward', action='store_true', \
+	help='replay the logs event by event as fast as possible and plot at the end only')
+args = parser.parse_args()
+if args.fast_forward:
+	import matplotlib
+	matplotlib.use('Agg') # no display
+from pose_2d_estimator_plot import estimator_plot
+
 # return signed difference between new and old angle
 def angle_diff (angle_new, angle_old):
 	diff = angle_new - angle_old
@@ -80,9 +104,10 @@ plot.enable_gnss (True)
 plot.enable_pose (True)
 
 # import simulation data
-odo_sim = odometry_data(odo_file, odo_max_lines)
+files = log_files(log_dir)
+odo_sim = odometry_data(files['odometry'], odo_max_lines)
 odometry = []
-gnss_sim = gnss_data(gnss_file, gnss_max_lines, relative_coordinates)
+gnss_sim = gnss_data(files['gnss'], gnss_max_lines, relative_coordinates)
 gnss = []
 
 # define simulation time based on gnss data
@@ -91,72 +116,104 @@ sim_len = gnss_sim.data[-1][0] - sim_offset
 sim_steps = sim_len/sim_step_interval
 sim_time = 0
 print ('Simulation')
-print ('  Step interval: %.2fs' % sim_step_interval)
-print ('  Total: %.2fs (%.0f steps)' % (sim_len, sim_steps))
+if args.fast_forward:
+	print ('  Event driven: %d odometry and %d GNSS samples' % (odo_sim.length, gnss_sim.length))
+	print ('  Total: %.2fs' % (sim_len))
+else:
+	print ('  Step interval: %.2fs' % sim_step_interval)
+	print ('  Total: %.2fs (%.0f steps)' % (sim_len, sim_steps))
 
 # initialize estimator (gnss preprocessing)
-gp = pose_2d_gnss_preprocessor()
+gp = pose_2d_gnss_preprocessor(std_dev_rtk_fixed, std_dev_rtk_float, std_dev_dgps, std_dev_sps)
 
 # initialize estimator (EKF)
 prev_odometry = [0.0, 0.0, 0.0, 0.0] # [time,X,Y,theta]
 ekf = pose_2d_ekf()
 ekf.set_initial_guess([1.0, 1.0, 180.0*pi/180.0])
 
-# run simulation
-for step in xrange ((int(sim_steps)+1)):
-
-	# simulation time housekeeping
-	log_time = sim_time + sim_offset
-	sim_time += sim_step_interval
-
-    # update odometry position
-	(odo_updates, odometry) = odo_sim.get_latest(log_time) 
-	if odo_updates > 0:
-		odometry[1] = odometry[1]/1000.0 # STRANGE, MUST BE INVESTIGATED !!!!
-		odometry[2] = odometry[2]/1000.0 # STRANGE, MUST BE INVESTIGATED !!!!
-		
-		# EKF system update (odometry)
-		delta_dist =  sqrt((odometry[1]-prev_odometry[1])**2 + (odometry[2]-prev_odometry[2])**2)
-		delta_angle = angle_diff (odometry[3], prev_odometry[3])
-		var_dist = 0.0000000001
-		var_angle = 0.001
-		prev_odometry = odometry
-		pose = ekf.system_update (delta_dist, var_dist, delta_angle, var_angle)
-
-		# plot update
-		plot.append_odometry_position(odometry[1], odometry[2])
-		plot.append_pose_position (pose[0], pose[1])
-		#print "  odometry: %.3f %.3f\n" % (odometry[1], odometry[2])
-
-    # update GNSS position
-	(gnss_updates, gnss_measurement) = gnss_sim.get_latest(log_time)
-	if gnss_updates > 0:
-
-		# GNSS data preprocessing
-		gp.add_gnss_measurement (gnss_measurement) 
-		pos = [gnss_measurement[6], gnss_measurement[7]]
-		var_pos = gp.estimate_variance()
-
-		# EKF measurement update (GNSS)
-		pose = ekf.measurement_update_gnss (pos, var_pos)
-
-		# plot update
-		plot.append_gnss_position(gnss_measurement[6], gnss_measurement[7])
-		# print "  gnss: %.3f %.3f" % (gnss[6], gnss[7])
-
-	# output to screen
-	#if step % 2000 == 0: # each 20 seconds, needs to be calculated!!!
-	#	print ('Step %d time %.2f log time %.2f' % (step+1, sim_time, (sim_time+sim_offset)))
-	if step % steps_btw_plot_updates == 0:
-		plot.update()
+def odometry_update (odometry):
+	global prev_odometry
+	odometry[1] = odometry[1]/1000.0 # STRANGE, MUST BE INVESTIGATED !!!!
+	odometry[2] = odometry[2]/1000.0 # STRANGE, MUST BE INVESTIGATED !!!!
+	
+	# EKF system update (odometry)
+	delta_dist =  sqrt((odometry[1]-prev_odometry[1])**2 + (odometry[2]-prev_odometry[2])**2)
+	delta_angle = angle_diff (odometry[3], prev_odometry[3])
+	prev_odometry = odometry
+	gp.add_odometry (odometry)
+	pose = ekf.system_update (delta_dist, var_dist, delta_angle, var_angle)
+
+	# plot update
+	plot.append_odometry_position(odometry[1], odometry[2])
+	plot.append_pose_position (pose[0], pose[1])
+	#print "  odometry: %.3f %.3f\n" % (odometry[1], odometry[2])
+
+def gnss_update (gnss_measurement):
+	# GNSS data preprocessing
+	gp.add_gnss_measurement (gnss_measurement) 
+	pos = [gnss_measurement[6], gnss_measurement[7]]
+	var_pos = gp.estimate_variance()
+
+	# EKF measurement update (GNSS)
+	pose = ekf.measurement_update_gnss (pos, var_pos)
+
+	# EKF measurement update (GNSS track yaw)
+	if gnss_yaw_update:
+		yaw = gp.estimate_yaw()
+		if yaw != None:
+			pose = ekf.measurement_update_ahrs (yaw[0], yaw[1])
+
+	# plot update
+	plot.append_gnss_position(gnss_measurement[6], gnss_measurement[7])
+	# print "  gnss: %.3f %.3f" % (gnss[6], gnss[7])
 
-    # exit if CTRL-C pressed
-	if ctrl_c:
-		break
+# run simulation
+if args.fast_forward:
+	updates = [odometry_update, gnss_update]
+	events = 0
+	start = time()
+	for (log_time, source, sample) in merge_events (odo_sim, gnss_sim):
+		updates[source](sample)
+		events += 1
+
+	    # exit if CTRL-C pressed
+		if ctrl_c:
+			break
+	elapsed = time() - start
+	print ('  %d events in %.2fs (%.0f events/s)' % (events, elapsed, events/max(elapsed, 1e-9)))
+else:
+	for step in xrange ((int(sim_steps)+1)):
+
+		# simulation time housekeeping
+		log_time = sim_time + sim_offset
+		sim_time += sim_step_interval
+
+	    # update odometry position
+		(odo_updates, odometry) = odo_sim.get_latest(log_time) 
+		if odo_updates > 0:
+			odometry_update (odometry)
+
+	    # update GNSS position
+		(gnss_updates, gnss_measurement) = gnss_sim.get_latest(log_time)
+		if gnss_updates > 0:
+			gnss_update (gnss_measurement)
+
+		# output to screen
+		#if step % 2000 == 0: # each 20 seconds, needs to be calculated!!!
+		#	print ('Step %d time %.2f log time %.2f' % (step+1, sim_time, (sim_time+sim_offset)))
+		if step % steps_btw_plot_updates == 0:
+			plot.update()
+
+	    # exit if CTRL-C pressed
+		if ctrl_c:
+			break
 
 # quit the simulation
 if ctrl_c == False:
-	print 'Simulation completed, press Enter to quit'
-	raw_input() # wait for enter keypress 
+	if args.fast_forward:
+		plot.update()
+		print 'Simulation completed, plot saved'
+	else:
+		print 'Simulation completed, press Enter to quit'
+		raw_input() # wait for enter keypress 
 	plot.save()
-
@@ -27,18 +27,122 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #*****************************************************************************
 """
+The simulation data is read from the comma delimited text files or from
+the binary log written by import_bag_to_csv.py: a numpy structured array
+(.npy) per topic, with the fields of odometry_dtype, imu_dtype and
+gnss_dtype, and the index sim_index.json listing the file, topic, number
+of samples and time span of each. The binary files are memory mapped, so a
+log is loaded without reading it, and only the samples used are read from
+the disk. The loaders choose the format by the file name extension.
+
 Revision
 2013-04-23 KJ First version
+2013-05-18 KJ Binary log format
 """
 
 # imports
+import os
 import csv
+import json
+import numpy as np
+from heapq import heapify, heapreplace, heappop
 from utm import utmconv
 
+# binary log format
+index_file = 'sim_index.json'
+odometry_dtype = np.dtype([('time', 'f8'), ('x', 'f8'), ('y', 'f8'), ('yaw', 'f8')])
+imu_dtype = np.dtype([('time', 'f8'), ('angular_velocity_z', 'f8'), ('orientation_z', 'f8')])
+gnss_dtype = np.dtype([('time', 'f8'), ('lat', 'f8'), ('lon', 'f8'), ('fix', 'i4'), ('sat', 'i4'), \
+	('hdop', 'f8'), ('easting', 'f8'), ('northing', 'f8')])
+log_topics = [ # name, topic, binary file, text file
+	('odometry', '/fmKnowledge/encoder_odom', 'sim_odometry.npy', 'sim_odometry.txt'),
+	('imu', '/fmInformation/imu', 'sim_imu.npy', 'sim_imu.txt'),
+	('gnss', '/fmInformation/gpgga', 'sim_gnss.npy', 'sim_gnss.txt')]
+
+def log_files (directory):
+	"""
+	Returns the data file of each topic name in the log directory: the
+	binary files listed in sim_index.json if it exists, otherwise the text
+	files
+	"""
+	files = {}
+	index = os.path.join(directory, index_file)
+	if os.path.exists(index):
+		f = open(index, 'r')
+		topics = json.load(f)['topics']
+		f.close()
+		for (name, entry) in topics.items():
+			files[str(name)] = os.path.join(directory, str(entry['file']))
+	else:
+		for (name, topic, binary_file, text_file) in log_topics:
+			files[name] = os.path.join(directory, text_file)
+	return files
+
+def write_log_index (directory, logs, source):
+	"""
+	Writes sim_index.json for the binary logs {name: (topic, file, array)}
+	in the directory, converted from source
+	"""
+	topics = {}
+	for (name, (topic, filename, data)) in logs.items():
+		topics[name] = {'topic': topic, 'file': filename, 'samples': len(data), \
+			'fields': list(data.dtype.names), \
+			'start': float(data['time'][0]) if len(data) > 0 else None, \
+			'end': float(data['time'][-1]) if len(data) > 0 else None}
+	f = open(os.path.join(directory, index_file), 'w')
+	json.dump({'version': 1, 'source': source, 'topics': topics}, f, indent=1, sort_keys=True)
+	f.close()
+
+def gnss_to_utm (data):
+	# sets the UTM easting and northing of the GNSS samples from lat and lon
+	if len(data) > 0:
+		(hemisphere, zone, easting, northing) = utmconv().geodetic_to_utm_array (data['lat'], data['lon'])
+		data['easting'] = easting
+		data['northing'] = northing
+
+class log_samples():
+	"""
+	Sequence of the samples of a memory mapped binary log, sample i is
+	returned as the list [time, ...] of the fields, as read from the text
+	files. The samples are converted when accessed, so the log is not copied.
+	offset is subtracted from the fields from first_offset on.
+	"""
+	def __init__(self, data, offset=None, first_offset=0):
+		self.data = data
+		self.offset = offset
+		self.first_offset = first_offset
+
+	def __len__(self):
+		return len(self.data)
+
+	def __getitem__(self, i):
+		if isinstance(i, slice):
+			return [self[j] for j in xrange(*i.indices(len(self.data)))]
+		sample = list(self.data[i].tolist())
+		if self.offset != None:
+			for (j, offset) in enumerate(self.offset):
+				sample[self.first_offset + j] -= offset
+		return sample
+
+	def __iter__(self):
+		for i in xrange(len(self.data)):
+			yield self[i]
+
+def load_binary (filename, max_lines):
+	data = np.load(filename, mmap_mode='r')
+	if max_lines > 0:
+		data = data[:max_lines]
+	return data
+
 class odometry_data():
 	def __init__(self, filename, max_lines):
 		self.i = 0
 		print 'Importing odometry data'
+		if filename.endswith('.npy'):
+			self.data = log_samples(load_binary(filename, max_lines))
+			self.length = len(self.data)
+			print '\tTotal samples: %d (memory mapped)' % (self.length)
+			return
 		file = open(filename, 'rb')
 		file_content = csv.reader(file, delimiter=',')
 	 	self.data = []
@@ -65,6 +169,15 @@ class gnss_data:
 	def __init__(self, filename, max_lines, relative_coordinates):
 		self.i = 0
 		print 'Importing GPS data'
+		if filename.endswith('.npy'):
+			data = load_binary(filename, max_lines)
+			offset = None
+			if relative_coordinates and len(data) > 0:
+				offset = (data['easting'][0], data['northing'][0])
+			self.data = log_samples(data, offset, 6)
+			self.length = len(self.data)
+			print '\tTotal samples: %d (memory mapped)' % (self.length)
+			return
 		file = open(filename, 'rb')
 		file_content = csv.reader(file, delimiter=',')
 	 	self.data = []
@@ -106,3 +219,23 @@ class gnss_data:
 			new_data += 1
 		return (new_data, self.data[self.i])
 
+def merge_events (*sources):
+	"""
+	Iterates over the samples of the data sources in time order, assuming
+	each source is sorted by time. The next sample of each source is kept
+	in a heap, so the cost per sample is O(log(number of sources)) and no
+	time is spent on intervals without samples. Yields (time, source, sample)
+	where source is the index of the data source in the argument list.
+	"""
+	heap = [(source.data[0][0], n, 0) for (n, source) in enumerate(sources) if source.length > 0]
+	heapify(heap)
+	while heap:
+		(time, n, i) = heap[0]
+		source = sources[n]
+		sample = source.data[i]
+		i += 1
+		if i < source.length:
+			heapreplace(heap, (source.data[i][0], n, i))
+		else:
+			heappop(heap)
+		yield (time, n, sample)